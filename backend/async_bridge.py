@@ -0,0 +1,681 @@
+"""
+Asyncio-native bridge for COBOL integration.
+
+Non-blocking counterpart of backend.bridge for the FastAPI endpoints. The COBOL
+binary runs through asyncio.create_subprocess_exec and file I/O runs in worker
+threads, so a long payroll run no longer freezes the event loop (and /health).
+Cancelling a job kills its COBOL process.
+"""
+
+import os
+import asyncio
+import logging
+import subprocess
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple, TypeVar
+
+from starlette.requests import Request
+
+from backend.bridge import (
+    COBOL_TIMEOUT,
+    DATA_DIR,
+    DEFAULT_ENGINE,
+    ENGINES,
+    SHARD_PARALLELISM,
+    SHARD_SIZE,
+    build_payroll_results,
+    cobol_binary_path,
+    cobol_environment,
+    create_job_workspace,
+    get_result_cache,
+    job_file_paths,
+    merge_cached_results,
+    merge_shard_outputs,
+    read_job_report,
+    read_output_file,
+    reads_report_directly,
+    remove_job_workspace,
+    run_inprocess_job,
+    run_pool_job,
+    run_reference_job,
+    sample_differential_check,
+    split_cache_misses,
+    split_shards,
+    write_input_file,
+)
+from backend.models import EmployeePayrollInput, PayrollRequest, PayrollResponse
+from backend.payroll_results import PayrollResultSet
+from backend.coalescer import PayrollCoalescer
+from backend.payroll_jobs import JobStore, PayrollJobManager
+
+logger = logging.getLogger("payroll_bridge")
+
+T = TypeVar("T")
+
+# How often run_until_disconnected() checks whether the client is still there
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# Request coalescing: small requests arriving within PAYROLL_COALESCE_WINDOW_MS
+# share one COBOL run of up to PAYROLL_COALESCE_MAX_RECORDS employees (0 disables)
+COALESCE_WINDOW = float(os.getenv("PAYROLL_COALESCE_WINDOW_MS", "0")) / 1000
+COALESCE_MAX_RECORDS = int(os.getenv("PAYROLL_COALESCE_MAX_RECORDS", "1000"))
+
+_coalescer: Optional[PayrollCoalescer] = None
+
+# Background jobs (POST /api/payroll/jobs): stored in PAYROLL_JOBS_DB and run
+# PAYROLL_JOB_CHUNK_SIZE employees at a time by PAYROLL_JOB_WORKERS workers
+JOBS_DB = os.getenv("PAYROLL_JOBS_DB", os.path.join(DATA_DIR, "payroll_jobs.db"))
+JOB_CHUNK_SIZE = int(os.getenv("PAYROLL_JOB_CHUNK_SIZE", "50000"))
+JOB_WORKERS = int(os.getenv("PAYROLL_JOB_WORKERS", "1"))
+
+_job_manager: Optional[PayrollJobManager] = None
+
+# Streamed requests and responses (NDJSON): employees per COBOL run, so
+# processing starts before the upload ends and results leave in pieces
+INGEST_BATCH_SIZE = int(os.getenv("PAYROLL_INGEST_BATCH_SIZE", "10000"))
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the HTTP client goes away before its payroll job finishes"""
+    pass
+
+
+async def _kill_process(process: asyncio.subprocess.Process) -> None:
+    """Kill a COBOL process if it is still running and reap it."""
+    if process.returncode is None:
+        process.kill()
+        await process.wait()
+
+
+async def execute_cobol_async(
+    input_file_path: Optional[str] = None,
+    output_file_path: Optional[str] = None,
+    timeout: Optional[float] = COBOL_TIMEOUT
+) -> subprocess.CompletedProcess:
+    """
+    Execute the COBOL payroll binary without blocking the event loop.
+    
+    Behaves like bridge.execute_cobol(): same binary, same job file
+    environment, same exceptions. If the awaiting task is cancelled
+    (for example because the client disconnected), the COBOL process is
+    killed before the cancellation propagates.
+    
+    Example:
+        result = await execute_cobol_async(input_path, output_path)
+        # Logs: "COBOL execution completed in 0.523s with returncode 0"
+    
+    Args:
+        input_file_path: Fixed-width input file for this job (None = COBOL default)
+        output_file_path: Report file for this job (None = COBOL default)
+        timeout: Seconds before the process is killed (None = no limit)
+    
+    Returns:
+        subprocess.CompletedProcess object with stdout, stderr, and returncode
+    
+    Raises:
+        FileNotFoundError: If COBOL binary doesn't exist at expected path
+        subprocess.TimeoutExpired: If execution exceeds timeout
+        subprocess.CalledProcessError: If COBOL binary exits with non-zero code
+        asyncio.CancelledError: If the awaiting task is cancelled
+    """
+    binary_path = cobol_binary_path()
+    
+    if not os.path.exists(binary_path):
+        error_msg = (
+            f"COBOL binary not found at {binary_path}. "
+            "Please compile the COBOL source code first."
+        )
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+    
+    logger.info(f"Executing COBOL binary (async): {binary_path}")
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    
+    process = await asyncio.create_subprocess_exec(
+        binary_path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=cobol_environment(input_file_path, output_file_path)
+    )
+    
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill_process(process)
+        error_msg = f"COBOL execution timed out after {timeout} seconds"
+        logger.error(error_msg)
+        raise subprocess.TimeoutExpired(cmd=[binary_path], timeout=timeout)
+    except asyncio.CancelledError:
+        # Don't leave an orphaned COBOL process behind a cancelled request
+        await _kill_process(process)
+        logger.warning(f"COBOL execution cancelled, killed pid {process.pid}")
+        raise
+    
+    duration = loop.time() - start_time
+    stdout_text = stdout.decode(errors="replace")
+    stderr_text = stderr.decode(errors="replace")
+    
+    logger.info(
+        f"COBOL execution completed in {duration:.3f}s with returncode {process.returncode}"
+    )
+    if stderr_text:
+        logger.warning(f"COBOL stderr: {stderr_text}")
+    
+    if process.returncode != 0:
+        error_msg = (
+            f"COBOL binary exited with non-zero status {process.returncode}. "
+            f"stderr: {stderr_text}"
+        )
+        logger.error(error_msg)
+        raise subprocess.CalledProcessError(
+            process.returncode,
+            [binary_path],
+            output=stdout_text,
+            stderr=stderr_text
+        )
+    
+    return subprocess.CompletedProcess([binary_path], process.returncode, stdout_text, stderr_text)
+
+
+@asynccontextmanager
+async def job_workspace_async() -> AsyncIterator[Tuple[str, str]]:
+    """
+    Async counterpart of bridge.job_workspace().
+    
+    Creating the job directory and removing it (with a large job's input.dat
+    and output.rpt) are file system calls, so both run in worker threads.
+    
+    Yields:
+        Tuple of (input_file_path, output_file_path) inside the job directory
+    
+    Raises:
+        IOError: If the job directory cannot be created
+    """
+    job_dir = await asyncio.to_thread(create_job_workspace)
+    try:
+        yield job_file_paths(job_dir)
+    finally:
+        await asyncio.to_thread(remove_job_workspace, job_dir)
+
+
+async def run_job_async(employees: List[EmployeePayrollInput], engine: str) -> List[str]:
+    """
+    Run one COBOL job on the selected engine without blocking the event loop.
+    
+    The subprocess engine writes/reads its job files in worker threads and
+    awaits the COBOL process natively. The pool engine already talks to a
+    running worker over pipes and the in-process engine is a blocking ctypes
+    call, so those jobs run in a worker thread. The reference engine is
+    CPU-bound NumPy work and runs in a worker thread as well.
+    
+    Args:
+        employees: Validated employee payroll input records
+        engine: "subprocess", "pool", "inprocess" or "reference"
+    
+    Returns:
+        Report lines (employee records and summary line)
+    """
+    if engine == "reference":
+        return await asyncio.to_thread(run_reference_job, employees)
+    
+    if engine == "pool":
+        output_lines = await asyncio.to_thread(run_pool_job, employees)
+    elif engine == "inprocess":
+        output_lines = await asyncio.to_thread(run_inprocess_job, employees)
+    else:
+        async with job_workspace_async() as (input_file_path, output_file_path):
+            await asyncio.to_thread(write_input_file, employees, input_file_path)
+            await execute_cobol_async(input_file_path, output_file_path)
+            output_lines = await asyncio.to_thread(read_output_file, output_file_path)
+    
+    await asyncio.to_thread(sample_differential_check, employees, output_lines)
+    return output_lines
+
+
+async def run_report_job_async(employees: List[EmployeePayrollInput]) -> PayrollResultSet:
+    """
+    Async counterpart of bridge.run_report_job().
+    
+    The COBOL process is awaited natively; writing input.dat and decoding
+    output.rpt into cents run in worker threads.
+    
+    Args:
+        employees: Validated employee payroll input records
+    
+    Returns:
+        PayrollResultSet with the job's results and summary counts
+    """
+    async with job_workspace_async() as (input_file_path, output_file_path):
+        await asyncio.to_thread(write_input_file, employees, input_file_path)
+        await execute_cobol_async(input_file_path, output_file_path)
+        return await asyncio.to_thread(read_job_report, employees, output_file_path)
+
+
+async def run_sharded_async(
+    employees: List[EmployeePayrollInput],
+    engine: str,
+    shard_size: int = SHARD_SIZE,
+    parallelism: int = SHARD_PARALLELISM
+) -> List[str]:
+    """
+    Async counterpart of bridge.run_sharded().
+    
+    Shards run as concurrent tasks limited by a semaphore. If one shard fails
+    or the caller is cancelled, the remaining shards are cancelled too, which
+    kills their COBOL processes.
+    
+    Args:
+        employees: Validated employee payroll input records
+        engine: "subprocess", "pool", "inprocess" or "reference"
+        shard_size: Maximum records per COBOL job
+        parallelism: Maximum number of shards running at the same time
+    
+    Returns:
+        Combined report lines with one trailing summary line
+    """
+    shards = split_shards(employees, shard_size, parallelism)
+    if len(shards) == 1:
+        return await run_job_async(employees, engine)
+    
+    shard_outputs = await gather_shards(
+        [lambda shard=shard: run_job_async(shard, engine) for shard in shards], parallelism
+    )
+    return merge_shard_outputs(shard_outputs)
+
+
+async def run_sharded_results_async(
+    employees: List[EmployeePayrollInput],
+    shard_size: int = SHARD_SIZE,
+    parallelism: int = SHARD_PARALLELISM
+) -> PayrollResultSet:
+    """
+    Async counterpart of bridge.run_sharded_results().
+    
+    Args:
+        employees: Validated employee payroll input records
+        shard_size: Maximum records per COBOL job
+        parallelism: Maximum number of shards running at the same time
+    
+    Returns:
+        PayrollResultSet for the whole batch with added-up summary counts
+    """
+    shards = split_shards(employees, shard_size, parallelism)
+    if len(shards) == 1:
+        return await run_report_job_async(employees)
+    
+    results = PayrollResultSet()
+    for part in await gather_shards(
+        [lambda shard=shard: run_report_job_async(shard) for shard in shards], parallelism
+    ):
+        results.extend(part)
+    return results
+
+
+async def gather_shards(jobs: List[Callable[[], Awaitable[T]]], parallelism: int) -> List[T]:
+    """
+    Run shard jobs as concurrent tasks, at most parallelism at a time.
+    
+    If one shard fails or the caller is cancelled, the remaining shards are
+    cancelled too, which kills their COBOL processes.
+    
+    Returns:
+        Each job's result, in job order
+    """
+    semaphore = asyncio.Semaphore(parallelism)
+    
+    async def run_shard(job: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await job()
+    
+    tasks = [asyncio.ensure_future(run_shard(job)) for job in jobs]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def run_cached_async(
+    employees: List[EmployeePayrollInput],
+    engine: str,
+    shard_size: int = SHARD_SIZE,
+    parallelism: int = SHARD_PARALLELISM
+) -> List[str]:
+    """
+    Async counterpart of bridge.run_cached() around run_sharded_async().
+    
+    Cache lookups and merges touch SQLite, so they run in worker threads.
+    
+    Args:
+        employees: Validated employee payroll input records
+        engine: "subprocess", "pool", "inprocess" or "reference"
+        shard_size: Maximum records per COBOL job
+        parallelism: Maximum number of shards running at the same time
+    
+    Returns:
+        Report lines for the whole batch with one trailing summary line
+    """
+    cache = get_result_cache(engine)
+    if cache is None:
+        return await run_sharded_async(employees, engine, shard_size, parallelism)
+    
+    records, cached_lines, misses = await asyncio.to_thread(
+        split_cache_misses, cache, employees
+    )
+    miss_output = (
+        await run_sharded_async(misses, engine, shard_size, parallelism) if misses else []
+    )
+    return await asyncio.to_thread(
+        merge_cached_results, cache, records, cached_lines, miss_output
+    )
+
+
+async def process_payroll_async(
+    request: PayrollRequest,
+    engine: Optional[str] = None,
+    shard_size: Optional[int] = None,
+    parallelism: Optional[int] = None
+) -> PayrollResponse:
+    """
+    Async counterpart of bridge.process_payroll().
+    
+    Same pipeline, same result, same exceptions - but the event loop stays
+    free while COBOL runs, and cancelling the task kills the COBOL process.
+    
+    Example:
+        response = await process_payroll_async(request)
+    
+    Args:
+        request: PayrollRequest containing list of employees to process
+        engine: "subprocess", "pool", "inprocess" or "reference" (defaults to PAYROLL_ENGINE)
+        shard_size: Maximum records per COBOL job (defaults to PAYROLL_SHARD_SIZE)
+        parallelism: Maximum concurrent shards (defaults to PAYROLL_SHARD_PARALLELISM)
+    
+    Returns:
+        PayrollResponse with processed results and summary statistics
+    
+    Raises:
+        Exception: For any processing error (see bridge.process_payroll)
+        asyncio.CancelledError: If the task is cancelled
+    """
+    results = await process_payroll_results_async(request, engine, shard_size, parallelism)
+    return await asyncio.to_thread(results.to_response)
+
+
+async def process_payroll_results_async(
+    request: PayrollRequest,
+    engine: Optional[str] = None,
+    shard_size: Optional[int] = None,
+    parallelism: Optional[int] = None
+) -> PayrollResultSet:
+    """
+    Async counterpart of bridge.process_payroll_results().
+    
+    Example:
+        results = await process_payroll_results_async(request)
+        return JSONResponse(results.to_json())
+    
+    Args:
+        request: PayrollRequest containing list of employees to process
+        engine: "subprocess", "pool", "inprocess" or "reference" (defaults to PAYROLL_ENGINE)
+        shard_size: Maximum records per COBOL job (defaults to PAYROLL_SHARD_SIZE)
+        parallelism: Maximum concurrent shards (defaults to PAYROLL_SHARD_PARALLELISM)
+    
+    Returns:
+        PayrollResultSet with processed results and summary counts
+    
+    Raises:
+        Exception: For any processing error (see bridge.process_payroll)
+        asyncio.CancelledError: If the task is cancelled
+    """
+    logger.info(f"Starting async payroll processing for {len(request.employees)} employees")
+    
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown payroll engine: {engine} (expected one of {ENGINES})")
+    
+    try:
+        if reads_report_directly(engine):
+            # Reports are decoded straight into integer cents in worker threads
+            results = await run_sharded_results_async(
+                request.employees,
+                shard_size=shard_size or SHARD_SIZE,
+                parallelism=parallelism or SHARD_PARALLELISM
+            )
+        else:
+            output_lines = await run_cached_async(
+                request.employees,
+                engine,
+                shard_size=shard_size or SHARD_SIZE,
+                parallelism=parallelism or SHARD_PARALLELISM
+            )
+            
+            # Parsing large reports is CPU work, keep it off the event loop
+            results = await asyncio.to_thread(
+                build_payroll_results, request.employees, output_lines
+            )
+        
+        logger.info(
+            f"Payroll processing completed successfully: "
+            f"{results.processed} processed, {results.errors} errors"
+        )
+        return results
+    
+    except Exception as e:
+        # Catch-all for any unexpected errors during processing
+        error_msg = f"Unexpected error during payroll processing: {e}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+
+
+async def iter_employee_slices(
+    employees: List[EmployeePayrollInput],
+    size: int
+) -> AsyncIterator[List[EmployeePayrollInput]]:
+    """Present an in-memory employee list as batches for iter_payroll_batches_async()."""
+    for start in range(0, len(employees), size):
+        yield employees[start:start + size]
+
+
+async def iter_payroll_batches_async(
+    batches: AsyncIterator[List[EmployeePayrollInput]],
+    engine: Optional[str] = None,
+    parallelism: Optional[int] = None
+) -> AsyncIterator[PayrollResultSet]:
+    """
+    Process employee batches as they arrive and yield their results in order.
+    
+    Each batch starts on COBOL as soon as it has been read. At most
+    parallelism batches are in flight; the next batch isn't read until the
+    oldest one has been handed to the caller, so memory stays bounded by the
+    batches in flight no matter how many employees pass through. If the
+    caller stops early (or is cancelled), batches still running are cancelled.
+    
+    Example:
+        batches = iter_employee_batches(http_request.stream(), INGEST_BATCH_SIZE)
+        async for results in iter_payroll_batches_async(batches):
+            ...
+    
+    Args:
+        batches: Async iterator of validated employee batches
+        engine: "subprocess", "pool", "inprocess" or "reference" (defaults to PAYROLL_ENGINE)
+        parallelism: Maximum concurrent batches (defaults to PAYROLL_SHARD_PARALLELISM)
+    
+    Yields:
+        PayrollResultSet per batch, in arrival order
+    
+    Raises:
+        Exception: For any processing error (see bridge.process_payroll)
+        NDJSONValidationError: If the input stream is invalid (raised by batches)
+    """
+    parallelism = parallelism or SHARD_PARALLELISM
+    if parallelism < 1:
+        raise ValueError(f"Parallelism must be at least 1, got: {parallelism}")
+    
+    pending: Deque[asyncio.Task] = deque()
+    try:
+        async for employees in batches:
+            if len(pending) >= parallelism:
+                yield await pending.popleft()
+            pending.append(asyncio.ensure_future(process_payroll_results_async(
+                PayrollRequest.model_construct(employees=employees), engine
+            )))
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def process_payroll_stream_async(
+    batches: AsyncIterator[List[EmployeePayrollInput]],
+    engine: Optional[str] = None,
+    parallelism: Optional[int] = None
+) -> PayrollResultSet:
+    """
+    Process employee batches as they arrive (e.g. from an NDJSON upload).
+    
+    Same as iter_payroll_batches_async(), but collects all results into one
+    compact PayrollResultSet.
+    
+    Args:
+        batches: Async iterator of validated employee batches
+        engine: "subprocess", "pool", "inprocess" or "reference" (defaults to PAYROLL_ENGINE)
+        parallelism: Maximum concurrent batches (defaults to PAYROLL_SHARD_PARALLELISM)
+    
+    Returns:
+        PayrollResultSet for all batches in arrival order
+    """
+    results = PayrollResultSet()
+    async for part in iter_payroll_batches_async(batches, engine, parallelism):
+        results.extend(part)
+    return results
+
+
+def get_coalescer() -> Optional[PayrollCoalescer]:
+    """
+    Return the shared request coalescer, creating it on first use.
+    
+    Must be called from the event loop that serves the API.
+    
+    Returns:
+        The process-wide PayrollCoalescer, or None if coalescing is disabled
+    """
+    global _coalescer
+    if COALESCE_WINDOW <= 0:
+        return None
+    if _coalescer is None:
+        _coalescer = PayrollCoalescer(
+            process_payroll_results_async,
+            window=COALESCE_WINDOW,
+            max_records=COALESCE_MAX_RECORDS
+        )
+    return _coalescer
+
+
+async def submit_payroll(request: PayrollRequest) -> PayrollResultSet:
+    """
+    Process a request through the coalescer when it is enabled.
+    
+    Small requests are batched with other requests arriving at the same time;
+    otherwise this is process_payroll_results_async(request).
+    
+    Args:
+        request: PayrollRequest containing list of employees to process
+    
+    Returns:
+        PayrollResultSet with this request's results and summary
+    """
+    coalescer = get_coalescer()
+    if coalescer is None:
+        return await process_payroll_results_async(request)
+    return await coalescer.submit(request)
+
+
+async def shutdown_coalescer() -> None:
+    """Flush and drop the shared coalescer if it was started."""
+    global _coalescer
+    if _coalescer is not None:
+        await _coalescer.close()
+        _coalescer = None
+
+
+async def get_job_manager() -> PayrollJobManager:
+    """
+    Return the shared background job manager, starting it on first use.
+    
+    Starting it requeues jobs a previous run of the API left unfinished.
+    Must be called from the event loop that serves the API.
+    
+    Returns:
+        The process-wide PayrollJobManager
+    """
+    global _job_manager
+    if _job_manager is None:
+        os.makedirs(os.path.dirname(JOBS_DB) or ".", exist_ok=True)
+        _job_manager = PayrollJobManager(
+            JobStore(JOBS_DB),
+            process_payroll_results_async,
+            chunk_size=JOB_CHUNK_SIZE,
+            workers=JOB_WORKERS
+        )
+    await _job_manager.start()
+    return _job_manager
+
+
+async def shutdown_job_manager() -> None:
+    """Stop the background job workers; running jobs resume on next start."""
+    global _job_manager
+    if _job_manager is not None:
+        await _job_manager.close()
+        _job_manager = None
+
+
+async def run_until_disconnected(
+    http_request: Request,
+    awaitable: Awaitable[T],
+    poll_interval: float = DISCONNECT_POLL_INTERVAL
+) -> T:
+    """
+    Await a payroll job, cancelling it if the HTTP client disconnects.
+    
+    Starlette does not cancel a handler when its client goes away, so the
+    job is run as a task and the connection is polled while it runs.
+    
+    Example:
+        response = await run_until_disconnected(
+            http_request, process_payroll_async(payroll_request)
+        )
+    
+    Args:
+        http_request: The incoming Starlette/FastAPI request
+        awaitable: The job to run (usually process_payroll_async(...))
+        poll_interval: Seconds between disconnect checks
+    
+    Returns:
+        The job's result
+    
+    Raises:
+        ClientDisconnectedError: If the client disconnected (the job was cancelled)
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            
+            if await http_request.is_disconnected():
+                logger.warning("Client disconnected, cancelling payroll job")
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise ClientDisconnectedError("Client disconnected before payroll job finished")
+    except asyncio.CancelledError:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        raise
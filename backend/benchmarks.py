@@ -0,0 +1,355 @@
+"""
+Performance benchmarks for the payroll pipeline.
+
+Each benchmark prints a small table so results can be compared between
+machines and between commits.
+
+Usage:
+    python -m backend.benchmarks              # run every benchmark
+    python -m backend.benchmarks engines      # run one benchmark by name
+    python -m backend.benchmarks differential # COBOL vs reference engine on random batches
+"""
+import sys
+import time
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from backend.conftest import TEST_WALLET, build_request
+from backend.models import EmployeePayrollInput, PayrollRequest
+
+
+def timed(func: Callable, repeat: int = 5) -> float:
+    """Return the best wall-clock time of repeat calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_engines() -> None:
+    """Per-request latency of the subprocess, worker pool and in-process engines."""
+    from backend.bridge import process_payroll, shutdown_worker_pool
+    
+    print(
+        f"{'records':>8} {'subprocess ms':>14} {'pool ms':>10} {'inprocess ms':>13} "
+        f"{'pool x':>7} {'inproc x':>9}"
+    )
+    for count in (1, 10, 100, 1000):
+        request = build_request(count)
+        process_payroll(request, engine="pool")  # Start the workers outside the timing
+        process_payroll(request, engine="inprocess")  # Load libcob outside the timing
+        subprocess_time = timed(lambda: process_payroll(request, engine="subprocess"))
+        pool_time = timed(lambda: process_payroll(request, engine="pool"))
+        inprocess_time = timed(lambda: process_payroll(request, engine="inprocess"))
+        print(
+            f"{count:>8} {subprocess_time * 1000:>14.2f} {pool_time * 1000:>10.2f} "
+            f"{inprocess_time * 1000:>13.2f} {subprocess_time / pool_time:>6.1f}x "
+            f"{subprocess_time / inprocess_time:>8.1f}x"
+        )
+    shutdown_worker_pool()
+
+
+def bench_sharding() -> None:
+    """Scaling of one large batch from 1 to N parallel COBOL shards."""
+    import os
+    from backend.bridge import process_payroll
+    
+    count = 200_000
+    request = build_request(count)
+    cores = os.cpu_count() or 4
+    baseline = None
+    
+    print(f"{'shards':>7} {'seconds':>9} {'records/s':>12} {'speedup':>8}")
+    parallelism = 1
+    while parallelism <= cores:
+        shard_size = -(-count // parallelism)  # ceil: exactly `parallelism` shards
+        elapsed = timed(
+            lambda: process_payroll(request, shard_size=shard_size, parallelism=parallelism),
+            repeat=1
+        )
+        baseline = baseline or elapsed
+        print(
+            f"{parallelism:>7} {elapsed:>9.2f} {count / elapsed:>12,.0f} "
+            f"{baseline / elapsed:>7.1f}x"
+        )
+        parallelism *= 2
+
+
+def bench_reference() -> None:
+    """COBOL file round-trip vs the NumPy reference engine."""
+    from backend import reference_engine
+    from backend.bridge import json_to_fixed_width, run_sharded
+    
+    print(f"{'records':>10} {'subprocess s':>13} {'reference s':>12} {'speedup':>9}")
+    for count in (10_000, 100_000, 1_000_000):
+        employees = build_request(count).employees
+        records = [json_to_fixed_width(emp) for emp in employees]
+        subprocess_time = timed(lambda: run_sharded(employees, "subprocess"), repeat=1)
+        reference_time = timed(lambda: reference_engine.run_job(records), repeat=3)
+        print(
+            f"{count:>10} {subprocess_time:>13.3f} {reference_time:>12.3f} "
+            f"{subprocess_time / reference_time:>8.1f}x"
+        )
+    
+    import numpy as np
+    hours = np.random.randint(1, 100000, size=10_000_000)
+    rates = np.random.randint(1, 1000000, size=10_000_000)
+    elapsed = timed(lambda: reference_engine.calculate_payroll(hours, rates), repeat=3)
+    print(f"calculate_payroll on 10M cents arrays: {elapsed:.3f}s")
+
+
+def bench_differential() -> None:
+    """Differential run: random batches through COBOL and the reference engine."""
+    import random
+    from backend.bridge import differential_check, run_sharded
+    
+    rng = random.Random(0)
+    print(f"{'batch':>6} {'records':>8} {'mismatches':>11}")
+    for batch in range(10):
+        employees = [
+            EmployeePayrollInput(
+                employee_id=f"D{batch:02d}E{index:05d}",
+                hours_worked=Decimal(rng.randint(1, 99999)) / 100,
+                hourly_rate=Decimal(rng.randint(1, 999999)) / 100,
+                tax_code="US",
+                wallet_address=TEST_WALLET
+            )
+            for index in range(rng.randint(1, 5000))
+        ]
+        mismatches = differential_check(employees, run_sharded(employees, "subprocess"))
+        print(f"{batch:>6} {len(employees):>8} {len(mismatches):>11}")
+
+
+def bench_report() -> None:
+    """read_output_file + parse_output_line vs the mmap report reader."""
+    import os
+    import tempfile
+    import tracemalloc
+    from backend import reference_engine
+    from backend.bridge import parse_output_line, read_output_file
+    from backend.report_reader import iter_report_records, read_report_summary
+    
+    def parse_with_lines(path: str) -> None:
+        for line in read_output_file(path):
+            if not line.startswith("SUMMARY:"):
+                parse_output_line(line)
+    
+    def parse_with_mmap(path: str) -> None:
+        for _ in iter_report_records(path):
+            pass
+        read_report_summary(path)
+    
+    def peak_mib(func: Callable, path: str) -> float:
+        tracemalloc.start()
+        func(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak / (1024 * 1024)
+    
+    print(
+        f"{'records':>10} {'lines s':>9} {'mmap s':>8} {'speedup':>8} "
+        f"{'lines MiB':>10} {'mmap MiB':>9}"
+    )
+    for count in (10_000, 100_000, 1_000_000):
+        records = [
+            f"EMP{index:07d}{index % 99999 + 1:05d}{index % 999999 + 1:06d}US"
+            for index in range(count)
+        ]
+        fd, path = tempfile.mkstemp(suffix=".rpt")
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(reference_engine.run_job(records)) + "\n")
+        del records
+        
+        try:
+            lines_time = timed(lambda: parse_with_lines(path), repeat=1)
+            mmap_time = timed(lambda: parse_with_mmap(path), repeat=1)
+            lines_peak = peak_mib(parse_with_lines, path)
+            mmap_peak = peak_mib(parse_with_mmap, path)
+        finally:
+            os.remove(path)
+        
+        print(
+            f"{count:>10} {lines_time:>9.3f} {mmap_time:>8.3f} "
+            f"{lines_time / mmap_time:>7.1f}x {lines_peak:>10.1f} {mmap_peak:>9.2f}"
+        )
+
+
+def bench_encoder() -> None:
+    """Per-record json_to_fixed_width writes vs the bulk input encoder."""
+    import os
+    import tempfile
+    from backend.bridge import json_to_fixed_width, write_input_file
+    
+    def write_per_record(employees, path: str) -> None:
+        with open(path, "w") as f:
+            for record in [json_to_fixed_width(emp) for emp in employees]:
+                f.write(record + "\n")
+    
+    print(f"{'records':>10} {'per-record s':>13} {'bulk s':>8} {'records/s':>12} {'speedup':>8}")
+    for count in (10_000, 100_000, 1_000_000):
+        employees = build_request(count).employees
+        fd, path = tempfile.mkstemp(suffix=".dat")
+        os.close(fd)
+        try:
+            per_record_time = timed(lambda: write_per_record(employees, path), repeat=3)
+            bulk_time = timed(lambda: write_input_file(employees, path), repeat=3)
+        finally:
+            os.remove(path)
+        print(
+            f"{count:>10} {per_record_time:>13.3f} {bulk_time:>8.3f} "
+            f"{count / bulk_time:>12,.0f} {per_record_time / bulk_time:>7.1f}x"
+        )
+
+
+def bench_results() -> None:
+    """Decimal PayrollResponse vs the integer-cents PayrollResultSet."""
+    import tracemalloc
+    from backend import reference_engine
+    from backend.bridge import build_payroll_response, build_payroll_results, json_to_fixed_width
+    
+    def traced(func: Callable) -> float:
+        tracemalloc.start()
+        kept = func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return peak / (1024 * 1024)
+    
+    print(
+        f"{'records':>10} {'response s':>11} {'cents s':>8} {'json s':>7} "
+        f"{'response MiB':>13} {'cents MiB':>10}"
+    )
+    for count in (10_000, 100_000, 500_000):
+        employees = build_request(count).employees
+        lines = reference_engine.run_job([json_to_fixed_width(emp) for emp in employees])
+        
+        response_time = timed(lambda: build_payroll_response(employees, lines), repeat=1)
+        cents_time = timed(lambda: build_payroll_results(employees, lines), repeat=1)
+        results = build_payroll_results(employees, lines)
+        json_time = timed(results.to_json, repeat=1)
+        response_mib = traced(lambda: build_payroll_response(employees, lines))
+        cents_mib = traced(lambda: build_payroll_results(employees, lines))
+        print(
+            f"{count:>10} {response_time:>11.3f} {cents_time:>8.3f} {json_time:>7.3f} "
+            f"{response_mib:>13.1f} {cents_mib:>10.1f}"
+        )
+
+
+def bench_upload() -> None:
+    """JSON PayrollRequest validation vs fixed-width upload validation."""
+    from backend.bridge import json_to_fixed_width
+    from backend.bulk_upload import parse_fixed_width_block
+    
+    print(f"{'records':>10} {'json s':>8} {'fixed-width s':>14} {'records/s':>12} {'speedup':>8}")
+    for count in (10_000, 100_000, 500_000):
+        employees = build_request(count).employees
+        body = PayrollRequest(employees=employees).model_dump_json()
+        block = "".join(json_to_fixed_width(emp) + "\n" for emp in employees).encode("ascii")
+        wallets = {emp.employee_id: emp.wallet_address for emp in employees}
+        
+        json_time = timed(lambda: PayrollRequest.model_validate_json(body), repeat=1)
+        upload_time = timed(lambda: parse_fixed_width_block(block, 1, wallets), repeat=1)
+        print(
+            f"{count:>10} {json_time:>8.3f} {upload_time:>14.3f} "
+            f"{count / upload_time:>12,.0f} {json_time / upload_time:>7.1f}x"
+        )
+
+
+def bench_validation() -> None:
+    """Per-object (FastAPI body) vs column-wise validation of a JSON PayrollRequest."""
+    import json
+    from backend.bulk_validation import validate_payroll_request
+    
+    print(f"{'records':>10} {'per-object s':>13} {'column-wise s':>14} {'records/s':>12} {'speedup':>8}")
+    for count in (1_000, 10_000, 100_000):
+        body = build_request(count).model_dump_json().encode()
+        
+        model_time = timed(lambda: PayrollRequest.model_validate(json.loads(body)), repeat=3)
+        bulk_time = timed(lambda: validate_payroll_request(body, threshold=1), repeat=3)
+        print(
+            f"{count:>10} {model_time:>13.3f} {bulk_time:>14.3f} "
+            f"{count / bulk_time:>12,.0f} {model_time / bulk_time:>7.1f}x"
+        )
+
+
+def bench_serialization() -> None:
+    """Response body rendering: jsonable_encoder, to_json() + JSONResponse, to_json_bytes()."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from backend import reference_engine
+    from backend.bridge import build_payroll_results, json_to_fixed_width
+    
+    print(
+        f"{'records':>10} {'encoder s':>10} {'to_json s':>10} {'bytes s':>8} "
+        f"{'numeric s':>10} {'MiB/s':>7} {'speedup':>8}"
+    )
+    for count in (1_000, 10_000, 100_000):
+        employees = build_request(count).employees
+        lines = reference_engine.run_job([json_to_fixed_width(emp) for emp in employees])
+        results = build_payroll_results(employees, lines)
+        response = results.to_response()
+        
+        encoder_time = timed(lambda: JSONResponse(jsonable_encoder(response)), repeat=3)
+        to_json_time = timed(lambda: JSONResponse(results.to_json()), repeat=3)
+        bytes_time = timed(results.to_json_bytes, repeat=3)
+        numeric_time = timed(lambda: results.to_json_bytes(numeric_amounts=True), repeat=3)
+        mib = len(results.to_json_bytes()) / (1024 * 1024)
+        print(
+            f"{count:>10} {encoder_time:>10.3f} {to_json_time:>10.3f} {bytes_time:>8.3f} "
+            f"{numeric_time:>10.3f} {mib / bytes_time:>7.0f} {to_json_time / bytes_time:>7.1f}x"
+        )
+
+
+def bench_settlement() -> None:
+    """Mock batch settlement wall time by transfer concurrency."""
+    import logging
+    import os
+    from backend.bridge import process_payroll
+    from backend.coinbase_client import CoinbaseClient, logger as settlement_logger
+    
+    os.environ.setdefault("PAYROLL_WALLET_ADDRESS", TEST_WALLET)
+    settlement_logger.setLevel(logging.WARNING)
+    delay = 0.05
+    count = 128
+    response = process_payroll(build_request(count), engine="reference")
+    
+    print(f"{'transfers':>10} {'workers':>8} {'seconds':>8} {'transfers/s':>12} {'speedup':>8}")
+    serial_time = None
+    for workers in (1, 4, 16, 64, 128):
+        client = CoinbaseClient()
+        client.mock_confirmation_delay = delay
+        client.mock_balance = Decimal("1e9")
+        elapsed = timed(lambda: client.batch_settle(response, max_workers=workers), repeat=1)
+        serial_time = serial_time or elapsed
+        print(
+            f"{count:>10} {workers:>8} {elapsed:>8.2f} {count / elapsed:>12.0f} "
+            f"{serial_time / elapsed:>7.1f}x"
+        )
+    settlement_logger.setLevel(logging.INFO)
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    "engines": bench_engines,
+    "sharding": bench_sharding,
+    "reference": bench_reference,
+    "differential": bench_differential,
+    "report": bench_report,
+    "encoder": bench_encoder,
+    "results": bench_results,
+    "upload": bench_upload,
+    "validation": bench_validation,
+    "serialization": bench_serialization,
+    "settlement": bench_settlement,
+}
+
+
+def main(names: List[str]) -> None:
+    for name in names or list(BENCHMARKS):
+        print(f"\n== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -9,12 +9,25 @@ This module just translates between modern JSON and legacy fixed-width formats.
 import os
 import re
 import sys
+import random
+import hashlib
 import time
+import shutil
 import logging
+import tempfile
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from decimal import Decimal
-from typing import List, Dict
-from backend.models import EmployeePayrollInput, PayrollRequest, PayrollResponse, EmployeePayrollOutput
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
+from backend.models import EmployeePayrollInput, PayrollRequest, PayrollResponse
+from backend.cobol_pool import CobolWorkerPool, WorkerError
+from backend.cobol_module import CobolModule
+from backend import reference_engine
+from backend.result_cache import ResultCache
+from backend.payroll_results import PayrollResultSet
+from backend.report_reader import read_report_results
 
 # Configure logging for the bridge module
 logger = logging.getLogger("payroll_bridge")
@@ -23,6 +36,63 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+# Shared data directory (legacy single-job files) and per-job work directories
+DATA_DIR = "data"
+JOBS_DIR = os.path.join(DATA_DIR, "jobs")
+INPUT_FILE_NAME = "input.dat"
+OUTPUT_FILE_NAME = "output.rpt"
+
+# Longest job file path payroll.cbl can hold (WS-INPUT-PATH / WS-OUTPUT-PATH PIC X(256))
+COBOL_PATH_LENGTH = 256
+
+# Execution engines: "subprocess" spawns one COBOL process per job,
+# "pool" reuses long-lived PAYROLL-WORKER processes (see cobol_pool.py),
+# "inprocess" calls the PAYCALC shared module through ctypes (see cobol_module.py),
+# "reference" runs the NumPy re-implementation (see reference_engine.py)
+ENGINES = ("subprocess", "pool", "inprocess", "reference")
+DEFAULT_ENGINE = os.getenv("PAYROLL_ENGINE", "subprocess")
+
+# Worker pool settings (only used by the "pool" engine)
+POOL_SIZE = int(os.getenv("PAYROLL_POOL_SIZE", str(os.cpu_count() or 4)))
+POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("PAYROLL_POOL_HEALTH_INTERVAL", "30"))
+
+# Sharding: batches larger than SHARD_SIZE are split and run in up to
+# SHARD_PARALLELISM COBOL processes at once. Keep SHARD_SIZE below 100000 so
+# the PIC 9(5) summary counters in payroll.cbl never overflow within a shard.
+SHARD_SIZE = int(os.getenv("PAYROLL_SHARD_SIZE", "50000"))
+SHARD_PARALLELISM = int(os.getenv("PAYROLL_SHARD_PARALLELISM", str(os.cpu_count() or 4)))
+
+# Differential testing: fraction of COBOL jobs that are re-run on the reference
+# engine and compared line by line (0 disables, 1 checks every job)
+DIFFERENTIAL_SAMPLE_RATE = float(os.getenv("PAYROLL_DIFFERENTIAL_SAMPLE_RATE", "0"))
+
+# Result cache: results are reused for identical fixed-width records.
+# PAYROLL_CACHE_SIZE entries stay in memory (0 disables the cache);
+# PAYROLL_CACHE_DB adds an SQLite tier of up to PAYROLL_CACHE_DISK_SIZE entries.
+RESULT_CACHE_SIZE = int(os.getenv("PAYROLL_CACHE_SIZE", "0"))
+RESULT_CACHE_DB = os.getenv("PAYROLL_CACHE_DB") or None
+RESULT_CACHE_DISK_SIZE = int(os.getenv("PAYROLL_CACHE_DISK_SIZE", "10000000"))
+
+# Seconds a single COBOL run may take before it is killed (0 = no limit)
+COBOL_TIMEOUT: Optional[float] = float(os.getenv("PAYROLL_COBOL_TIMEOUT", "30")) or None
+
+# Bulk input encoding: one %-format per record, INPUT_BLOCK_RECORDS records per block.
+# Same layout as json_to_fixed_width().
+INPUT_RECORD_FORMAT = "%-10.10s%05d%06d%-2.2s"
+INPUT_RECORD_LENGTH = 23
+INPUT_LINE_LENGTH = 24
+INPUT_BLOCK_RECORDS = 65536
+_HUNDRED = Decimal(100)
+
+_worker_pool: Optional[CobolWorkerPool] = None
+_worker_pool_lock = threading.Lock()
+
+_cobol_module: Optional[CobolModule] = None
+_cobol_module_lock = threading.Lock()
+
+_result_caches: Dict[str, ResultCache] = {}
+_result_cache_lock = threading.Lock()
+
 
 def json_to_fixed_width(employee: EmployeePayrollInput) -> str:
     """
@@ -41,7 +111,7 @@ def json_to_fixed_width(employee: EmployeePayrollInput) -> str:
             hourly_rate=Decimal("25.50"),
             tax_code="US"
         )
-        Output: "EMP001    0400002550US"
+        Output: "EMP001    04000002550US"
     
     Args:
         employee: Validated employee payroll input
@@ -69,6 +139,82 @@ def json_to_fixed_width(employee: EmployeePayrollInput) -> str:
     return record
 
 
+def fixed_width_records(employees: List[EmployeePayrollInput]) -> List[str]:
+    """
+    Convert a batch of employees to 23-byte fixed-width records.
+    
+    The bulk counterpart of json_to_fixed_width(): the same records, built
+    with a single %-format each. Every engine gets its records from here
+    (the subprocess engine through iter_input_blocks).
+    
+    Example:
+        fixed_width_records(employees)
+        # ["EMP001    04000002550US", "EMP002    03550002550US"]
+    
+    Args:
+        employees: Validated employee payroll input records
+    
+    Returns:
+        One 23-character ASCII record per employee, in order
+    
+    Raises:
+        ValueError: If a value doesn't fit its field or isn't printable ASCII
+    """
+    fmt = INPUT_RECORD_FORMAT
+    # %d truncates the Decimal exactly like int() in json_to_fixed_width
+    records = [
+        fmt % (
+            emp.employee_id,
+            emp.hours_worked * _HUNDRED,
+            emp.hourly_rate * _HUNDRED,
+            emp.tax_code
+        )
+        for emp in employees
+    ]
+    
+    if sum(map(len, records)) != len(records) * INPUT_RECORD_LENGTH or not all(map(str.isascii, records)):
+        bad = next(
+            emp for emp, record in zip(employees, records)
+            if len(record) != INPUT_RECORD_LENGTH or not record.isascii()
+        )
+        raise ValueError(
+            f"Employee {bad.employee_id!r} does not fit the 23-byte ASCII fixed-width record"
+        )
+    return records
+
+
+def iter_input_blocks(
+    employees: List[EmployeePayrollInput],
+    block_records: int = INPUT_BLOCK_RECORDS
+) -> Iterator[bytes]:
+    """
+    Encode employees into input.dat content, one large block at a time.
+    
+    Produces exactly the bytes of json_to_fixed_width(emp) + "\n" for every
+    employee, but builds the records with fixed_width_records() and encodes a
+    whole block at once instead of writing one string per record.
+    
+    Example:
+        for block in iter_input_blocks(employees):
+            f.write(block)
+        # b"EMP001    04000002550US\nEMP002    03550002550US\n..."
+    
+    Args:
+        employees: Validated employee payroll input records
+        block_records: Records per yielded block
+    
+    Yields:
+        ASCII bytes of up to block_records newline-terminated 23-byte records
+    
+    Raises:
+        ValueError: If a value doesn't fit its field or isn't printable ASCII
+    """
+    for start in range(0, len(employees), block_records):
+        records = fixed_width_records(employees[start:start + block_records])
+        records.append("")
+        yield "\n".join(records).encode("ascii")
+
+
 def parse_output_line(line: str) -> Dict:
     """
     Parse a 60-byte fixed-width output record from COBOL.
@@ -168,12 +314,17 @@ def parse_summary_line(line: str) -> Dict[str, int]:
     }
 
 
-def write_input_file(employees: List[EmployeePayrollInput]) -> None:
+def write_input_file(
+    employees: List[EmployeePayrollInput],
+    input_file_path: str = "data/input.dat"
+) -> None:
     """
     Write employee payroll data to input file for COBOL processing.
     
-    Converts each employee record to fixed-width format and writes to data/input.dat.
-    Each record is 23 bytes followed by a newline character.
+    Converts each employee record to fixed-width format and writes to input_file_path
+    (data/input.dat by default, or the job's own input.dat inside a job workspace).
+    Each record is 23 bytes followed by a newline character. Records are
+    encoded and written in large blocks (see iter_input_blocks).
     
     THE STITCHING: This prepares data for the COBOL binary to consume.
     
@@ -184,29 +335,25 @@ def write_input_file(employees: List[EmployeePayrollInput]) -> None:
         ]
         write_input_file(employees)
         # Creates data/input.dat with:
-        # EMP001    0400002550US
-        # EMP002    0355002550US
+        # EMP001    04000002550US
+        # EMP002    03550002550US
     
     Args:
         employees: List of validated employee payroll input records
+        input_file_path: Path of the fixed-width input file to create
         
     Raises:
         IOError: If file cannot be written (permissions, disk space, etc.)
         OSError: If data directory doesn't exist and cannot be created
     """
-    input_file_path = "data/input.dat"
-    
     try:
-        # Ensure data directory exists
-        os.makedirs("data", exist_ok=True)
-        
-        # Convert all employees to fixed-width format
-        records = [json_to_fixed_width(emp) for emp in employees]
-        
-        # Write all records to file with newlines
-        with open(input_file_path, 'w') as f:
-            for record in records:
-                f.write(record + '\n')
+        # Ensure the parent directory exists
+        os.makedirs(os.path.dirname(input_file_path) or ".", exist_ok=True)
+    
+        # Convert employees to fixed-width format and write block by block
+        with open(input_file_path, 'wb') as f:
+            for block in iter_input_blocks(employees):
+                f.write(block)
                 
     except PermissionError as e:
         raise IOError(f"Permission denied writing to {input_file_path}: {e}")
@@ -214,11 +361,12 @@ def write_input_file(employees: List[EmployeePayrollInput]) -> None:
         raise IOError(f"Failed to write input file {input_file_path}: {e}")
 
 
-def read_output_file() -> List[str]:
+def read_output_file(output_file_path: str = "data/output.rpt") -> List[str]:
     """
     Read COBOL output file and return all non-empty lines.
     
-    Reads data/output.rpt which contains employee payroll results and a summary line.
+    Reads output_file_path (data/output.rpt by default, or the job's own output.rpt
+    inside a job workspace) which contains employee payroll results and a summary line.
     Empty lines are filtered out.
     
     THE STITCHING: This reads the results produced by the COBOL binary.
@@ -232,6 +380,9 @@ def read_output_file() -> List[str]:
         #   "SUMMARY: PROCESSED=00002 ERRORS=00000"
         # ]
     
+    Args:
+        output_file_path: Path of the fixed-width report written by COBOL
+    
     Returns:
         List of non-empty lines from the output file
         
@@ -239,8 +390,6 @@ def read_output_file() -> List[str]:
         FileNotFoundError: If output.rpt doesn't exist (COBOL didn't run or failed)
         IOError: If file cannot be read (permissions, etc.)
     """
-    output_file_path = "data/output.rpt"
-    
     try:
         with open(output_file_path, 'r') as f:
             lines = f.readlines()
@@ -261,8 +410,287 @@ def read_output_file() -> List[str]:
         raise IOError(f"Failed to read output file {output_file_path}: {e}")
 
 
+def create_job_workspace() -> str:
+    """
+    Create a fresh data/jobs/job-XXXXXXXX/ directory for one payroll job.
+    
+    Returns:
+        Path of the new job directory
+    
+    Raises:
+        IOError: If the job directory cannot be created
+    """
+    try:
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        job_dir = tempfile.mkdtemp(prefix="job-", dir=JOBS_DIR)
+    except OSError as e:
+        raise IOError(f"Failed to create job directory under {JOBS_DIR}: {e}")
+    
+    logger.debug(f"Created job workspace {job_dir}")
+    return job_dir
+
+
+def job_file_paths(job_dir: str) -> Tuple[str, str]:
+    """Return the (input_file_path, output_file_path) of a job directory."""
+    return (
+        os.path.join(job_dir, INPUT_FILE_NAME),
+        os.path.join(job_dir, OUTPUT_FILE_NAME)
+    )
+
+
+def remove_job_workspace(job_dir: str) -> None:
+    """Delete a job directory and whatever files the job left in it."""
+    shutil.rmtree(job_dir, ignore_errors=True)
+
+
+@contextmanager
+def job_workspace() -> Iterator[Tuple[str, str]]:
+    """
+    Create an isolated work directory for a single payroll job.
+
+    Every job gets its own data/jobs/job-XXXXXXXX/ directory holding its own
+    input.dat and output.rpt, so concurrent requests never read or overwrite
+    each other's files. The directory is removed when the job finishes.
+    
+    Example:
+        with job_workspace() as (input_path, output_path):
+            write_input_file(employees, input_path)
+            execute_cobol(input_path, output_path)
+            lines = read_output_file(output_path)
+        # data/jobs/job-XXXXXXXX/ no longer exists here
+    
+    Yields:
+        Tuple of (input_file_path, output_file_path) inside the job directory
+    
+    Raises:
+        IOError: If the job directory cannot be created
+    """
+    job_dir = create_job_workspace()
+    try:
+        yield job_file_paths(job_dir)
+    finally:
+        remove_job_workspace(job_dir)
+
+
+def cobol_binary_path(program: str = "payroll") -> str:
+    """
+    Return the path of a compiled COBOL program for the current OS.
+    
+    Example:
+        cobol_binary_path()                  # "cobol/bin/payroll" (Unix)
+        cobol_binary_path("payroll_worker")  # "cobol/bin/payroll_worker.exe" (Windows)
+    
+    Args:
+        program: Program file name without extension
+    
+    Returns:
+        Relative path to the binary under cobol/bin/
+    """
+    if sys.platform == "win32":
+        return f"cobol/bin/{program}.exe"
+    return f"cobol/bin/{program}"
+
+
+def cobol_module_path(program: str = "paycalc") -> str:
+    """
+    Return the path of a COBOL shared module (built with cobc -m) for the current OS.
+    
+    Example:
+        cobol_module_path()  # "cobol/bin/paycalc.so" (Unix), "cobol/bin/paycalc.dll" (Windows)
+    
+    Args:
+        program: Module file name without extension
+    
+    Returns:
+        Relative path to the shared object under cobol/bin/
+    """
+    if sys.platform == "win32":
+        return f"cobol/bin/{program}.dll"
+    return f"cobol/bin/{program}.so"
+
+
+def cobol_environment(
+    input_file_path: Optional[str] = None,
+    output_file_path: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Build the environment for a COBOL run that uses the given job files.
+    
+    payroll.cbl reads its file names with ACCEPT ... FROM ENVIRONMENT, so the
+    paths are passed as PAYROLL_INPUT_FILE and PAYROLL_OUTPUT_FILE. ACCEPT
+    silently truncates values longer than the receiving PIC X(256) fields,
+    which would make COBOL read or write the wrong file, so over-long
+    absolute paths are rejected here instead.
+    
+    Args:
+        input_file_path: Fixed-width input file for this job (None = COBOL default)
+        output_file_path: Report file for this job (None = COBOL default)
+    
+    Returns:
+        Copy of os.environ with the job's file paths set
+        
+    Raises:
+        IOError: If an absolute job path is longer than COBOL_PATH_LENGTH bytes
+    """
+    env = os.environ.copy()
+    for variable, path in (
+        ("PAYROLL_INPUT_FILE", input_file_path),
+        ("PAYROLL_OUTPUT_FILE", output_file_path)
+    ):
+        if not path:
+            continue
+        path = os.path.abspath(path)
+        if len(path.encode()) > COBOL_PATH_LENGTH:
+            raise IOError(
+                f"Job file path is {len(path.encode())} bytes, longer than the "
+                f"{COBOL_PATH_LENGTH} bytes payroll.cbl can read from {variable}: {path}"
+            )
+        env[variable] = path
+    return env
+
 
-def execute_cobol() -> subprocess.CompletedProcess:
+def get_worker_pool() -> CobolWorkerPool:
+    """
+    Return the shared COBOL worker pool, starting it on first use.
+    
+    Pool size and health check interval come from PAYROLL_POOL_SIZE and
+    PAYROLL_POOL_HEALTH_INTERVAL.
+    
+    Returns:
+        The process-wide CobolWorkerPool
+    
+    Raises:
+        FileNotFoundError: If the payroll_worker binary hasn't been compiled
+    """
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = CobolWorkerPool(
+                cobol_binary_path("payroll_worker"),
+                size=POOL_SIZE,
+                job_timeout=COBOL_TIMEOUT,
+                health_check_interval=POOL_HEALTH_CHECK_INTERVAL
+            )
+        return _worker_pool
+
+
+def get_cobol_module() -> CobolModule:
+    """
+    Return the in-process PAYCALC module, loading libcob on first use.
+    
+    Returns:
+        The process-wide CobolModule
+    
+    Raises:
+        FileNotFoundError: If paycalc.so or the libcob runtime can't be found
+    """
+    global _cobol_module
+    with _cobol_module_lock:
+        if _cobol_module is None:
+            _cobol_module = CobolModule(cobol_module_path())
+        return _cobol_module
+
+
+def engine_artifact_path(engine: str) -> str:
+    """
+    Return the file an engine computes results with.
+    
+    Example:
+        engine_artifact_path("pool")       # "cobol/bin/payroll_worker"
+        engine_artifact_path("inprocess")  # "cobol/bin/paycalc.so"
+    """
+    if engine == "pool":
+        return cobol_binary_path("payroll_worker")
+    if engine == "inprocess":
+        return cobol_module_path()
+    if engine == "reference":
+        return reference_engine.__file__
+    return cobol_binary_path()
+
+
+def engine_fingerprint(engine: str) -> Optional[str]:
+    """
+    Return the result cache namespace of an engine: its name and a SHA-256 of its artifact.
+    
+    Each engine is a separate build (payroll, payroll_worker, paycalc.so) or
+    implementation (reference_engine.py), so results of one engine, or of an
+    older build of it, are never served for another.
+    
+    Example:
+        engine_fingerprint("subprocess")  # "subprocess:3f9a..."
+    
+    Returns:
+        "engine:hex digest", or None if the artifact doesn't exist
+    """
+    artifact_path = engine_artifact_path(engine)
+    if not os.path.exists(artifact_path):
+        return None
+    
+    digest = hashlib.sha256()
+    with open(artifact_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return f"{engine}:{digest.hexdigest()}"
+
+
+def get_result_cache(engine: Optional[str] = None) -> Optional[ResultCache]:
+    """
+    Return the shared result cache of an engine, creating it on first use.
+    
+    Size and disk tier come from PAYROLL_CACHE_SIZE, PAYROLL_CACHE_DB and
+    PAYROLL_CACHE_DISK_SIZE; the engines share the disk tier, each under its
+    own engine_fingerprint() namespace.
+    
+    Args:
+        engine: "subprocess", "pool", "inprocess" or "reference" (defaults to PAYROLL_ENGINE)
+    
+    Returns:
+        The engine's ResultCache, or None if caching is disabled or the
+        engine's artifact doesn't exist (nothing to fingerprint)
+    """
+    if RESULT_CACHE_SIZE <= 0:
+        return None
+    
+    engine = engine or DEFAULT_ENGINE
+    with _result_cache_lock:
+        cache = _result_caches.get(engine)
+        if cache is None:
+            namespace = engine_fingerprint(engine)
+            if namespace is None:
+                return None
+            cache = _result_caches[engine] = ResultCache(
+                max_entries=RESULT_CACHE_SIZE,
+                db_path=RESULT_CACHE_DB,
+                max_disk_entries=RESULT_CACHE_DISK_SIZE,
+                namespace=namespace
+            )
+        return cache
+
+
+def shutdown_result_caches() -> None:
+    """Log the metrics of the result caches that were created and close them."""
+    with _result_cache_lock:
+        caches = dict(_result_caches)
+        _result_caches.clear()
+    for engine, cache in caches.items():
+        logger.info(f"Result cache ({engine}): {cache.stats()}")
+        cache.close()
+
+
+def shutdown_worker_pool() -> None:
+    """Stop the shared COBOL worker pool if it was started."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _worker_pool.close()
+            _worker_pool = None
+
+
+def execute_cobol(
+    input_file_path: Optional[str] = None,
+    output_file_path: Optional[str] = None,
+    timeout: Optional[float] = COBOL_TIMEOUT
+) -> subprocess.CompletedProcess:
     """
     Execute the COBOL payroll binary via subprocess.
     
@@ -271,35 +699,38 @@ def execute_cobol() -> subprocess.CompletedProcess:
     
     The function:
     - Detects the correct binary path based on OS (Windows vs Unix)
+    - Hands the job's file paths to COBOL via PAYROLL_INPUT_FILE/PAYROLL_OUTPUT_FILE
     - Executes the binary with timeout protection
     - Captures stdout and stderr for debugging
     - Logs execution details (command, returncode, duration)
     - Raises exceptions for execution failures
     
     Expected behavior:
-    - COBOL binary reads from data/input.dat
-    - COBOL binary writes to data/output.rpt
+    - COBOL binary reads from input_file_path (default: data/input.dat)
+    - COBOL binary writes to output_file_path (default: data/output.rpt)
     - Returns CompletedProcess with returncode 0 on success
     
     Example:
-        result = execute_cobol()
+        result = execute_cobol("data/jobs/job-1a2b3c/input.dat", "data/jobs/job-1a2b3c/output.rpt")
         # Logs: "Executing COBOL binary: cobol/bin/payroll"
         # Logs: "COBOL execution completed in 0.523s with returncode 0"
     
+    Args:
+        input_file_path: Fixed-width input file for this job (None = COBOL default)
+        output_file_path: Report file for this job (None = COBOL default)
+        timeout: Seconds before the process is killed (defaults to PAYROLL_COBOL_TIMEOUT)
+    
     Returns:
         subprocess.CompletedProcess object with stdout, stderr, and returncode
         
     Raises:
         FileNotFoundError: If COBOL binary doesn't exist at expected path
-        subprocess.TimeoutExpired: If execution exceeds 30 seconds
+        subprocess.TimeoutExpired: If execution exceeds timeout
         subprocess.CalledProcessError: If COBOL binary exits with non-zero code
         OSError: If subprocess execution fails for other reasons
     """
     # Determine the correct binary path based on operating system
-    if sys.platform == "win32":
-        binary_path = "cobol/bin/payroll.exe"
-    else:
-        binary_path = "cobol/bin/payroll"
+    binary_path = cobol_binary_path()
     
     # Check if binary exists before attempting execution
     if not os.path.exists(binary_path):
@@ -310,6 +741,9 @@ def execute_cobol() -> subprocess.CompletedProcess:
         logger.error(error_msg)
         raise FileNotFoundError(error_msg)
     
+    # Point the COBOL program at this job's files (read via ACCEPT FROM ENVIRONMENT)
+    env = cobol_environment(input_file_path, output_file_path)
+    
     # Log the execution attempt
     logger.info(f"Executing COBOL binary: {binary_path}")
     
@@ -323,8 +757,9 @@ def execute_cobol() -> subprocess.CompletedProcess:
             [binary_path],
             capture_output=True,  # Capture stdout and stderr
             text=True,            # Return output as strings, not bytes
-            timeout=30,           # 30 second timeout
-            check=False           # Don't raise exception yet, we'll check manually
+            timeout=timeout,      # PAYROLL_COBOL_TIMEOUT by default
+            check=False,          # Don't raise exception yet, we'll check manually
+            env=env               # Job-specific input/output file paths
         )
         
         # Calculate execution duration
@@ -360,11 +795,11 @@ def execute_cobol() -> subprocess.CompletedProcess:
         return result
         
     except subprocess.TimeoutExpired as e:
-        error_msg = f"COBOL execution timed out after 30 seconds"
+        error_msg = f"COBOL execution timed out after {timeout} seconds"
         logger.error(error_msg)
         raise subprocess.TimeoutExpired(
             cmd=[binary_path],
-            timeout=30,
+            timeout=timeout,
             output=e.output,
             stderr=e.stderr
         )
@@ -374,20 +809,660 @@ def execute_cobol() -> subprocess.CompletedProcess:
         raise OSError(error_msg)
 
 
-def process_payroll(request: PayrollRequest) -> PayrollResponse:
+def _run_cobol_job(
+    employees: List[EmployeePayrollInput],
+    input_file_path: str,
+    output_file_path: str
+) -> List[str]:
+    """
+    Run one payroll job through the COBOL binary using the given job files.
+    
+    Args:
+        employees: Validated employee payroll input records
+        input_file_path: The job's fixed-width input file
+        output_file_path: The job's fixed-width report file
+    
+    Returns:
+        Non-empty lines of the COBOL report (employee records and summary line)
+    """
+    _execute_cobol_job(employees, input_file_path, output_file_path)
+    
+    # Step 3: Read output file
+    # Read the results produced by COBOL from the job's output.rpt
+    logger.info("Reading COBOL output file")
+    try:
+        output_lines = read_output_file(output_file_path)
+        logger.info(f"Successfully read {len(output_lines)} lines from output file")
+    except FileNotFoundError as e:
+        error_msg = f"Output file not found: {e}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+    except IOError as e:
+        error_msg = f"Failed to read output file: {e}"
+        logger.error(error_msg)
+        raise IOError(error_msg)
+    
+    return output_lines
+
+
+def _execute_cobol_job(
+    employees: List[EmployeePayrollInput],
+    input_file_path: str,
+    output_file_path: str
+) -> None:
+    """
+    Write a job's input.dat and run the COBOL binary on it (steps 1-2).
+    
+    Args:
+        employees: Validated employee payroll input records
+        input_file_path: The job's fixed-width input file
+        output_file_path: The job's fixed-width report file, written by COBOL
+    """
+    # Step 1: Write input file
+    # Convert JSON employee data to fixed-width format and write to the job's input.dat
+    logger.info("Writing input file for COBOL processing")
+    try:
+        write_input_file(employees, input_file_path)
+        logger.info(f"Successfully wrote {len(employees)} records to {input_file_path}")
+    except IOError as e:
+        error_msg = f"Failed to write input file: {e}"
+        logger.error(error_msg)
+        raise IOError(error_msg)
+    
+    # Step 2: Execute COBOL binary
+    # THE BRAIN DOES THE WORK: Invoke the legacy COBOL payroll engine
+    logger.info("Executing COBOL payroll binary")
+    try:
+        execute_cobol(input_file_path, output_file_path)
+        logger.info("COBOL execution completed successfully")
+    except FileNotFoundError as e:
+        error_msg = f"COBOL binary not found: {e}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+    except subprocess.TimeoutExpired as e:
+        error_msg = f"COBOL execution timed out: {e}"
+        logger.error(error_msg)
+        raise subprocess.TimeoutExpired(
+            cmd=e.cmd,
+            timeout=e.timeout,
+            output=e.output,
+            stderr=e.stderr
+        )
+    except subprocess.CalledProcessError as e:
+        error_msg = f"COBOL execution failed with exit code {e.returncode}: {e.stderr}"
+        logger.error(error_msg)
+        raise subprocess.CalledProcessError(
+            returncode=e.returncode,
+            cmd=e.cmd,
+            output=e.output,
+            stderr=e.stderr
+        )
+    except OSError as e:
+        error_msg = f"Failed to execute COBOL binary: {e}"
+        logger.error(error_msg)
+        raise OSError(error_msg)
+
+
+def run_report_job(employees: List[EmployeePayrollInput]) -> PayrollResultSet:
+    """
+    Run one payroll job through the COBOL binary, reading its report into cents.
+    
+    Same job as the subprocess engine runs, in its own job workspace, but
+    output.rpt is decoded by report_reader.read_report_results() instead of
+    being read as lines and parsed by build_payroll_results().
+    
+    Args:
+        employees: Validated employee payroll input records
+    
+    Returns:
+        PayrollResultSet with the job's results and summary counts
+    
+    Raises:
+        FileNotFoundError: If the COBOL binary or the report doesn't exist
+        ValueError: If the report doesn't line up with the employees
+    """
+    with job_workspace() as (input_file_path, output_file_path):
+        _execute_cobol_job(employees, input_file_path, output_file_path)
+        return read_job_report(employees, output_file_path)
+
+
+def read_job_report(employees: List[EmployeePayrollInput], output_file_path: str) -> PayrollResultSet:
+    """
+    Step 3 of run_report_job(): decode a job's output.rpt into a PayrollResultSet.
+    
+    Raises:
+        FileNotFoundError: If the report doesn't exist
+        IOError: If the report can't be read
+        ValueError: If the report is malformed or doesn't line up with the employees
+    """
+    logger.info("Reading COBOL output file")
+    try:
+        results = read_report_results(employees, output_file_path)
+        logger.info(f"Successfully read {len(results)} results from output file")
+    except FileNotFoundError as e:
+        error_msg = f"Output file not found: {e}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+    except ValueError as e:
+        error_msg = f"Failed to parse output: {e}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    except OSError as e:
+        error_msg = f"Failed to read output file: {e}"
+        logger.error(error_msg)
+        raise IOError(error_msg)
+    
+    return results
+
+
+def reads_report_directly(engine: str) -> bool:
+    """
+    Whether a batch's results can be read straight from its reports.
+    
+    Only the subprocess engine writes report files, and the result cache and
+    the differential check both need the reports as lines.
+    """
+    return engine == "subprocess" and get_result_cache(engine) is None and not DIFFERENTIAL_SAMPLE_RATE
+
+
+def run_pool_job(employees: List[EmployeePayrollInput]) -> List[str]:
+    """
+    Run one payroll job on the persistent COBOL worker pool.
+    
+    Args:
+        employees: Validated employee payroll input records
+    
+    Returns:
+        Report lines (employee records and summary line)
+    """
+    records = fixed_width_records(employees)
+    
+    logger.info(f"Sending {len(records)} records to COBOL worker pool")
+    try:
+        output_lines = get_worker_pool().run_job(records)
+    except WorkerError as e:
+        error_msg = f"COBOL worker pool job failed: {e}"
+        logger.error(error_msg)
+        raise WorkerError(error_msg)
+    
+    logger.info(f"COBOL worker pool returned {len(output_lines)} lines")
+    return output_lines
+
+
+def run_inprocess_job(employees: List[EmployeePayrollInput]) -> List[str]:
+    """
+    Run one payroll job in-process through the PAYCALC shared module.
+    
+    Records go to COBOL as a memory buffer instead of input.dat, and results
+    come back in memory instead of output.rpt.
+    
+    Args:
+        employees: Validated employee payroll input records
+    
+    Returns:
+        Report lines (employee records and summary line)
+    """
+    records = fixed_width_records(employees)
+    
+    logger.info(f"Calling in-process COBOL module with {len(records)} records")
+    output_lines = get_cobol_module().run_job(records)
+    logger.info(f"COBOL module returned {len(output_lines)} lines")
+    
+    return output_lines
+
+
+def run_reference_job(employees: List[EmployeePayrollInput]) -> List[str]:
+    """
+    Run one payroll job on the NumPy reference engine.
+    
+    Produces exactly the report lines the COBOL binary would, without
+    calling it. COBOL remains the authoritative engine; use this one on
+    purpose (PAYROLL_ENGINE=reference) or for differential checks.
+    
+    Args:
+        employees: Validated employee payroll input records
+    
+    Returns:
+        Report lines (employee records and summary line)
+    """
+    records = fixed_width_records(employees)
+    
+    logger.info(f"Running reference engine on {len(records)} records")
+    return reference_engine.run_job(records)
+
+
+def differential_check(
+    employees: List[EmployeePayrollInput],
+    output_lines: List[str]
+) -> List[Dict]:
+    """
+    Re-run a job on the reference engine and compare it with COBOL's report.
+    
+    Every mismatch is logged as an error; processing itself is not affected.
+    
+    Example:
+        mismatches = differential_check(employees, output_lines)
+        # Logs: "Differential check: 0 mismatches in 1000 records"
+    
+    Args:
+        employees: The employee records that were sent to COBOL
+        output_lines: Report lines COBOL produced for them
+    
+    Returns:
+        List of mismatches (see reference_engine.compare_reports)
+    """
+    mismatches = reference_engine.compare_reports(
+        output_lines, run_reference_job(employees)
+    )
+    
+    if mismatches:
+        logger.error(
+            f"Differential check: {len(mismatches)} mismatches in {len(employees)} records"
+        )
+        for mismatch in mismatches[:10]:
+            logger.error(f"Differential mismatch: {mismatch}")
+    else:
+        logger.info(f"Differential check: 0 mismatches in {len(employees)} records")
+    
+    return mismatches
+
+
+def sample_differential_check(
+    employees: List[EmployeePayrollInput],
+    output_lines: List[str]
+) -> None:
+    """Run differential_check() on a DIFFERENTIAL_SAMPLE_RATE share of jobs."""
+    if DIFFERENTIAL_SAMPLE_RATE and random.random() < DIFFERENTIAL_SAMPLE_RATE:
+        differential_check(employees, output_lines)
+
+
+def _run_job(employees: List[EmployeePayrollInput], engine: str) -> List[str]:
+    """
+    Run one payroll job on the selected engine.
+    
+    A DIFFERENTIAL_SAMPLE_RATE share of COBOL jobs is also checked against
+    the reference engine.
+    
+    Args:
+        employees: Validated employee payroll input records
+        engine: "subprocess", "pool", "inprocess" or "reference"
+    
+    Returns:
+        Report lines (employee records and summary line)
+    """
+    if engine == "reference":
+        return run_reference_job(employees)
+    
+    if engine == "pool":
+        output_lines = run_pool_job(employees)
+    elif engine == "inprocess":
+        output_lines = run_inprocess_job(employees)
+    else:
+        with job_workspace() as (input_file_path, output_file_path):
+            output_lines = _run_cobol_job(employees, input_file_path, output_file_path)
+    
+    sample_differential_check(employees, output_lines)
+    return output_lines
+
+
+def merge_shard_outputs(shard_outputs: List[List[str]]) -> List[str]:
+    """
+    Merge the reports of several shards into one report.
+    
+    Employee records are concatenated in shard order and the per-shard
+    SUMMARY lines are replaced by a single summary with the added-up counts.
+    
+    Example:
+        merge_shard_outputs([
+            ["EMP001    ...OK", "SUMMARY: PROCESSED=00001 ERRORS=00000"],
+            ["EMP002    ...ER", "SUMMARY: PROCESSED=00000 ERRORS=00001"]
+        ])
+        # Returns:
+        # ["EMP001    ...OK", "EMP002    ...ER", "SUMMARY: PROCESSED=00001 ERRORS=00001"]
+    
+    Args:
+        shard_outputs: Report lines of each shard, in shard order
+    
+    Returns:
+        Combined report lines with one trailing summary line
+    
+    Raises:
+        ValueError: If a shard's summary line is malformed
+    """
+    merged = []
+    processed = 0
+    errors = 0
+    
+    for lines in shard_outputs:
+        for line in lines:
+            if line.startswith("SUMMARY:"):
+                shard_summary = parse_summary_line(line)
+                processed += shard_summary["processed"]
+                errors += shard_summary["errors"]
+            else:
+                merged.append(line)
+    
+    merged.append(f"SUMMARY: PROCESSED={processed:05d} ERRORS={errors:05d}")
+    return merged
+
+
+def run_sharded(
+    employees: List[EmployeePayrollInput],
+    engine: str,
+    shard_size: int = SHARD_SIZE,
+    parallelism: int = SHARD_PARALLELISM
+) -> List[str]:
+    """
+    Split a batch into shards and run them in parallel COBOL processes.
+    
+    Each shard is an ordinary COBOL job (its own job workspace or its own
+    pool worker), so a large batch uses up to parallelism cores instead
+    of one. Results come back in the original employee order.
+    
+    Example:
+        lines = run_sharded(employees, "subprocess", shard_size=50000, parallelism=8)
+        # 500k employees -> 10 shards, at most 8 COBOL processes running at once
+    
+    Args:
+        employees: Validated employee payroll input records
+        engine: "subprocess", "pool", "inprocess" or "reference"
+        shard_size: Maximum records per COBOL job
+        parallelism: Maximum number of shards running at the same time
+    
+    Returns:
+        Combined report lines with one trailing summary line
+    """
+    shards = split_shards(employees, shard_size, parallelism)
+    if len(shards) == 1:
+        return _run_job(employees, engine)
+    
+    # Threads only wait on COBOL processes/pipes, so the GIL is not a bottleneck.
+    # map() returns results in submission order, which keeps the original order.
+    with ThreadPoolExecutor(max_workers=min(parallelism, len(shards))) as executor:
+        shard_outputs = list(executor.map(lambda shard: _run_job(shard, engine), shards))
+    
+    return merge_shard_outputs(shard_outputs)
+
+
+def run_sharded_results(
+    employees: List[EmployeePayrollInput],
+    shard_size: int = SHARD_SIZE,
+    parallelism: int = SHARD_PARALLELISM
+) -> PayrollResultSet:
+    """
+    run_sharded() on the subprocess engine, with every report read into cents.
+    
+    Each shard is a run_report_job(); the shards' result sets are joined in
+    order, so the batch's reports are never held as lines.
+    
+    Args:
+        employees: Validated employee payroll input records
+        shard_size: Maximum records per COBOL job
+        parallelism: Maximum number of shards running at the same time
+    
+    Returns:
+        PayrollResultSet for the whole batch with added-up summary counts
+    """
+    shards = split_shards(employees, shard_size, parallelism)
+    if len(shards) == 1:
+        return run_report_job(employees)
+    
+    with ThreadPoolExecutor(max_workers=min(parallelism, len(shards))) as executor:
+        shard_results = list(executor.map(run_report_job, shards))
+    
+    results = PayrollResultSet()
+    for part in shard_results:
+        results.extend(part)
+    return results
+
+
+def split_shards(
+    employees: List[EmployeePayrollInput],
+    shard_size: int,
+    parallelism: int
+) -> List[List[EmployeePayrollInput]]:
+    """
+    Split a batch into shards of at most shard_size employees (one for a small batch).
+    
+    Raises:
+        ValueError: If shard_size or parallelism is below 1
+    """
+    if shard_size < 1 or parallelism < 1:
+        raise ValueError(
+            f"Shard size and parallelism must be at least 1, got: {shard_size}, {parallelism}"
+        )
+    
+    if len(employees) <= shard_size:
+        return [employees]
+    
+    shards = [
+        employees[start:start + shard_size]
+        for start in range(0, len(employees), shard_size)
+    ]
+    logger.info(
+        f"Splitting {len(employees)} employees into {len(shards)} shards "
+        f"of up to {shard_size} (parallelism {parallelism})"
+    )
+    return shards
+
+
+def split_cache_misses(
+    cache: ResultCache,
+    employees: List[EmployeePayrollInput]
+) -> Tuple[List[str], List[Optional[str]], List[EmployeePayrollInput]]:
+    """
+    Look a batch up in the result cache.
+    
+    Args:
+        cache: The result cache
+        employees: Validated employee payroll input records
+    
+    Returns:
+        (records, cached_lines, misses): the fixed-width record of every
+        employee, the cached result line per record (None for a miss) and
+        the employees that still have to go through COBOL, in order
+    """
+    records = fixed_width_records(employees)
+    cached_lines = cache.get_many(records)
+    misses = [emp for emp, line in zip(employees, cached_lines) if line is None]
+    
+    logger.info(
+        f"Result cache: {len(employees) - len(misses)} hits, {len(misses)} misses"
+    )
+    return records, cached_lines, misses
+
+
+def merge_cached_results(
+    cache: ResultCache,
+    records: List[str],
+    cached_lines: List[Optional[str]],
+    miss_output: List[str]
+) -> List[str]:
+    """
+    Merge COBOL's results for the cache misses back into the cached results.
+    
+    New results are stored in the cache. The summary line is rebuilt from
+    the status of every record, exactly as COBOL counts them.
+    
+    Example:
+        merge_cached_results(cache, records, ["EMP001 ...OK", None], miss_output)
+        # ["EMP001 ...OK", "EMP002 ...OK", "SUMMARY: PROCESSED=00002 ERRORS=00000"]
+    
+    Args:
+        cache: The result cache
+        records: Fixed-width record of every employee in the batch
+        cached_lines: Cached result line per record, None for a miss
+        miss_output: COBOL report lines for the misses (records and summary)
+    
+    Returns:
+        Report lines for the whole batch with one trailing summary line
+    
+    Raises:
+        ValueError: If COBOL returned a different number of records than it was sent
+    """
+    miss_records = [record for record, line in zip(records, cached_lines) if line is None]
+    miss_lines = [line for line in miss_output if not line.startswith("SUMMARY:")]
+    if len(miss_lines) != len(miss_records):
+        raise ValueError(
+            f"COBOL returned {len(miss_lines)} results for {len(miss_records)} records"
+        )
+    
+    if miss_records:
+        cache.put_many(miss_records, miss_lines)
+    
+    fresh = iter(miss_lines)
+    lines = [line if line is not None else next(fresh) for line in cached_lines]
+    
+    processed = sum(1 for line in lines if line.endswith("OK"))
+    errors = len(lines) - processed
+    lines.append(f"SUMMARY: PROCESSED={processed:05d} ERRORS={errors:05d}")
+    return lines
+
+
+def run_cached(
+    employees: List[EmployeePayrollInput],
+    engine: str,
+    run: Callable[[List[EmployeePayrollInput]], List[str]]
+) -> List[str]:
+    """
+    Run a batch through the engine's result cache.
+    
+    Only cache misses are passed to run (which calls COBOL); cached results
+    are merged back in their original positions. Without a cache the whole
+    batch goes to run.
+    
+    Args:
+        employees: Validated employee payroll input records
+        engine: Engine run uses (selects the cache)
+        run: Function that runs a list of employees through COBOL
+    
+    Returns:
+        Report lines for the whole batch with one trailing summary line
+    """
+    cache = get_result_cache(engine)
+    if cache is None:
+        return run(employees)
+    
+    records, cached_lines, misses = split_cache_misses(cache, employees)
+    miss_output = run(misses) if misses else []
+    return merge_cached_results(cache, records, cached_lines, miss_output)
+
+
+def build_payroll_results(
+    employees: List[EmployeePayrollInput],
+    output_lines: List[str]
+) -> PayrollResultSet:
+    """
+    Turn COBOL report lines into a compact PayrollResultSet.
+    
+    Parses the fixed-width records produced by the binary straight into
+    integer cents and attaches each employee's wallet address from the
+    original request. No Decimal is built here.
+    
+    The n-th result belongs to the n-th employee: COBOL processes the input
+    file record by record. Each result's ID is checked against its employee,
+    so a short, long or reordered report fails instead of mixing up wallets.
+    
+    Args:
+        employees: The employee records that were sent to COBOL
+        output_lines: Report lines (employee records and summary line)
+    
+    Returns:
+        PayrollResultSet with parsed results and summary counts
+    
+    Raises:
+        ValueError: If output parsing fails or the results don't line up with the employees
+    """
+    # Step 4: Parse output lines
+    # COBOL writes one result per input record, in input order, so results
+    # are joined to the request by position (duplicate IDs keep their own wallets)
+    results = PayrollResultSet()
+    
+    logger.info("Parsing COBOL output lines")
+    try:
+        index = 0
+        for line in output_lines:
+            # Check if this is the summary line
+            if line.startswith("SUMMARY:"):
+                summary = parse_summary_line(line)
+                results.processed = summary["processed"]
+                results.errors = summary["errors"]
+                logger.info(f"Parsed summary: {summary}")
+                continue
+            
+            if index == len(employees):
+                raise ValueError(f"COBOL returned more results than the {len(employees)} records it was sent")
+            employee = employees[index]
+            if line[0:10] != employee.employee_id.ljust(10)[:10]:
+                raise ValueError(
+                    f"Result {index + 1} is for employee {line[0:10].strip()!r}, "
+                    f"expected {employee.employee_id!r}"
+                )
+            results.append_report_line(line, employee.wallet_address)
+            index += 1
+        
+        if index != len(employees):
+            raise ValueError(f"COBOL returned {index} results for {len(employees)} records")
+        
+        logger.info(f"Successfully parsed {len(results)} employee results")
+    
+    except ValueError as e:
+        error_msg = f"Failed to parse output: {e}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    except Exception as e:
+        error_msg = f"Unexpected error during output parsing: {e}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+    
+    return results
+
+
+def build_payroll_response(
+    employees: List[EmployeePayrollInput],
+    output_lines: List[str]
+) -> PayrollResponse:
+    """
+    Turn COBOL report lines back into a PayrollResponse.
+    
+    Same as build_payroll_results(...).to_response(): amounts become Decimal
+    only at this boundary.
+    
+    Args:
+        employees: The employee records that were sent to COBOL
+        output_lines: Report lines (employee records and summary line)
+    
+    Returns:
+        PayrollResponse with parsed results and summary statistics
+    
+    Raises:
+        ValueError: If output parsing fails
+    """
+    # Step 5: Build and return response
+    return build_payroll_results(employees, output_lines).to_response()
+
+
+def process_payroll(
+    request: PayrollRequest,
+    engine: Optional[str] = None,
+    shard_size: Optional[int] = None,
+    parallelism: Optional[int] = None
+) -> PayrollResponse:
     """
     Main orchestration function for payroll processing.
     
     THE STITCHING: This is the master conductor that coordinates all components:
     1. Converts JSON to fixed-width format
-    2. Writes input file for COBOL
+    2. Writes input file for COBOL into the job's own work directory
     3. Executes the COBOL binary (where the real work happens)
     4. Reads COBOL output file
     5. Parses results back to JSON
     6. Returns structured response
     
     This function wraps all operations in comprehensive error handling to ensure
-    failures are reported clearly to the API consumer.
+    failures are reported clearly to the API consumer. Each call runs in its own
+    job workspace, so any number of calls can safely run at the same time.
+    Batches larger than the shard size are split across parallel COBOL processes.
     
     Example:
         request = PayrollRequest(employees=[
@@ -404,6 +1479,9 @@ def process_payroll(request: PayrollRequest) -> PayrollResponse:
     
     Args:
         request: PayrollRequest containing list of employees to process
+        engine: "subprocess", "pool", "inprocess" or "reference" (defaults to PAYROLL_ENGINE)
+        shard_size: Maximum records per COBOL job (defaults to PAYROLL_SHARD_SIZE)
+        parallelism: Maximum concurrent shards (defaults to PAYROLL_SHARD_PARALLELISM)
         
     Returns:
         PayrollResponse with processed results and summary statistics
@@ -416,128 +1494,67 @@ def process_payroll(request: PayrollRequest) -> PayrollResponse:
         ValueError: If output parsing fails
         Exception: For any other unexpected errors during processing
     """
+    return process_payroll_results(request, engine, shard_size, parallelism).to_response()
+
+
+def process_payroll_results(
+    request: PayrollRequest,
+    engine: Optional[str] = None,
+    shard_size: Optional[int] = None,
+    parallelism: Optional[int] = None
+) -> PayrollResultSet:
+    """
+    Run the payroll pipeline and keep the results as integer cents.
+    
+    Same steps, arguments and exceptions as process_payroll(), but returns
+    the compact PayrollResultSet so large batches never build per-employee
+    Decimal objects or Pydantic models. Convert with .to_response() or
+    .to_json() at the API boundary.
+    
+    Args:
+        request: PayrollRequest containing list of employees to process
+        engine: "subprocess", "pool", "inprocess" or "reference" (defaults to PAYROLL_ENGINE)
+        shard_size: Maximum records per COBOL job (defaults to PAYROLL_SHARD_SIZE)
+        parallelism: Maximum concurrent shards (defaults to PAYROLL_SHARD_PARALLELISM)
+    
+    Returns:
+        PayrollResultSet with processed results and summary counts
+    """
     logger.info(f"Starting payroll processing for {len(request.employees)} employees")
     
-    # Create a mapping of employee_id to wallet_address for later use
-    employee_wallet_map = {
-        emp.employee_id: emp.wallet_address 
-        for emp in request.employees
-    }
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown payroll engine: {engine} (expected one of {ENGINES})")
     
     try:
-        # Step 1: Write input file
-        # Convert JSON employee data to fixed-width format and write to data/input.dat
-        logger.info("Writing input file for COBOL processing")
-        try:
-            write_input_file(request.employees)
-            logger.info(f"Successfully wrote {len(request.employees)} records to data/input.dat")
-        except IOError as e:
-            error_msg = f"Failed to write input file: {e}"
-            logger.error(error_msg)
-            raise IOError(error_msg)
-        
-        # Step 2: Execute COBOL binary
-        # THE BRAIN DOES THE WORK: Invoke the legacy COBOL payroll engine
-        logger.info("Executing COBOL payroll binary")
-        try:
-            cobol_result = execute_cobol()
-            logger.info("COBOL execution completed successfully")
-        except FileNotFoundError as e:
-            error_msg = f"COBOL binary not found: {e}"
-            logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
-        except subprocess.TimeoutExpired as e:
-            error_msg = f"COBOL execution timed out: {e}"
-            logger.error(error_msg)
-            raise subprocess.TimeoutExpired(
-                cmd=e.cmd,
-                timeout=e.timeout,
-                output=e.output,
-                stderr=e.stderr
+        if reads_report_directly(engine):
+            # Steps 3-5: Each report is decoded straight into integer cents
+            results = run_sharded_results(
+                request.employees,
+                shard_size=shard_size or SHARD_SIZE,
+                parallelism=parallelism or SHARD_PARALLELISM
             )
-        except subprocess.CalledProcessError as e:
-            error_msg = f"COBOL execution failed with exit code {e.returncode}: {e.stderr}"
-            logger.error(error_msg)
-            raise subprocess.CalledProcessError(
-                returncode=e.returncode,
-                cmd=e.cmd,
-                output=e.output,
-                stderr=e.stderr
+        else:
+            # Only records the result cache hasn't seen go to COBOL
+            output_lines = run_cached(
+                request.employees,
+                engine,
+                lambda employees: run_sharded(
+                    employees,
+                    engine,
+                    shard_size=shard_size or SHARD_SIZE,
+                    parallelism=parallelism or SHARD_PARALLELISM
+                )
             )
-        except OSError as e:
-            error_msg = f"Failed to execute COBOL binary: {e}"
-            logger.error(error_msg)
-            raise OSError(error_msg)
         
-        # Step 3: Read output file
-        # Read the results produced by COBOL from data/output.rpt
-        logger.info("Reading COBOL output file")
-        try:
-            output_lines = read_output_file()
-            logger.info(f"Successfully read {len(output_lines)} lines from output file")
-        except FileNotFoundError as e:
-            error_msg = f"Output file not found: {e}"
-            logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
-        except IOError as e:
-            error_msg = f"Failed to read output file: {e}"
-            logger.error(error_msg)
-            raise IOError(error_msg)
-        
-        # Step 4: Parse output lines
-        # Separate employee results from summary line
-        results = []
-        summary = {"processed": 0, "errors": 0}
-        
-        logger.info("Parsing COBOL output lines")
-        try:
-            for line in output_lines:
-                # Check if this is the summary line
-                if line.startswith("SUMMARY:"):
-                    summary = parse_summary_line(line)
-                    logger.info(f"Parsed summary: {summary}")
-                else:
-                    # Parse employee result line
-                    parsed_result = parse_output_line(line)
-                    
-                    # Get wallet address from the mapping
-                    employee_id = parsed_result["employee_id"]
-                    wallet_address = employee_wallet_map.get(employee_id, "")
-            
-                    # Convert to EmployeePayrollOutput model
-                    result = EmployeePayrollOutput(
-                        employee_id=parsed_result["employee_id"],
-                        gross_pay=parsed_result["gross_pay"],
-                        federal_tax=parsed_result["federal_tax"],
-                        state_tax=parsed_result["state_tax"],
-                        net_pay=parsed_result["net_pay"],
-                        status=parsed_result["status"],
-                        wallet_address=wallet_address
-                    )
-                    results.append(result)
-        
-            logger.info(f"Successfully parsed {len(results)} employee results")
-            
-        except ValueError as e:
-            error_msg = f"Failed to parse output: {e}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        except Exception as e:
-            error_msg = f"Unexpected error during output parsing: {e}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
-        
-        # Step 5: Build and return response
-        response = PayrollResponse(
-            results=results,
-            summary=summary
-        )
+            # Steps 4-5: Parse output lines into integer cents
+            results = build_payroll_results(request.employees, output_lines)
         
         logger.info(
             f"Payroll processing completed successfully: "
-            f"{summary['processed']} processed, {summary['errors']} errors"
+            f"{results.processed} processed, {results.errors} errors"
         )
-        return response
+        return results
         
     except Exception as e:
         # Catch-all for any unexpected errors during processing
@@ -0,0 +1,502 @@
+"""
+Bulk upload of HR exports as fixed-width records or CSV.
+
+HR systems already export the 23-byte COBOL input record. Turning such a file
+into JSON, only for json_to_fixed_width() to turn it back, is pure overhead.
+This module reads the uploaded file block by block, checks whole blocks of
+records at once with the same rules as EmployeePayrollInput, and hands
+batches of lightweight UploadedEmployee tuples straight to the payroll
+pipeline - no JSON parsing and no Pydantic model per employee.
+
+Fixed-width file (one 23-byte record per line, as in data/input.dat):
+    EMP001    04000002550US
+    EMP002    03550002550US
+
+CSV file (header required; tax_code and wallet_address columns optional):
+    employee_id,hours_worked,hourly_rate,tax_code,wallet_address
+    EMP001,40.00,25.50,US,0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb2
+
+Wallet side file (CSV of employee_id,wallet_address; header optional):
+    EMP001,0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb2
+"""
+
+import re
+import csv
+import logging
+from decimal import Decimal
+from typing import AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("payroll_upload")
+
+UPLOAD_FORMATS = ("auto", "fixed", "csv")
+
+# Fixed-width record layout (see json_to_fixed_width)
+RECORD_LENGTH = 23
+ID_WIDTH = 10
+HOURS_SLICE = slice(10, 15)
+RATE_SLICE = slice(15, 21)
+TAX_SLICE = slice(21, 23)
+
+WALLET_LENGTH = 42
+
+# Upload files are read this many bytes at a time
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Longest line accepted in either format
+MAX_LINE_BYTES = 64 * 1024
+
+# Errors reported per 422 response
+MAX_REPORTED_ERRORS = 100
+
+# Plain decimal number as accepted in CSV amount columns
+DECIMAL_PATTERN = re.compile(r"\s*(\d*)(?:\.(\d*))?\s*")
+
+
+class UploadedEmployee(NamedTuple):
+    """
+    One uploaded employee, with the fields of EmployeePayrollInput.
+    
+    Already validated by this module, so it can go through the payroll
+    pipeline wherever an EmployeePayrollInput is expected.
+    """
+    employee_id: str
+    hours_worked: Decimal
+    hourly_rate: Decimal
+    tax_code: str
+    wallet_address: str
+
+
+class UploadValidationError(ValueError):
+    """
+    Invalid upload.
+    
+    errors uses the shape of Pydantic/FastAPI validation errors, with loc
+    ("body", <file field>, <line number>, <field>), so it can be raised as
+    a 422 RequestValidationError.
+    """
+    
+    def __init__(self, errors: List[Dict]):
+        super().__init__(f"Invalid upload: {errors[0]['msg']}")
+        self.errors = errors
+
+
+def _error(error_type: str, loc: Tuple, msg: str, value=None) -> Dict:
+    return {"type": error_type, "loc": loc, "msg": msg, "input": value}
+
+
+def _check_wallet(wallet: str, loc: Tuple) -> List[Dict]:
+    if len(wallet) != WALLET_LENGTH:
+        return [_error(
+            "string_length", loc,
+            f"Wallet address should have exactly {WALLET_LENGTH} characters", wallet
+        )]
+    return []
+
+
+def parse_wallet_file(data: bytes) -> Dict[str, str]:
+    """
+    Read a wallet side file into an employee_id -> wallet_address mapping.
+    
+    Args:
+        data: CSV of employee_id,wallet_address rows (a header row is skipped)
+    
+    Returns:
+        Mapping of employee ID to wallet address
+    
+    Raises:
+        UploadValidationError: On malformed rows, bad wallets or conflicting duplicates
+    """
+    wallets: Dict[str, str] = {}
+    errors: List[Dict] = []
+    rows = csv.reader(data.decode("utf-8-sig", errors="replace").splitlines())
+    
+    for line_number, row in enumerate(rows, start=1):
+        if not row or not "".join(row).strip():
+            continue
+        if line_number == 1 and row[0].strip().lower() == "employee_id":
+            continue
+        
+        loc = ("body", "wallets", line_number)
+        if len(row) != 2:
+            errors.append(_error(
+                "value_error", loc, "Expected 2 columns: employee_id,wallet_address", ",".join(row)
+            ))
+            continue
+        
+        employee_id, wallet = row[0].strip(), row[1].strip()
+        row_errors = _check_wallet(wallet, loc + ("wallet_address",))
+        if not row_errors and wallets.get(employee_id, wallet) != wallet:
+            row_errors.append(_error(
+                "value_error", loc + ("employee_id",),
+                f"Conflicting wallet addresses for employee {employee_id}", employee_id
+            ))
+        errors.extend(row_errors)
+        wallets[employee_id] = wallet
+        
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+    
+    if errors:
+        raise UploadValidationError(errors[:MAX_REPORTED_ERRORS])
+    return wallets
+
+
+def check_fixed_width_record(line: str, loc: Tuple) -> List[Dict]:
+    """
+    Validate one fixed-width record with the EmployeePayrollInput rules.
+    
+    Args:
+        line: The record without its line terminator
+        loc: Error location prefix ("body", "records", line number)
+    
+    Returns:
+        Validation errors (empty if the record is valid)
+    """
+    if len(line) != RECORD_LENGTH or not line.isascii():
+        return [_error(
+            "string_length", loc,
+            f"Record should be exactly {RECORD_LENGTH} ASCII characters", line
+        )]
+    
+    errors = []
+    if not line[:ID_WIDTH].strip():
+        errors.append(_error(
+            "string_too_short", loc + ("employee_id",), "Employee ID should not be blank", line[:ID_WIDTH]
+        ))
+    for field, digits in (("hours_worked", line[HOURS_SLICE]), ("hourly_rate", line[RATE_SLICE])):
+        if not digits.isdigit():
+            errors.append(_error(
+                "decimal_parsing", loc + (field,), "Input should be a valid decimal", digits
+            ))
+        elif int(digits) == 0:
+            errors.append(_error(
+                "greater_than", loc + (field,), "Input should be greater than 0", digits
+            ))
+    return errors
+
+
+def _scan_fixed_width_block(block: bytes) -> Optional[np.ndarray]:
+    """
+    Vectorised pre-check of a block of '\\n'-terminated 23-byte records.
+    
+    Returns:
+        Indices of records that need a closer look, or None if the block
+        isn't uniformly laid out (CRLF, blank lines, wrong lengths)
+    """
+    line_length = RECORD_LENGTH + 1
+    if len(block) % line_length:
+        return None
+    rows = np.frombuffer(block, dtype=np.uint8).reshape(-1, line_length)
+    if not (rows[:, RECORD_LENGTH] == ord("\n")).all():
+        return None
+    
+    record = rows[:, :RECORD_LENGTH]
+    amounts = rows[:, HOURS_SLICE.start:RATE_SLICE.stop]
+    valid = (
+        ((record >= 32) & (record < 127)).all(axis=1)
+        & (rows[:, :ID_WIDTH] != ord(" ")).any(axis=1)
+        & ((amounts >= ord("0")) & (amounts <= ord("9"))).all(axis=1)
+        & (rows[:, HOURS_SLICE] != ord("0")).any(axis=1)
+        & (rows[:, RATE_SLICE] != ord("0")).any(axis=1)
+    )
+    return np.flatnonzero(~valid)
+
+
+def _amount(digits: str) -> Decimal:
+    """Implied-two-decimals digits as a Decimal ("04000" -> Decimal("40.00"))."""
+    return Decimal(digits).scaleb(-2)
+
+
+def parse_fixed_width_block(
+    block: bytes,
+    first_line: int,
+    wallets: Dict[str, str]
+) -> List[UploadedEmployee]:
+    """
+    Validate and convert a block of complete fixed-width lines.
+    
+    Uniform blocks are checked column-wise in one NumPy pass and only
+    suspicious records are checked one by one; other blocks are checked
+    record by record. The rules are the same either way.
+    
+    Args:
+        block: Complete lines of the upload
+        first_line: Line number of the block's first line (1-based)
+        wallets: employee_id -> wallet_address from the side file
+    
+    Returns:
+        UploadedEmployee per record, in file order (blank lines skipped)
+    
+    Raises:
+        UploadValidationError: If any record in the block is invalid
+    """
+    suspicious = _scan_fixed_width_block(block)
+    text = block.decode("ascii", errors="replace")
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    
+    if suspicious is None:
+        checked = range(len(lines))
+    else:
+        checked = suspicious.tolist()
+    
+    errors: List[Dict] = []
+    for index in checked:
+        line = lines[index].rstrip("\r")
+        if suspicious is None and not line.strip():
+            continue
+        errors.extend(check_fixed_width_record(line, ("body", "records", first_line + index)))
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+    if errors:
+        raise UploadValidationError(errors[:MAX_REPORTED_ERRORS])
+    
+    employees = []
+    for index, line in enumerate(lines):
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+        line = line.rstrip("\r")
+        if not line.strip():
+            continue
+        employee_id = line[:ID_WIDTH].rstrip()
+        wallet = wallets.get(employee_id)
+        if wallet is None:
+            errors.append(_error(
+                "missing", ("body", "records", first_line + index, "wallet_address"),
+                f"No wallet address for employee {employee_id}", employee_id
+            ))
+            continue
+        employees.append(UploadedEmployee(
+            employee_id,
+            _amount(line[HOURS_SLICE]),
+            _amount(line[RATE_SLICE]),
+            line[TAX_SLICE],
+            wallet
+        ))
+    
+    if errors:
+        raise UploadValidationError(errors[:MAX_REPORTED_ERRORS])
+    return employees
+
+
+def _is_record_text(value: str) -> bool:
+    """Printable ASCII only, as the fixed-width record stores one byte per character."""
+    return value.isascii() and value.isprintable()
+
+
+def _parse_decimal(value: str, integer_digits: int, loc: Tuple) -> Tuple[Optional[Decimal], List[Dict]]:
+    """Check a CSV amount the way EmployeePayrollInput's Decimal fields do."""
+    match = DECIMAL_PATTERN.fullmatch(value)
+    if match is None or not (match.group(1) or match.group(2)):
+        return None, [_error("decimal_parsing", loc, "Input should be a valid decimal", value)]
+    
+    whole = match.group(1).lstrip("0")
+    fraction = (match.group(2) or "").rstrip("0")
+    if len(fraction) > 2:
+        return None, [_error(
+            "decimal_max_places", loc, "Decimal input should have no more than 2 decimal places", value
+        )]
+    if len(whole) > integer_digits:
+        return None, [_error(
+            "decimal_whole_digits", loc,
+            f"Decimal input should have no more than {integer_digits} digits before the decimal point", value
+        )]
+    
+    amount = Decimal(value.strip())
+    if amount <= 0:
+        return None, [_error("greater_than", loc, "Input should be greater than 0", value)]
+    return amount, []
+
+
+def parse_csv_rows(
+    rows: Iterator[Tuple[int, List[str]]],
+    columns: Dict[str, int],
+    wallets: Dict[str, str]
+) -> List[UploadedEmployee]:
+    """
+    Validate and convert CSV rows.
+    
+    Args:
+        rows: (line number, row) pairs
+        columns: Header column name -> index
+        wallets: employee_id -> wallet_address from the side file
+    
+    Returns:
+        UploadedEmployee per row, in file order (empty rows skipped)
+    
+    Raises:
+        UploadValidationError: If any row is invalid
+    """
+    id_column = columns["employee_id"]
+    hours_column = columns["hours_worked"]
+    rate_column = columns["hourly_rate"]
+    tax_column = columns.get("tax_code")
+    wallet_column = columns.get("wallet_address")
+    width = len(columns)
+    
+    employees = []
+    errors: List[Dict] = []
+    for line_number, row in rows:
+        if not row or not "".join(row).strip():
+            continue
+        loc = ("body", "records", line_number)
+        if len(row) != width:
+            errors.append(_error("value_error", loc, f"Expected {width} columns, got {len(row)}", ",".join(row)))
+            continue
+        
+        row_errors = []
+        employee_id = row[id_column]
+        if not 1 <= len(employee_id) <= ID_WIDTH:
+            row_errors.append(_error(
+                "string_length", loc + ("employee_id",),
+                f"Employee ID should have 1 to {ID_WIDTH} characters", employee_id
+            ))
+        elif not _is_record_text(employee_id):
+            row_errors.append(_error(
+                "string_pattern_mismatch", loc + ("employee_id",),
+                "Employee ID should only contain printable ASCII characters", employee_id
+            ))
+        
+        hours, hours_errors = _parse_decimal(row[hours_column], 3, loc + ("hours_worked",))
+        rate, rate_errors = _parse_decimal(row[rate_column], 4, loc + ("hourly_rate",))
+        row_errors += hours_errors + rate_errors
+        
+        tax_code = row[tax_column] if tax_column is not None else "US"
+        if len(tax_code) != 2:
+            row_errors.append(_error(
+                "string_length", loc + ("tax_code",), "Tax code should have exactly 2 characters", tax_code
+            ))
+        elif not _is_record_text(tax_code):
+            row_errors.append(_error(
+                "string_pattern_mismatch", loc + ("tax_code",),
+                "Tax code should only contain printable ASCII characters", tax_code
+            ))
+        
+        wallet = (row[wallet_column].strip() if wallet_column is not None else "") or wallets.get(employee_id)
+        if not wallet:
+            row_errors.append(_error(
+                "missing", loc + ("wallet_address",), f"No wallet address for employee {employee_id}", employee_id
+            ))
+        else:
+            row_errors += _check_wallet(wallet, loc + ("wallet_address",))
+        
+        if row_errors:
+            errors.extend(row_errors)
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                break
+            continue
+        employees.append(UploadedEmployee(employee_id, hours, rate, tax_code, wallet))
+    
+    if errors:
+        raise UploadValidationError(errors[:MAX_REPORTED_ERRORS])
+    return employees
+
+
+def read_csv_header(line: str) -> Dict[str, int]:
+    """
+    Map the CSV header's column names to indices.
+    
+    Raises:
+        UploadValidationError: If a required column is missing
+    """
+    header = next(csv.reader([line]), [])
+    columns = {name.strip().lower(): index for index, name in enumerate(header)}
+    missing = [name for name in ("employee_id", "hours_worked", "hourly_rate") if name not in columns]
+    if missing:
+        raise UploadValidationError([_error(
+            "missing", ("body", "records", 1),
+            f"CSV header is missing column(s): {', '.join(missing)}", line
+        )])
+    return columns
+
+
+async def iter_line_blocks(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Regroup raw chunks into blocks of complete lines.
+    
+    Yields:
+        (line number of the block's first line, block) - every block ends
+        with a newline, except possibly the last one
+    
+    Raises:
+        UploadValidationError: If a line is longer than max_line_bytes
+    """
+    buffer = b""
+    line_number = 1
+    async for chunk in chunks:
+        buffer += chunk
+        cut = buffer.rfind(b"\n") + 1
+        if cut:
+            block, buffer = buffer[:cut], buffer[cut:]
+            yield line_number, block
+            line_number += block.count(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise UploadValidationError([_error(
+                "line_too_long", ("body", "records", line_number),
+                f"Line longer than {max_line_bytes} bytes"
+            )])
+    if buffer:
+        yield line_number, buffer
+
+
+async def iter_upload_batches(
+    chunks: AsyncIterator[bytes],
+    upload_format: str,
+    wallets: Dict[str, str],
+    batch_size: int
+) -> AsyncIterator[List[UploadedEmployee]]:
+    """
+    Validate an uploaded file as it is read and yield employee batches.
+    
+    Args:
+        chunks: Raw file chunks
+        upload_format: "fixed" or "csv"
+        wallets: employee_id -> wallet_address from the side file
+        batch_size: Employees per yielded batch
+    
+    Yields:
+        Lists of up to batch_size UploadedEmployee, in file order
+    
+    Raises:
+        UploadValidationError: On the first block with invalid records, or if there are none
+    """
+    if upload_format not in ("fixed", "csv"):
+        raise ValueError(f"Unknown upload format: {upload_format} (expected 'fixed' or 'csv')")
+    if batch_size < 1:
+        raise ValueError(f"Batch size must be at least 1, got: {batch_size}")
+    
+    pending: List[UploadedEmployee] = []
+    columns: Optional[Dict[str, int]] = None
+    total = 0
+    
+    async for first_line, block in iter_line_blocks(chunks):
+        if upload_format == "fixed":
+            pending.extend(parse_fixed_width_block(block, first_line, wallets))
+        else:
+            lines = block.decode("utf-8-sig" if first_line == 1 else "utf-8", errors="replace").splitlines()
+            numbered = enumerate(lines, start=first_line)
+            if columns is None:
+                columns = read_csv_header(lines[0] if lines else "")
+                next(numbered)
+            rows = ((line_number, next(csv.reader([line]), [])) for line_number, line in numbered)
+            pending.extend(parse_csv_rows(rows, columns, wallets))
+        
+        while len(pending) >= batch_size:
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            total += len(batch)
+            yield batch
+    
+    total += len(pending)
+    if total == 0:
+        raise UploadValidationError([_error(
+            "too_short", ("body", "records"), "Upload must contain at least 1 employee"
+        )])
+    if pending:
+        yield pending
+    logger.info(f"Ingested {total} employees from {upload_format} upload")
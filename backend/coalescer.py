@@ -0,0 +1,208 @@
+"""
+Micro-batching of small payroll requests.
+
+Most traffic is 1-5 employee requests, and each one used to pay for a whole
+COBOL run. PayrollCoalescer holds requests for a short window (or until a
+record limit is reached), runs them as one COBOL job, and hands every caller
+exactly its own slice of the results with its own summary.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from backend.models import PayrollRequest
+from backend.payroll_results import PayrollResultSet
+
+logger = logging.getLogger("payroll_coalescer")
+
+# (request, future for its results, loop time when it was queued)
+PendingRequest = Tuple[PayrollRequest, "asyncio.Future[PayrollResultSet]", float]
+
+
+class PayrollCoalescer:
+    """
+    Gathers concurrent payroll requests into shared COBOL runs.
+    
+    A batch is flushed when the first queued request has waited window
+    seconds, or as soon as the queued requests reach max_records employees.
+    Requests that are already max_records or larger bypass the queue.
+    
+    If a shared run fails, each request of that batch is retried on its own,
+    so one request can never fail the others.
+    
+    Example:
+        coalescer = PayrollCoalescer(process_payroll_results_async, window=0.02)
+        results = await coalescer.submit(request)
+    """
+    
+    def __init__(
+        self,
+        run: Callable[[PayrollRequest], Awaitable[PayrollResultSet]],
+        window: float = 0.02,
+        max_records: int = 1000
+    ):
+        """
+        Create a coalescer.
+        
+        Args:
+            run: Coroutine function that processes one (combined) request
+            window: Seconds the first request of a batch may wait for company
+            max_records: Employee count that flushes a batch immediately
+        """
+        if window <= 0 or max_records < 1:
+            raise ValueError(
+                f"Coalescing window and max records must be positive, got: {window}, {max_records}"
+            )
+        
+        self.window = window
+        self.max_records = max_records
+        self._run = run
+        
+        self._pending: List[PendingRequest] = []
+        self._pending_records = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        
+        self.batches = 0
+        self.requests = 0
+        self.records = 0
+        self.max_batch_records = 0
+        self.bypassed = 0
+        self.isolated_retries = 0
+        self._total_wait = 0.0
+        self.max_wait = 0.0
+    
+    async def submit(self, request: PayrollRequest) -> PayrollResultSet:
+        """
+        Queue a request and wait for its results.
+        
+        Args:
+            request: Validated payroll request
+        
+        Returns:
+            PayrollResultSet with only this request's employees and summary
+        
+        Raises:
+            Exception: Whatever processing this request on its own raised
+        """
+        count = len(request.employees)
+        if count >= self.max_records:
+            self.bypassed += 1
+            return await self._run(request)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future, loop.time()))
+        self._pending_records += count
+        
+        if self._pending_records >= self.max_records:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        """Start a run for everything queued so far."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        self._pending_records = 0
+        if not batch:
+            return
+        
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    def _record_metrics(self, batch: List[PendingRequest], started: float) -> int:
+        """Update batch size and wait time metrics; return the batch's record count."""
+        records = sum(len(request.employees) for request, _, _ in batch)
+        waits = [started - queued for _, _, queued in batch]
+        
+        self.batches += 1
+        self.requests += len(batch)
+        self.records += records
+        self.max_batch_records = max(self.max_batch_records, records)
+        self._total_wait += sum(waits)
+        self.max_wait = max(self.max_wait, max(waits))
+        return records
+    
+    async def _run_batch(self, batch: List[PendingRequest]) -> None:
+        """Run one combined COBOL job and hand each caller its slice."""
+        started = asyncio.get_running_loop().time()
+        records = self._record_metrics(batch, started)
+        logger.info(f"Coalesced {len(batch)} requests ({records} employees) into one run")
+        
+        combined = PayrollRequest.model_construct(employees=[
+            emp for request, _, _ in batch for emp in request.employees
+        ])
+        
+        try:
+            results = await self._run(combined)
+        except Exception as e:
+            if len(batch) == 1:
+                _, future, _ = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            logger.warning(f"Coalesced run failed ({e}), retrying its {len(batch)} requests one by one")
+            await self._run_isolated(batch)
+            return
+        
+        offset = 0
+        for request, future, _ in batch:
+            count = len(request.employees)
+            part = results.slice(offset, offset + count)
+            offset += count
+            if not future.done():
+                future.set_result(part)
+    
+    async def _run_isolated(self, batch: List[PendingRequest]) -> None:
+        """Run each request of a failed batch on its own."""
+        self.isolated_retries += len(batch)
+        
+        async def run_one(request: PayrollRequest, future: asyncio.Future) -> None:
+            try:
+                result = await self._run(request)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+        
+        await asyncio.gather(*(run_one(request, future) for request, future, _ in batch))
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Return batch size and added wait time metrics.
+        
+        Returns:
+            Dictionary with batch/request/record counts, average and maximum
+            batch size, average and maximum added wait in milliseconds
+        """
+        batches = self.batches or 1
+        requests = self.requests or 1
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "records": self.records,
+            "bypassed": self.bypassed,
+            "isolated_retries": self.isolated_retries,
+            "avg_requests_per_batch": round(self.requests / batches, 2),
+            "avg_records_per_batch": round(self.records / batches, 2),
+            "max_records_per_batch": self.max_batch_records,
+            "avg_wait_ms": round(self._total_wait / requests * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "pending_requests": len(self._pending)
+        }
+    
+    async def close(self) -> None:
+        """Flush queued requests and wait for running batches to finish."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
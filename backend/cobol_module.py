@@ -0,0 +1,136 @@
+"""
+In-process COBOL engine.
+
+Loads PAYCALC (cobol/paycalc.cbl compiled with `cobc -m`) as a shared object
+and calls it through ctypes. Input records are handed over as one memory
+buffer and results come back in a second buffer - no process spawn, no
+input.dat/output.rpt.
+"""
+
+import os
+import ctypes
+import ctypes.util
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger("payroll_module")
+
+INPUT_RECORD_LENGTH = 23
+OUTPUT_RECORD_LENGTH = 60
+
+# Must match the OCCURS limit of LK-INPUT-RECORD / LK-OUTPUT-RECORD in paycalc.cbl
+MAX_RECORDS_PER_CALL = 100000
+
+
+class CobolModule:
+    """
+    Wrapper around the PAYCALC shared object.
+    
+    The libcob runtime is initialised once per process. COBOL WORKING-STORAGE
+    is static, so calls are serialised with a lock; run shards on the pool or
+    subprocess engines when you need several cores.
+    
+    Example:
+        module = CobolModule("cobol/bin/paycalc.so")
+        lines = module.run_job(["EMP001    04000002550US"])
+        # ["EMP001    000000102000000000015300000000005100000000081600OK",
+        #  "SUMMARY: PROCESSED=00001 ERRORS=00000"]
+    """
+    
+    def __init__(self, module_path: str, libcob_path: Optional[str] = None):
+        """
+        Load libcob and the PAYCALC module.
+        
+        Args:
+            module_path: Path to the compiled PAYCALC shared object
+            libcob_path: Path to libcob (found automatically when None)
+        
+        Raises:
+            FileNotFoundError: If the module or the libcob runtime can't be found
+            OSError: If either library fails to load
+        """
+        if not os.path.exists(module_path):
+            raise FileNotFoundError(
+                f"COBOL module not found at {module_path}. "
+                "Please compile cobol/paycalc.cbl with cobc -m first."
+            )
+        
+        libcob_path = libcob_path or ctypes.util.find_library("cob")
+        if not libcob_path:
+            raise FileNotFoundError("libcob runtime not found. Please install GnuCOBOL.")
+        
+        # RTLD_GLOBAL so the module resolves its libcob symbols against this copy
+        self._libcob = ctypes.CDLL(libcob_path, mode=ctypes.RTLD_GLOBAL)
+        self._libcob.cob_init.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
+        self._libcob.cob_init.restype = None
+        self._libcob.cob_init(0, None)
+        
+        self._module = ctypes.CDLL(module_path)
+        self._paycalc = self._module.PAYCALC
+        self._paycalc.restype = ctypes.c_int
+        
+        self.module_path = module_path
+        self._lock = threading.Lock()
+        
+        logger.info(f"Loaded COBOL module {module_path} (libcob: {libcob_path})")
+    
+    def _call(self, input_buffer: bytearray, count: int) -> Tuple[bytearray, int, int]:
+        """Call PAYCALC once for up to MAX_RECORDS_PER_CALL records."""
+        output_buffer = bytearray(count * OUTPUT_RECORD_LENGTH)
+        record_count = ctypes.c_int32(count)
+        processed = ctypes.c_int32(0)
+        errors = ctypes.c_int32(0)
+        
+        # from_buffer() shares memory with the bytearrays - nothing is copied
+        input_view = (ctypes.c_char * len(input_buffer)).from_buffer(input_buffer)
+        output_view = (ctypes.c_char * len(output_buffer)).from_buffer(output_buffer)
+        
+        with self._lock:
+            self._paycalc(
+                ctypes.byref(record_count),
+                input_view,
+                output_view,
+                ctypes.byref(processed),
+                ctypes.byref(errors)
+            )
+        
+        del input_view, output_view  # Release the buffer exports
+        return output_buffer, processed.value, errors.value
+    
+    def run_job(self, records: List[str]) -> List[str]:
+        """
+        Run one payroll job in-process.
+        
+        Args:
+            records: 23-byte fixed-width input records
+        
+        Returns:
+            Result lines in input order followed by the summary line,
+            the same lines read_output_file() returns for output.rpt
+        
+        Raises:
+            ValueError: If a record is not exactly 23 ASCII bytes
+        """
+        lines = []
+        processed = 0
+        errors = 0
+        
+        for start in range(0, len(records), MAX_RECORDS_PER_CALL):
+            chunk = records[start:start + MAX_RECORDS_PER_CALL]
+            input_buffer = bytearray("".join(chunk).encode("ascii"))
+            if len(input_buffer) != len(chunk) * INPUT_RECORD_LENGTH:
+                raise ValueError("Every input record must be exactly 23 bytes")
+            
+            output_buffer, chunk_processed, chunk_errors = self._call(input_buffer, len(chunk))
+            processed += chunk_processed
+            errors += chunk_errors
+            
+            output = output_buffer.decode("ascii")
+            lines.extend(
+                output[offset:offset + OUTPUT_RECORD_LENGTH]
+                for offset in range(0, len(output), OUTPUT_RECORD_LENGTH)
+            )
+        
+        lines.append(f"SUMMARY: PROCESSED={processed:05d} ERRORS={errors:05d}")
+        return lines
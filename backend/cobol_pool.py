@@ -0,0 +1,347 @@
+"""
+Persistent COBOL worker pool.
+
+Keeps a set of long-lived PAYROLL-WORKER processes (cobol/payroll_worker.cbl)
+running so each request no longer pays fork/exec and libcob startup.
+
+Each worker reads 23-byte records on stdin and answers with 60-byte result
+lines on stdout. A record made of 23 asterisks ends a job: the worker replies
+with the "SUMMARY: PROCESSED=nnnnn ERRORS=nnnnn" line and resets its counters.
+"""
+
+import os
+import queue
+import logging
+import threading
+import subprocess
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("payroll_pool")
+
+# Record that frames the end of a job. Real records always carry digits in the
+# hours/rate positions, so this can never collide with employee data.
+END_OF_JOB_MARKER = "*" * 23
+
+# Records written per round-trip. Each chunk's output (61 bytes per record) stays
+# well under the 64 KiB pipe buffer, so the worker never blocks on a full stdout
+# while we are still writing its stdin.
+CHUNK_SIZE = 512
+
+
+class WorkerError(RuntimeError):
+    """Raised when a COBOL worker dies, times out, or breaks the protocol"""
+    pass
+
+
+class CobolWorker:
+    """
+    A single long-lived PAYROLL-WORKER process.
+    
+    Jobs are exchanged in lock-step chunks: write up to CHUNK_SIZE records,
+    read exactly as many result lines back, then send the end-of-job marker
+    and read the summary line.
+    """
+    
+    def __init__(self, binary_path: str, worker_id: int = 0):
+        """
+        Start a worker process.
+        
+        Args:
+            binary_path: Path to the compiled payroll_worker binary
+            worker_id: Index of the worker inside its pool (for logging)
+        
+        Raises:
+            FileNotFoundError: If the worker binary doesn't exist
+        """
+        if not os.path.exists(binary_path):
+            raise FileNotFoundError(
+                f"COBOL worker binary not found at {binary_path}. "
+                "Please compile cobol/payroll_worker.cbl first."
+            )
+        
+        self.binary_path = binary_path
+        self.worker_id = worker_id
+        self.jobs_completed = 0
+        self.broken = False  # Set once the stdin/stdout framing can't be trusted
+        self.process = subprocess.Popen(
+            [binary_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1  # Line buffered
+        )
+        
+        # Drain stderr in the background so a chatty worker can't fill the pipe
+        self._stderr_thread = threading.Thread(
+            target=self._log_stderr,
+            name=f"cobol-worker-{worker_id}-stderr",
+            daemon=True
+        )
+        self._stderr_thread.start()
+        
+        logger.info(f"Started COBOL worker {worker_id} (pid {self.process.pid})")
+    
+    def _log_stderr(self) -> None:
+        """Forward worker stderr to the log."""
+        for line in self.process.stderr:
+            if line.strip():
+                logger.warning(f"COBOL worker {self.worker_id} stderr: {line.rstrip()}")
+    
+    def is_alive(self) -> bool:
+        """Return True while the worker process is running and its framing is intact."""
+        return not self.broken and self.process.poll() is None
+    
+    def _read_line(self) -> str:
+        """Read one response line, raising WorkerError if the worker went away."""
+        line = self.process.stdout.readline()
+        if not line:
+            self.broken = True
+            raise WorkerError(
+                f"COBOL worker {self.worker_id} closed its output "
+                f"(returncode {self.process.poll()})"
+            )
+        return line.rstrip("\r\n")
+    
+    def run_job(self, records: List[str], timeout: Optional[float] = 30) -> List[str]:
+        """
+        Send one job through the worker.
+        
+        Example:
+            lines = worker.run_job(["EMP001    04000002550US"])
+            # Returns:
+            # [
+            #   "EMP001    000000102000000000015300000000005100000000081600OK",
+            #   "SUMMARY: PROCESSED=00001 ERRORS=00000"
+            # ]
+        
+        Args:
+            records: 23-byte fixed-width input records
+            timeout: Seconds before the worker is killed (None = no limit)
+        
+        Returns:
+            Result lines in input order followed by the summary line,
+            the same lines read_output_file() returns for output.rpt
+        
+        Raises:
+            WorkerError: If the worker dies, times out, or sends a bad frame
+        """
+        # A hung worker is killed, which turns the blocking readline() into EOF
+        watchdog = None
+        if timeout is not None:
+            watchdog = threading.Timer(timeout, self.kill)
+            watchdog.daemon = True
+            watchdog.start()
+        
+        try:
+            lines = []
+            for start in range(0, len(records), CHUNK_SIZE):
+                chunk = records[start:start + CHUNK_SIZE]
+                self.process.stdin.write("".join(record + "\n" for record in chunk))
+                self.process.stdin.flush()
+                for _ in chunk:
+                    lines.append(self._read_line())
+            
+            self.process.stdin.write(END_OF_JOB_MARKER + "\n")
+            self.process.stdin.flush()
+            summary_line = self._read_line()
+        except (BrokenPipeError, ValueError, OSError) as e:
+            self.broken = True
+            raise WorkerError(f"COBOL worker {self.worker_id} pipe failed: {e}")
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+        
+        if not summary_line.startswith("SUMMARY:"):
+            self.broken = True
+            raise WorkerError(
+                f"COBOL worker {self.worker_id} sent an invalid job frame: {summary_line!r}"
+            )
+        
+        self.jobs_completed += 1
+        lines.append(summary_line.strip())
+        return lines
+    
+    def ping(self, timeout: float = 5) -> bool:
+        """
+        Health check: run an empty job and expect a zero summary back.
+        
+        Returns:
+            True if the worker answered correctly within timeout
+        """
+        try:
+            return self.run_job([], timeout=timeout) == [
+                "SUMMARY: PROCESSED=00000 ERRORS=00000"
+            ]
+        except WorkerError as e:
+            logger.warning(f"COBOL worker {self.worker_id} failed health check: {e}")
+            return False
+    
+    def kill(self) -> None:
+        """Terminate the worker immediately."""
+        self.broken = True
+        if self.process.poll() is None:
+            logger.warning(f"Killing COBOL worker {self.worker_id} (pid {self.process.pid})")
+            self.process.kill()
+    
+    def close(self, timeout: float = 5) -> None:
+        """Close stdin so the worker reaches end of input and stops, then reap it."""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+            self.process.wait()
+
+
+class CobolWorkerPool:
+    """
+    Fixed-size pool of COBOL workers.
+    
+    Jobs check out an idle worker, run, and return it. Dead or misbehaving
+    workers are replaced on the spot, and an optional background thread
+    pings idle workers at a fixed interval.
+    
+    Example:
+        pool = CobolWorkerPool("cobol/bin/payroll_worker", size=4)
+        lines = pool.run_job(records)
+        pool.close()
+    """
+    
+    def __init__(
+        self,
+        binary_path: str,
+        size: int = 4,
+        job_timeout: Optional[float] = 30,
+        health_check_interval: Optional[float] = 30
+    ):
+        """
+        Start the pool and all of its workers.
+        
+        Args:
+            binary_path: Path to the compiled payroll_worker binary
+            size: Number of worker processes
+            job_timeout: Per-job timeout in seconds (None = no limit)
+            health_check_interval: Seconds between background health checks
+                                   (None or 0 disables the health thread)
+        """
+        if size < 1:
+            raise ValueError(f"Worker pool size must be at least 1, got: {size}")
+        
+        self.binary_path = binary_path
+        self.size = size
+        self.job_timeout = job_timeout
+        self.restarts = 0
+        self._idle: "queue.Queue[CobolWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        
+        for worker_id in range(size):
+            self._idle.put(CobolWorker(binary_path, worker_id))
+        
+        self._health_thread = None
+        if health_check_interval:
+            self._health_thread = threading.Thread(
+                target=self._health_loop,
+                args=(health_check_interval,),
+                name="cobol-pool-health",
+                daemon=True
+            )
+            self._health_thread.start()
+        
+        logger.info(f"COBOL worker pool ready: {size} workers ({binary_path})")
+    
+    def _replace(self, worker: CobolWorker) -> CobolWorker:
+        """Kill a broken worker and start a fresh one in its slot."""
+        worker.kill()
+        with self._lock:
+            self.restarts += 1
+        logger.warning(f"Restarting COBOL worker {worker.worker_id}")
+        return CobolWorker(self.binary_path, worker.worker_id)
+    
+    def run_job(self, records: List[str]) -> List[str]:
+        """
+        Run one job on the next idle worker.
+        
+        If the worker crashes mid-job it is restarted and the job is retried
+        once on the fresh worker.
+        
+        Args:
+            records: 23-byte fixed-width input records
+        
+        Returns:
+            Result lines in input order followed by the summary line
+        
+        Raises:
+            WorkerError: If the job fails on two workers in a row or the pool is closed
+        """
+        if self._closed.is_set():
+            raise WorkerError("COBOL worker pool is closed")
+        
+        worker = self._idle.get()
+        try:
+            if not worker.is_alive():
+                worker = self._replace(worker)
+            try:
+                return worker.run_job(records, timeout=self.job_timeout)
+            except WorkerError as e:
+                logger.error(f"COBOL worker {worker.worker_id} failed, retrying job: {e}")
+                worker = self._replace(worker)
+                return worker.run_job(records, timeout=self.job_timeout)
+        finally:
+            if worker.is_alive():
+                self._idle.put(worker)
+            else:
+                self._idle.put(self._replace(worker))
+    
+    def health_check(self) -> Dict[str, int]:
+        """
+        Ping every idle worker and restart any that fail.
+        
+        Busy workers are skipped; they are checked when their job returns.
+        
+        Returns:
+            Dictionary with healthy, restarted and busy worker counts
+        """
+        checked = []
+        while True:
+            try:
+                checked.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        
+        healthy = 0
+        restarted = 0
+        for worker in checked:
+            if worker.is_alive() and worker.ping():
+                healthy += 1
+                self._idle.put(worker)
+            else:
+                restarted += 1
+                self._idle.put(self._replace(worker))
+        
+        return {
+            "healthy": healthy,
+            "restarted": restarted,
+            "busy": self.size - len(checked)
+        }
+    
+    def _health_loop(self, interval: float) -> None:
+        """Background thread body: run health_check() every interval seconds."""
+        while not self._closed.wait(interval):
+            status = self.health_check()
+            if status["restarted"]:
+                logger.warning(f"COBOL worker pool health check: {status}")
+    
+    def close(self) -> None:
+        """Stop the health thread and shut down all idle workers."""
+        self._closed.set()
+        closed = 0
+        while closed < self.size:
+            try:
+                worker = self._idle.get(timeout=self.job_timeout or 30)
+            except queue.Empty:
+                break
+            worker.close()
+            closed += 1
+        logger.info(f"COBOL worker pool closed ({closed}/{self.size} workers stopped)")
@@ -8,17 +8,29 @@ NOTE: This is a MOCK implementation that works without Coinbase API keys.
 API keys are optional - if not provided, the system runs in mock mode.
 """
 
+import json
 import logging
 import os
 import re
 import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 import hashlib
 import random
 
 from backend.models import PayrollResponse
+from backend.settlement_ledger import SettlementLedger, TransferKey, get_settlement_ledger
+from backend.settlement_planner import (
+    Reservation,
+    coalesce_by_wallet,
+    get_balance_reservations,
+    settlement_total,
+)
+from backend.settlement_throttle import SettlementThrottle
 
 
 # Custom Exception Classes
@@ -42,6 +54,43 @@ class TransactionFailedError(SettlementError):
     pass
 
 
+class TransientSettlementError(SettlementError):
+    """Raised when the provider fails in a way worth retrying (timeouts, 5xx; sends are idempotent)"""
+    pass
+
+
+class RateLimitError(TransientSettlementError):
+    """Raised when the provider rejects a call for exceeding its rate limit (HTTP 429)"""
+    
+    def __init__(self, message: str = "Rate limit exceeded", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ProviderUnavailableError(TransientSettlementError):
+    """Raised when the provider is down and refuses a call unprocessed (HTTP 503)"""
+    pass
+
+
+class SettlementOutcomeUnknownError(SettlementError):
+    """Raised when a transfer may or may not have been sent (no answer before retries ran out)"""
+    pass
+
+
+# Provider errors that mean the call was refused: nothing was sent
+REFUSED_ERRORS = (RateLimitError, ProviderUnavailableError, TransactionFailedError)
+
+
+# Transfers batch_settle() keeps in flight at once
+SETTLEMENT_CONCURRENCY = int(os.getenv("PAYROLL_SETTLEMENT_CONCURRENCY", "16"))
+
+# Seconds transfer_usdc() waits for confirmation before returning the transfer pending
+SETTLEMENT_CONFIRMATION_TIMEOUT = float(os.getenv("PAYROLL_SETTLEMENT_CONFIRMATION_TIMEOUT", "300"))
+
+# Network used when none is given (see get_client_registry())
+DEFAULT_NETWORK = os.getenv("NETWORK_ID", "base-sepolia")
+
+
 # Configure logging
 logger = logging.getLogger("settlement")
 logger.setLevel(logging.INFO)
@@ -54,6 +103,37 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
+def failed_transfer(to_address: str, amount: Decimal, employee_id: Optional[str], error: str) -> dict:
+    """Result of a transfer that did not go through (transfer_usdc() shape)."""
+    return {
+        "transaction_hash": None,
+        "transaction_link": None,
+        "status": "failed",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "amount": str(amount),
+        "to_address": to_address,
+        "employee_id": employee_id,
+        "error": error
+    }
+
+
+def unknown_transfer(to_address: str, amount: Decimal, employee_id: Optional[str], error: str) -> dict:
+    """Result of a transfer that may or may not have gone through (transfer_usdc() shape)."""
+    return {**failed_transfer(to_address, amount, employee_id, error), "status": "unknown"}
+
+
+def transfer_idempotency_key(batch_id: str, keys: List[TransferKey]) -> str:
+    """
+    Idempotency key of the transfer paying a batch's entries keys.
+    
+    Derived from what is paid, not from the attempt: the same payment sent
+    again (a retry, or a rerun of the batch) carries the same key, so the
+    provider returns the transfer it already has instead of paying twice.
+    """
+    identity = json.dumps([batch_id, [list(key) for key in keys]])
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
 class CoinbaseClient:
     """
     MOCK Client for managing Coinbase CDP wallet operations and USDC transfers.
@@ -63,9 +143,30 @@ class CoinbaseClient:
     
     Handles wallet initialization, balance checking, and settlement execution
     on Base L2 network (Sepolia testnet or Mainnet).
+    
+    Transfers are thread-safe: the balance check and debit happen atomically,
+    so batch_settle() can run many transfers at once. Batches check the
+    balance once and reserve their total up front; a single transfer
+    reserves its own amount, so it never spends a batch's funds (see
+    settlement_planner).
+    
+    With a SettlementLedger, batches settled under a batch_id are journaled
+    and a rerun of the same batch never sends a transfer twice.
+    
+    Provider calls (_broadcast, _fetch_receipts) go through a
+    SettlementThrottle: rate limited, retried when transient, paused by a
+    circuit breaker while the provider is down. A transfer the provider
+    never answered is reported "unknown" (not refunded): it may have gone out.
     """
     
-    def __init__(self, network: str = "base-sepolia"):
+    # Simulated seconds until a mock transfer is confirmed on chain
+    mock_confirmation_delay = 0.3
+    # Simulated seconds a confirmed mock transfer's receipt stays queryable
+    mock_receipt_retention = 600.0
+    # Seconds transfer_usdc() waits for a "confirmed" receipt
+    confirmation_timeout = SETTLEMENT_CONFIRMATION_TIMEOUT
+    
+    def __init__(self, network: str = "base-sepolia", ledger: Optional[SettlementLedger] = None):
         """
         Initialize CoinbaseClient with specified network.
         
@@ -74,10 +175,21 @@ class CoinbaseClient:
         Args:
             network: Network to use ("base-sepolia" or "base-mainnet")
                     Defaults to "base-sepolia" for safe testing.
+            ledger: Settlement journal consulted before each transfer of a
+                    batch settled with a batch_id (None: no journaling)
         """
         self.network = network
+        self.ledger = ledger
         self.account_address = None
         self.mock_balance = Decimal("10000.00")  # Mock balance of 10,000 USDC
+        self._balance_lock = threading.Lock()
+        self._wallet_lock = threading.Lock()
+        self._mock_confirm_at: Dict[str, float] = {}  # Submitted transaction -> confirmation time
+        self._mock_idempotency: Dict[str, str] = {}  # Idempotency key -> transaction sent with it
+        self.throttle = SettlementThrottle(
+            transient_errors=(TransientSettlementError,),
+            rate_limit_errors=(RateLimitError,)
+        )
         
         # Check if real API keys are provided
         api_key_name = os.getenv("CDP_API_KEY_ID") or os.getenv("COINBASE_API_KEY_NAME")
@@ -106,6 +218,19 @@ class CoinbaseClient:
             else:
                 logger.info(f"🔧 MOCK SDK Configured: Network={self.network} (simulated - API keys optional)")
     
+    def close(self) -> None:
+        """
+        Release the SDK session and its HTTP connections.
+        
+        MOCK: There is no session to release; transfers still awaiting
+        confirmation are forgotten.
+        """
+        with self._balance_lock:
+            pending = len(self._mock_confirm_at)
+            self._mock_confirm_at.clear()
+            self._mock_idempotency.clear()
+        logger.info(f"🔌 MOCK SDK Closed: Network={self.network} ({pending} transactions tracked)")
+    
     def create_wallet(self) -> str:
         """
         MOCK: Create a new wallet for settlement operations.
@@ -158,6 +283,14 @@ class CoinbaseClient:
         if self.account_address is not None:
             return self.account_address
         
+        # One wallet per client, even when the first transfers start together
+        with self._wallet_lock:
+            if self.account_address is not None:
+                return self.account_address
+            return self._init_wallet()
+    
+    def _init_wallet(self) -> str:
+        """MOCK: Load the configured smart account, or create one."""
         # Try loading from wallet address
         wallet_address = os.getenv("PAYROLL_WALLET_ADDRESS")
         if wallet_address:
@@ -212,7 +345,8 @@ class CoinbaseClient:
         # Simulate faucet request
         logger.info(f"🚰 MOCK: Requesting faucet funds: {asset.upper()}...")
         time.sleep(0.5)  # Simulate network delay
-        self.mock_balance += Decimal("1000.00")  # Add 1000 USDC
+        with self._balance_lock:
+            self.mock_balance += Decimal("1000.00")  # Add 1000 USDC
         
         logger.info(f"✅ MOCK: Faucet request completed for {asset.upper()}")
     
@@ -239,47 +373,43 @@ class CoinbaseClient:
         pattern = r'^0x[a-fA-F0-9]{40}$'
         return bool(re.match(pattern, address))
     
-    def transfer_usdc(
-        self, 
-        to_address: str, 
-        amount: Decimal, 
-        employee_id: str = None
+    def submit_usdc(
+        self,
+        to_address: str,
+        amount: Decimal,
+        employee_id: str = None,
+        reservation: Optional[Reservation] = None,
+        idempotency_key: Optional[str] = None
     ) -> dict:
         """
-        Execute a USDC transfer to an employee wallet address.
+        Submit a USDC transfer without waiting for it to be confirmed.
         
-        This method handles the complete transfer flow:
-        1. Validates the destination address
-        2. Validates the transfer amount
-        3. Checks wallet balance is sufficient
-        4. Executes the blockchain transfer
-        5. Waits for transaction confirmation
-        6. Returns transaction details
+        Validates the transfer, debits the balance and broadcasts it. The
+        result has status "pending"; poll get_receipts() with its
+        transaction_hash to learn when it is confirmed.
+        
+        If the provider refused the broadcast, the funds are returned and
+        the error raised. If it never answered (timeouts until retries ran
+        out), the transfer may have gone out: the funds stay debited and
+        SettlementOutcomeUnknownError is raised.
         
         Args:
             to_address: Destination wallet address (must be valid Ethereum address)
             amount: Amount of USDC to transfer (must be positive)
             employee_id: Optional employee identifier for logging and tracking
-            
+            reservation: Batch reservation to draw on instead of checking the balance
+            idempotency_key: Identity of the payment (see transfer_idempotency_key);
+                             None: a fresh key, deduping only this call's retries
+        
         Returns:
-            dict: Transaction result containing:
-                - transaction_hash: Blockchain transaction hash
-                - transaction_link: URL to view transaction on block explorer
-                - status: "success" or "failed"
-                - timestamp: ISO format timestamp
-                - amount: Transfer amount
-                - to_address: Destination address
-                - employee_id: Employee identifier (if provided)
-                - error: Error message (only if status="failed")
-                
+            dict: transfer_usdc() result with status "pending"
+        
         Raises:
             InvalidAddressError: If to_address format is invalid
             ValueError: If amount is not positive
             InsufficientFundsError: If wallet balance is too low
+            SettlementOutcomeUnknownError: If the broadcast may have gone out unanswered
         """
-        import time
-        from datetime import datetime
-        
         # Ensure wallet is initialized (Real work is done by CDP SDK)
         self._ensure_wallet()
         
@@ -295,15 +425,28 @@ class CoinbaseClient:
             logger.error(f"❌ {error_msg}")
             raise ValueError(error_msg)
         
-        # Check balance is sufficient
-        current_balance = self.get_balance("usdc")
-        if current_balance < amount:
-            error_msg = (
-                f"Insufficient funds: Balance={current_balance} USDC, "
-                f"Required={amount} USDC"
-            )
-            logger.error(f"❌ {error_msg}")
-            raise InsufficientFundsError(error_msg)
+        # Batch transfers draw on the batch's reservation (the balance was
+        # checked once for the whole batch). A standalone transfer makes a
+        # one-off reservation of its amount: like a batch, it only gets the
+        # balance other batches haven't reserved, and concurrent transfers
+        # can't all pass the check on the same funds.
+        standalone = reservation is None
+        if standalone:
+            reservation = get_balance_reservations().reserve(self.account_address, amount, self.get_balance)
+        try:
+            if not reservation.hold(amount):
+                error_msg = (
+                    f"Insufficient funds: {'Available' if standalone else 'Reserved'}="
+                    f"{reservation.available} USDC, Required={amount} USDC"
+                )
+                logger.error(f"❌ {error_msg}")
+                raise InsufficientFundsError(error_msg)
+            with self._balance_lock:
+                self.mock_balance -= amount
+            reservation.spend(amount)
+        finally:
+            if standalone:
+                reservation.release()
         
         # Log transfer initiation
         employee_context = f" (Employee: {employee_id})" if employee_id else ""
@@ -312,29 +455,198 @@ class CoinbaseClient:
             f"{amount} USDC → {to_address}"
         )
         
-        # Execute transfer and handle confirmation
+        # Broadcast (rate limited, transient errors retried). Every attempt
+        # carries the same idempotency key: a retry of a send that went out
+        # (say, timed out waiting for the answer) returns that transaction
+        # instead of paying again.
+        idempotency_key = idempotency_key or uuid.uuid4().hex
+        unanswered = False
+        
+        def broadcast() -> str:
+            nonlocal unanswered
+            try:
+                return self._broadcast(to_address, amount, employee_id, idempotency_key)
+            except REFUSED_ERRORS:
+                raise
+            except Exception:
+                # No answer (timeout, bad gateway, lost connection): it may have gone out
+                unanswered = True
+                raise
+        
         try:
-            start_time = time.time()
+            transaction_hash = self.throttle.call(broadcast)
+        except Exception as e:
+            if unanswered:
+                # Refunding and reporting it failed would invite paying twice
+                error_msg = f"Transfer outcome unknown: sent without an answer ({e})"
+                logger.error(f"❌ {error_msg}{employee_context}")
+                raise SettlementOutcomeUnknownError(error_msg) from e
+            # Never sent: the debited funds go back
+            with self._balance_lock:
+                self.mock_balance += amount
+            raise
+        
+        # Build transaction link for Base network
+        if self.network == "base-mainnet":
+            transaction_link = f"https://basescan.org/tx/{transaction_hash}"
+        else:
+            transaction_link = f"https://sepolia.basescan.org/tx/{transaction_hash}"
+        
+        return {
+            "transaction_hash": transaction_hash,
+            "transaction_link": transaction_link,
+            "status": "pending",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "amount": str(amount),
+            "to_address": to_address,
+            "employee_id": employee_id
+        }
+    
+    def _broadcast(
+        self,
+        to_address: str,
+        amount: Decimal,
+        employee_id: Optional[str],
+        idempotency_key: str
+    ) -> str:
+        """
+        MOCK provider call: send a transfer; it confirms mock_confirmation_delay seconds later.
+        
+        A transfer already sent with idempotency_key is not sent again; its
+        transaction hash is returned. Transactions confirmed more than
+        mock_receipt_retention seconds ago are forgotten (receipt "unknown").
+        
+        Returns:
+            str: Transaction hash
+        
+        Raises:
+            RateLimitError / ProviderUnavailableError: Provider refused the
+                call; retry later (nothing was sent)
+            TransientSettlementError: No answer; retry (the transfer may or
+                may not have been sent)
+        """
+        with self._balance_lock:
+            self._forget_old_receipts()
+            transaction_hash = self._mock_idempotency.get(idempotency_key)
+            if transaction_hash is None:
+                hash_input = f"{to_address}{amount}{employee_id}{time.time()}{random.random()}".encode()
+                transaction_hash = "0x" + hashlib.sha256(hash_input).hexdigest()
+                self._mock_idempotency[idempotency_key] = transaction_hash
+                self._mock_confirm_at[transaction_hash] = time.monotonic() + self.mock_confirmation_delay
+        return transaction_hash
+    
+    def _forget_old_receipts(self) -> None:
+        """MOCK: Drop transactions confirmed over mock_receipt_retention seconds ago (lock held)."""
+        # Sent in confirmation order, so the oldest come first
+        expired = time.monotonic() - self.mock_receipt_retention
+        stale = []
+        for idempotency_key, transaction_hash in self._mock_idempotency.items():
+            if self._mock_confirm_at[transaction_hash] > expired:
+                break
+            stale.append((idempotency_key, transaction_hash))
+        for idempotency_key, transaction_hash in stale:
+            del self._mock_idempotency[idempotency_key]
+            del self._mock_confirm_at[transaction_hash]
+    
+    def get_receipts(self, transaction_hashes: List[str]) -> Dict[str, str]:
+        """
+        Look up the confirmation status of many transactions in one call.
+        
+        Args:
+            transaction_hashes: Hashes returned by submit_usdc()
+        
+        Returns:
+            dict: Hash -> "confirmed", "pending" or "unknown"
+        """
+        return self.throttle.call(self._fetch_receipts, transaction_hashes)
+    
+    def _fetch_receipts(self, transaction_hashes: List[str]) -> Dict[str, str]:
+        """MOCK provider call: confirmation status of transactions (see get_receipts)."""
+        now = time.monotonic()
+        receipts = {}
+        with self._balance_lock:
+            for transaction_hash in transaction_hashes:
+                confirm_at = self._mock_confirm_at.get(transaction_hash)
+                if confirm_at is None:
+                    receipts[transaction_hash] = "unknown"
+                elif confirm_at <= now:
+                    receipts[transaction_hash] = "confirmed"
+                else:
+                    receipts[transaction_hash] = "pending"
+        return receipts
+    
+    def transfer_usdc(
+        self, 
+        to_address: str, 
+        amount: Decimal, 
+        employee_id: str = None,
+        reservation: Optional[Reservation] = None,
+        idempotency_key: Optional[str] = None
+    ) -> dict:
+        """
+        Execute a USDC transfer to an employee wallet address.
+        
+        This method handles the complete transfer flow:
+        1. Validates the destination address
+        2. Validates the transfer amount
+        3. Checks wallet balance is sufficient
+        4. Executes the blockchain transfer
+        5. Waits for transaction confirmation (up to confirmation_timeout)
+        6. Returns transaction details
+        
+        Args:
+            to_address: Destination wallet address (must be valid Ethereum address)
+            amount: Amount of USDC to transfer (must be positive)
+            employee_id: Optional employee identifier for logging and tracking
+            reservation: Batch reservation to draw on instead of checking the balance
+            idempotency_key: Identity of the payment (see submit_usdc)
             
-            # MOCK: Simulate the transfer
-            time.sleep(0.3)  # Simulate network delay
+        Returns:
+            dict: Transaction result containing:
+                - transaction_hash: Blockchain transaction hash
+                - transaction_link: URL to view transaction on block explorer
+                - status: "success" once confirmed, "failed", or "pending" if
+                  the transfer was sent but not confirmed in time (or its
+                  confirmation couldn't be checked)
+                - timestamp: ISO format timestamp
+                - amount: Transfer amount
+                - to_address: Destination address
+                - employee_id: Employee identifier (if provided)
+                - error: Error message (only if status="failed" or "pending")
+                
+        Raises:
+            InvalidAddressError: If to_address format is invalid
+            ValueError: If amount is not positive
+            InsufficientFundsError: If wallet balance is too low
+            SettlementOutcomeUnknownError: If the broadcast may have gone out unanswered
+        """
+        # Submit (validates and debits; validation errors propagate)
+        submitted = self.submit_usdc(
+            to_address, amount, employee_id, reservation=reservation, idempotency_key=idempotency_key
+        )
+        employee_context = f" (Employee: {employee_id})" if employee_id else ""
+        
+        # Wait for confirmation
+        try:
+            start_time = time.time()
+            transaction_hash = submitted["transaction_hash"]
             
-            # Deduct from mock balance
-            self.mock_balance -= amount
+            # MOCK: Simulate the confirmation wait
+            time.sleep(self.mock_confirmation_delay)  # Simulate network delay
+            # Only "confirmed" is success; "unknown" may still turn up (or be dropped)
+            deadline = time.monotonic() + self.confirmation_timeout
+            receipt = self.get_receipts([transaction_hash])[transaction_hash]
+            while receipt != "confirmed":
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"receipt still {receipt} after {self.confirmation_timeout:g}s"
+                    )
+                time.sleep(0.01)
+                receipt = self.get_receipts([transaction_hash])[transaction_hash]
             
             # Calculate execution duration
             duration = time.time() - start_time
             
-            # Generate mock transaction hash
-            hash_input = f"{to_address}{amount}{time.time()}".encode()
-            transaction_hash = "0x" + hashlib.sha256(hash_input).hexdigest()
-            
-            # Build transaction link for Base network
-            if self.network == "base-mainnet":
-                transaction_link = f"https://basescan.org/tx/{transaction_hash}"
-            else:
-                transaction_link = f"https://sepolia.basescan.org/tx/{transaction_hash}"
-            
             # Log successful transfer
             logger.info(
                 f"✅ MOCK Transfer Confirmed{employee_context}: "
@@ -343,35 +655,264 @@ class CoinbaseClient:
             
             # Return success result
             return {
-                "transaction_hash": transaction_hash,
-                "transaction_link": transaction_link,
+                **submitted,
                 "status": "success",
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "amount": str(amount),
-                "to_address": to_address,
-                "employee_id": employee_id
+                "timestamp": datetime.utcnow().isoformat() + "Z"
             }
             
         except Exception as e:
-            # Log error with context
-            error_msg = str(e)
+            # The transfer was sent; only its confirmation couldn't be checked.
+            # Reporting it "failed" (and refunding) would invite paying twice.
+            error_msg = f"Confirmation unknown: {e}"
             logger.error(
-                f"❌ MOCK Transfer Failed{employee_context}: {error_msg}"
+                f"❌ MOCK Transfer Unconfirmed{employee_context}: {error_msg}"
             )
             
-            # Return failure result
-            return {
-                "transaction_hash": None,
-                "transaction_link": None,
-                "status": "failed",
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "amount": str(amount),
-                "to_address": to_address,
-                "employee_id": employee_id,
-                "error": error_msg
+            # Return the still pending result
+            return {**submitted, "error": error_msg}
+    
+    def _settle_one(
+        self,
+        transfer: Callable[..., dict],
+        result,
+        reservation: Reservation,
+        idempotency_key: Optional[str] = None
+    ) -> dict:
+        """
+        Transfer (or submit) one employee's net pay, never raising.
+        
+        Validation errors (bad address, non-positive amount, insufficient
+        funds) become a failed result like any other transfer failure, so
+        one bad record can't stop the rest of the batch. A transfer that may
+        have gone out unanswered is "unknown", never "failed".
+        """
+        try:
+            return transfer(
+                to_address=result.wallet_address,
+                amount=result.net_pay,
+                employee_id=result.employee_id,
+                reservation=reservation,
+                idempotency_key=idempotency_key
+            )
+        except SettlementOutcomeUnknownError as e:
+            return unknown_transfer(result.wallet_address, result.net_pay, result.employee_id, str(e))
+        except Exception as e:
+            return failed_transfer(result.wallet_address, result.net_pay, result.employee_id, str(e))
+    
+    def _settle_group(
+        self,
+        transfer: Callable[..., dict],
+        results: list,
+        reservation: Reservation,
+        idempotency_key: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Pay results sharing a wallet with one transfer of their total, never raising.
+        
+        Returns:
+            One result per payroll result: the transfer's result with that
+            employee's employee_id and amount, plus transfer_amount (the total
+            sent) and coalesced_employee_ids (everyone the transfer paid)
+        """
+        if len(results) == 1:
+            return [self._settle_one(transfer, results[0], reservation, idempotency_key)]
+        
+        to_address = results[0].wallet_address
+        amount = settlement_total(results)
+        employee_ids = [result.employee_id for result in results]
+        try:
+            outcome = transfer(
+                to_address=to_address,
+                amount=amount,
+                employee_id=", ".join(employee_ids),
+                reservation=reservation,
+                idempotency_key=idempotency_key
+            )
+        except SettlementOutcomeUnknownError as e:
+            outcome = unknown_transfer(to_address, amount, None, str(e))
+        except Exception as e:
+            outcome = failed_transfer(to_address, amount, None, str(e))
+        
+        return [
+            {
+                **outcome,
+                "amount": str(result.net_pay),
+                "employee_id": result.employee_id,
+                "transfer_amount": outcome["amount"],
+                "coalesced_employee_ids": employee_ids
             }
+            for result in results
+        ]
 
-    def batch_settle(self, payroll_response: PayrollResponse) -> dict:
+    def _journaled_result(self, batch_id: str, result, entry: dict) -> dict:
+        """
+        Result for a transfer the ledger says must not be sent now.
+        
+        Settled transfers and ones recorded with an unknown outcome (sent
+        without an answer, or never confirmed) return their recorded result;
+        ones in flight or interrupted are reported "unknown" as well. Ones
+        recorded with a different amount or wallet are reported as failed.
+        """
+        if entry["status"] == "sending" or entry["result"] is None:
+            return unknown_transfer(
+                result.wallet_address, result.net_pay, result.employee_id,
+                f"Transfer outcome unknown: another settlement of batch {batch_id} is "
+                f"sending it, or was interrupted before recording it. Settle the batch "
+                f"again for its outcome; if it stays unknown, reconcile and release it."
+            )
+        if entry["to_address"] != result.wallet_address or Decimal(entry["amount"]) != result.net_pay:
+            return failed_transfer(
+                result.wallet_address, result.net_pay, result.employee_id,
+                f"Already settled in batch {batch_id}: "
+                f"{entry['amount']} USDC → {entry['to_address']}"
+            )
+        return entry["result"]
+    
+    @staticmethod
+    def _transfer_keys(valid_results: list) -> List[TransferKey]:
+        """(employee_id, occurrence) per result: the n-th payment to that employee in the batch."""
+        occurrences: Dict[str, int] = {}
+        keys = []
+        for result in valid_results:
+            occurrence = occurrences.get(result.employee_id, 0)
+            occurrences[result.employee_id] = occurrence + 1
+            keys.append((result.employee_id, occurrence))
+        return keys
+    
+    def _claim_journaled(self, batch_id: str, keys: List[TransferKey], valid_results: list) -> Dict:
+        """
+        Queue a batch's transfers in the ledger.
+        
+        Returns:
+            Key -> entry of transfers not to send now
+        """
+        return self.ledger.claim(
+            batch_id,
+            [(key, result.wallet_address, str(result.net_pay)) for key, result in zip(keys, valid_results)]
+        )
+    
+    def _transfer_all(
+        self,
+        payroll_response: PayrollResponse,
+        transfer: Callable[..., dict],
+        max_workers: Optional[int],
+        batch_id: Optional[str] = None,
+        coalesce: bool = True
+    ) -> List[dict]:
+        """
+        Run transfer for every OK result, up to max_workers at once.
+        
+        With coalesce, results paid to the same wallet share one transfer of
+        their total (see settlement_planner.coalesce_by_wallet). The batch's
+        total is checked against the balance once and reserved; transfers
+        draw on that reservation instead of reading the balance each. With a
+        ledger and a batch_id, transfers are queued in the ledger first (one
+        entry per result), those already journaled are not sent again, and
+        each one sent is marked "sending" and then recorded. Marking is a
+        compare-and-set: a transfer an overlapping settlement of the same
+        batch has started is left to it and reported from the ledger.
+        Transfers of a batch_id carry an idempotency key derived from their
+        ledger keys (see transfer_idempotency_key).
+        
+        Returns:
+            One result per OK payroll result, in payroll order
+        """
+        max_workers = max_workers or SETTLEMENT_CONCURRENCY
+        if max_workers < 1:
+            raise ValueError(f"Settlement concurrency must be at least 1, got: {max_workers}")
+        
+        # Filter payroll_response.results for status="OK" only (Subtask 7.1)
+        valid_results = [
+            result for result in payroll_response.results 
+            if result.status == "OK"
+        ]
+        if not valid_results:
+            return []
+        
+        # Initialize the wallet once, before transfers run concurrently
+        self._ensure_wallet()
+        
+        journaled = self.ledger is not None and batch_id is not None
+        if batch_id is not None:
+            keys = self._transfer_keys(valid_results)
+        else:
+            keys = range(len(valid_results))
+        recorded = self._claim_journaled(batch_id, keys, valid_results) if journaled else {}
+        
+        outcomes: List[Optional[dict]] = [None] * len(valid_results)
+        to_send = []
+        for index, (key, result) in enumerate(zip(keys, valid_results)):
+            if key in recorded:
+                outcomes[index] = self._journaled_result(batch_id, result, recorded[key])
+            else:
+                to_send.append(index)
+        if not to_send:
+            return outcomes
+        
+        # One transfer per wallet (or per result), as indices into valid_results
+        if coalesce:
+            groups = coalesce_by_wallet([valid_results[index] for index in to_send])
+            groups = [[to_send[position] for position in group] for group in groups]
+        else:
+            groups = [[index] for index in to_send]
+        if len(groups) < len(to_send):
+            logger.info(f"🔗 Coalesced {len(to_send)} payouts into {len(groups)} transfers")
+        
+        # One balance check for everything still to be sent
+        reservation = get_balance_reservations().reserve(
+            self.account_address,
+            settlement_total(valid_results[index] for index in to_send),
+            self.get_balance
+        )
+        
+        def settle(group) -> Dict[int, dict]:
+            settled = {}
+            if journaled:
+                won = set(self.ledger.begin(batch_id, *(keys[index] for index in group)))
+                lost = [index for index in group if keys[index] not in won]
+                if lost:
+                    # An overlapping settlement of this batch got there first
+                    entries = self.ledger.lookup(batch_id, (keys[index] for index in lost))
+                    for index in lost:
+                        settled[index] = self._journaled_result(
+                            batch_id, valid_results[index], entries[keys[index]]
+                        )
+                    group = [index for index in group if keys[index] in won]
+                    if not group:
+                        return settled
+            
+            idempotency_key = None
+            if batch_id is not None:
+                idempotency_key = transfer_idempotency_key(batch_id, [keys[index] for index in group])
+            group_outcomes = self._settle_group(
+                transfer, [valid_results[index] for index in group], reservation, idempotency_key
+            )
+            for index, outcome in zip(group, group_outcomes):
+                if journaled:
+                    self.ledger.record(batch_id, keys[index], outcome)
+                settled[index] = outcome
+            return settled
+        
+        # Outcomes are put back in payroll order (Subtask 7.2)
+        try:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(groups)),
+                thread_name_prefix="settlement"
+            ) as executor:
+                for settled in executor.map(settle, groups):
+                    for index, outcome in settled.items():
+                        outcomes[index] = outcome
+        finally:
+            reservation.release()
+        return outcomes
+    
+    def batch_settle(
+        self,
+        payroll_response: PayrollResponse,
+        max_workers: Optional[int] = None,
+        batch_id: Optional[str] = None,
+        coalesce: bool = True
+    ) -> dict:
         """
         Execute batch settlement for multiple employees from payroll results.
         
@@ -380,67 +921,184 @@ class CoinbaseClient:
         error isolation - if one transfer fails, processing continues for
         remaining employees.
         
+        Transfers mostly wait for confirmation, so up to max_workers of them
+        run at once in a thread pool. Results are returned in payroll order
+        regardless of which transfer confirms first.
+        
+        Settling with a batch_id (and a ledger) makes the batch resumable:
+        transfers already journaled for that batch return their recorded
+        result instead of being sent again. One submitted earlier by
+        batch_submit() and not yet confirmed is returned as "pending".
+        
+        Results paid to the same wallet are coalesced into one transfer of
+        their total; each still gets its own result, carrying the shared
+        transaction hash, its own amount, transfer_amount and
+        coalesced_employee_ids.
+        
         Args:
             payroll_response: PayrollResponse object containing processed payroll results
+            max_workers: Concurrent transfers (defaults to PAYROLL_SETTLEMENT_CONCURRENCY)
+            batch_id: Payroll batch identifier for the settlement ledger
+            coalesce: One transfer per wallet (False: one per payroll result)
             
         Returns:
             dict: Batch settlement summary containing:
                 - total_processed: Number of employees processed
                 - total_succeeded: Number of successful transfers
                 - total_failed: Number of failed transfers
+                - total_unknown: Number of transfers whose outcome is unknown
+                  (may have been sent; check on chain before paying again)
                 - results: List of individual settlement results
         """
-        # Initialize results list and counters (Subtask 7.1)
-        results = []
-        succeeded = 0
-        failed = 0
+        logger.info("🚀 Batch Settlement Started")
+        results = self._transfer_all(payroll_response, self.transfer_usdc, max_workers, batch_id, coalesce)
         
-        # Filter payroll_response.results for status="OK" only (Subtask 7.1)
-        valid_results = [
-            result for result in payroll_response.results 
-            if result.status == "OK"
-        ]
-        
-        # Log batch settlement start with count of valid results (Subtask 7.1)
-        logger.info(
-            f"🚀 Batch Settlement Started: {len(valid_results)} employees to process"
-        )
-        
-        # Iterate through filtered valid results (Subtask 7.2)
-        for result in valid_results:
-            # For each result, call transfer_usdc (Subtask 7.2)
-            settlement_result = self.transfer_usdc(
-                to_address=result.wallet_address,
-                amount=result.net_pay,
-                employee_id=result.employee_id
-            )
-            
-            # Append settlement result to results list (Subtask 7.2)
-            results.append(settlement_result)
-            
-            # Increment succeeded or failed counter based on status (Subtask 7.2)
-            if settlement_result["status"] == "success":
-                succeeded += 1
-            else:
-                failed += 1
-            
-            # Continue processing even if one transfer fails (error isolation) (Subtask 7.2)
-            # This is handled by the try-except in transfer_usdc which returns
-            # a result dict with status="failed" instead of raising an exception
+        # Count succeeded and failed transfers (Subtask 7.2)
+        succeeded = sum(1 for result in results if result["status"] == "success")
+        failed = sum(1 for result in results if result["status"] == "failed")
+        unknown = sum(1 for result in results if result["status"] == "unknown")
         
         # Build summary dict (Subtask 7.3)
         summary = {
-            "total_processed": len(valid_results),
+            "total_processed": len(results),
             "total_succeeded": succeeded,
             "total_failed": failed,
+            "total_unknown": unknown,
             "results": results
         }
         
         # Log batch settlement completion with success/failure counts (Subtask 7.3)
         logger.info(
             f"✅ Batch Settlement Complete: "
-            f"{succeeded} succeeded, {failed} failed out of {len(valid_results)} total"
+            f"{succeeded} succeeded, {failed} failed, {unknown} unknown out of {len(results)} total"
         )
         
         # Return summary dict (Subtask 7.3)
         return summary
+
+    def batch_submit(
+        self,
+        payroll_response: PayrollResponse,
+        max_workers: Optional[int] = None,
+        batch_id: Optional[str] = None,
+        coalesce: bool = True
+    ) -> dict:
+        """
+        Submit the transfers of a batch without waiting for confirmation.
+        
+        First stage of pipelined settlement: every OK result's transfer is
+        validated, debited and broadcast, which takes a fraction of the
+        confirmation time. Submitted transfers are "pending"; a
+        SettlementTracker polls their receipts and marks them "success".
+        
+        Args:
+            payroll_response: PayrollResponse object containing processed payroll results
+            max_workers: Concurrent submissions (defaults to PAYROLL_SETTLEMENT_CONCURRENCY)
+            batch_id: Payroll batch identifier for the settlement ledger (see batch_settle)
+            coalesce: One transfer per wallet (see batch_settle)
+        
+        Returns:
+            dict: Submission summary containing:
+                - total_processed: Number of employees processed
+                - total_submitted: Number of transfers now pending
+                - total_failed: Number of transfers rejected before submission
+                - total_unknown: Number of transfers whose submission may have gone out unanswered
+                - results: List of individual results ("pending", "failed" or "unknown")
+        """
+        results = self._transfer_all(payroll_response, self.submit_usdc, max_workers, batch_id, coalesce)
+        submitted = sum(1 for result in results if result["status"] == "pending")
+        failed = sum(1 for result in results if result["status"] == "failed")
+        unknown = sum(1 for result in results if result["status"] == "unknown")
+        
+        logger.info(
+            f"📨 Batch Submitted: {submitted} pending, "
+            f"{failed} failed, {unknown} unknown out of {len(results)} total"
+        )
+        return {
+            "total_processed": len(results),
+            "total_submitted": submitted,
+            "total_failed": failed,
+            "total_unknown": unknown,
+            "results": results
+        }
+
+
+class CoinbaseClientRegistry:
+    """
+    Long-lived CoinbaseClients, one per network, shared by all requests.
+    
+    Creating a client per request configures the SDK, opens new connections
+    and loads (or, without PAYROLL_WALLET_ADDRESS, creates) a wallet every
+    time. Registry clients do that once and are reused; they are
+    thread-safe, so concurrent settle requests can share one.
+    
+    Example:
+        registry = CoinbaseClientRegistry(ledger=get_settlement_ledger())
+        registry.warm_up(["base-sepolia"])
+        registry.get("base-sepolia").batch_settle(payroll_response)
+        registry.close()
+    """
+    
+    def __init__(self, ledger: Optional[SettlementLedger] = None):
+        """
+        Create an empty registry.
+        
+        Args:
+            ledger: Settlement ledger given to every client it creates
+        """
+        self.ledger = ledger
+        self._clients: Dict[str, CoinbaseClient] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, network: str = DEFAULT_NETWORK) -> CoinbaseClient:
+        """Return the client for network, creating it on first use."""
+        with self._lock:
+            client = self._clients.get(network)
+            if client is None:
+                client = CoinbaseClient(network=network, ledger=self.ledger)
+                self._clients[network] = client
+            return client
+    
+    def warm_up(self, networks: List[str]) -> None:
+        """
+        Create the clients for networks and load their wallets now, so the
+        first settle request doesn't pay for it.
+        """
+        for network in networks:
+            address = self.get(network)._ensure_wallet()
+            logger.info(f"🔥 Settlement client ready: Network={network}, Wallet={address}")
+    
+    def close(self) -> None:
+        """Close every client; the registry can't be used afterwards."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+_client_registry: Optional[CoinbaseClientRegistry] = None
+_client_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> CoinbaseClientRegistry:
+    """
+    Return the application's client registry, creating it on first use.
+    
+    Its clients journal batches in the shared settlement ledger
+    (PAYROLL_SETTLEMENT_LEDGER).
+    """
+    global _client_registry
+    with _client_registry_lock:
+        if _client_registry is None:
+            _client_registry = CoinbaseClientRegistry(ledger=get_settlement_ledger())
+        return _client_registry
+
+
+def shutdown_client_registry() -> None:
+    """Close the application's settlement clients if the registry was created."""
+    global _client_registry
+    with _client_registry_lock:
+        if _client_registry is not None:
+            _client_registry.close()
+            _client_registry = None
@@ -0,0 +1,100 @@
+"""
+Shared fixtures and factories for the payroll and settlement tests.
+
+Payroll tests build their requests with build_employee / build_employees /
+build_request and skip COBOL-backed cases with requires_cobol when the
+binary has not been compiled (benchmarks.py reuses the same factories).
+
+Settlement tests run against the mock CoinbaseClient (selected by setting
+PAYROLL_WALLET_ADDRESS) with a short confirmation delay, so no API keys or
+network are needed.
+"""
+import os
+from decimal import Decimal
+from typing import List, Optional
+
+import pytest
+
+from backend.bridge import cobol_binary_path
+from backend.coinbase_client import CoinbaseClient
+from backend.models import EmployeePayrollInput, EmployeePayrollOutput, PayrollRequest, PayrollResponse
+
+MOCK_WALLET_ADDRESS = f"0x{'a' * 40}"
+TEST_WALLET = "0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb2"
+
+requires_cobol = pytest.mark.skipif(
+    not os.path.exists(cobol_binary_path()),
+    reason="COBOL payroll binary not compiled"
+)
+
+
+def build_employee(
+    index: int,
+    employee_id: Optional[str] = None,
+    hours_worked: Optional[Decimal] = None,
+    hourly_rate: Optional[Decimal] = None,
+    wallet_address: Optional[str] = None
+) -> EmployeePayrollInput:
+    """
+    Employee number index of a test payroll.
+    
+    Unless overridden, employee i gets ID EMP0000i, hours and rate that vary
+    with i (always within payroll.cbl's PIC 999V99 / 9999V99 fields) and
+    wallet 0x…i.
+    """
+    return EmployeePayrollInput(
+        employee_id=employee_id or f"EMP{index:05d}",
+        hours_worked=hours_worked if hours_worked is not None else Decimal(index % 97 + 1) + Decimal("0.25"),
+        hourly_rate=hourly_rate if hourly_rate is not None else Decimal("17.33") + index % 500,
+        tax_code="US",
+        wallet_address=wallet_address or f"0x{index:040x}"
+    )
+
+
+def build_employees(count: int) -> List[EmployeePayrollInput]:
+    """count employees built by build_employee."""
+    return [build_employee(index) for index in range(count)]
+
+
+def build_request(count: int) -> PayrollRequest:
+    """PayrollRequest for count employees built by build_employee."""
+    return PayrollRequest(employees=build_employees(count))
+
+
+def build_response(net_pays, status="OK", wallets=None, employee_ids=None) -> PayrollResponse:
+    """
+    PayrollResponse paying each net pay to its own wallet.
+    
+    Employee i gets ID EMP0000i and wallet 0x…(i + 1) unless wallets or
+    employee_ids say otherwise.
+    """
+    return PayrollResponse(
+        results=[
+            EmployeePayrollOutput(
+                employee_id=employee_ids[index] if employee_ids else f"EMP{index:05d}",
+                gross_pay=Decimal(net_pay),
+                federal_tax=Decimal("0"),
+                state_tax=Decimal("0"),
+                net_pay=Decimal(net_pay),
+                status=status,
+                wallet_address=wallets[index] if wallets else f"0x{index + 1:040x}"
+            )
+            for index, net_pay in enumerate(net_pays)
+        ],
+        summary={"processed": len(net_pays), "errors": 0}
+    )
+
+
+@pytest.fixture
+def mock_wallet(monkeypatch):
+    """Point CoinbaseClient at its mock wallet."""
+    monkeypatch.setenv("PAYROLL_WALLET_ADDRESS", MOCK_WALLET_ADDRESS)
+    return MOCK_WALLET_ADDRESS
+
+
+@pytest.fixture
+def client(mock_wallet):
+    """Mock CoinbaseClient on base-sepolia with a short confirmation delay."""
+    client = CoinbaseClient(network="base-sepolia")
+    client.mock_confirmation_delay = 0.01
+    return client
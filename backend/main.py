@@ -6,15 +6,53 @@ Real work is done by the COBOL binary - this just provides a clean HTTP interfac
 """
 
 import os
+import json
+import uuid
+import asyncio
 import logging
 from datetime import datetime
-from fastapi import FastAPI, HTTPException
+from typing import AsyncIterator, List, Optional
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from backend.models import PayrollRequest, PayrollResponse
-from backend.bridge import process_payroll
-from backend.coinbase_client import CoinbaseClient
+from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.requests import ClientDisconnect
+from backend.models import EmployeePayrollInput, PayrollRequest, PayrollResponse
+from backend.bridge import (
+    get_result_cache,
+    get_worker_pool,
+    shutdown_result_caches,
+    shutdown_worker_pool,
+    DEFAULT_ENGINE,
+)
+from backend.async_bridge import (
+    get_coalescer,
+    get_job_manager,
+    iter_employee_slices,
+    iter_payroll_batches_async,
+    process_payroll_stream_async,
+    shutdown_coalescer,
+    shutdown_job_manager,
+    submit_payroll,
+    run_until_disconnected,
+    ClientDisconnectedError,
+    INGEST_BATCH_SIZE,
+)
+from backend.ndjson_ingest import NDJSONValidationError, iter_employee_batches
+from backend.bulk_upload import (
+    UPLOAD_CHUNK_BYTES,
+    UPLOAD_FORMATS,
+    UploadValidationError,
+    iter_upload_batches,
+    parse_wallet_file,
+)
+from backend.bulk_validation import RequestBodyValidationError, validate_payroll_request
+from backend.payroll_results import PayrollResultSet
+from backend.coinbase_client import DEFAULT_NETWORK, get_client_registry, shutdown_client_registry
+from backend.settlement_ledger import shutdown_settlement_ledger
+from backend.settlement_tracker import get_settlement_tracker, shutdown_settlement_tracker
 
 # Configure logging
 logging.basicConfig(
@@ -69,6 +107,128 @@ if os.path.exists(frontend_dist_path):
     # We'll check for these files individually in the catch-all route
 
 
+# Media type of the streamed NDJSON request and response bodies
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class PayrollJSONResponse(Response):
+    """
+    JSON response whose body is already rendered.
+    
+    Payroll results render themselves from their cents columns
+    (PayrollResultSet.to_json_bytes), so the body skips jsonable_encoder
+    and json.dumps, which walk every result and amount one by one.
+    """
+    media_type = "application/json"
+
+
+def render_settle_response(payroll_results: PayrollResultSet, settlement_summary: dict) -> bytes:
+    """
+    Render the /api/payroll/process-and-settle body.
+    
+    The same bytes FastAPI produced for {"payroll": to_response().model_dump(),
+    "settlement": settlement_summary}: amounts are JSON numbers, rendered
+    straight from cents.
+    
+    Args:
+        payroll_results: COBOL results
+        settlement_summary: CoinbaseClient.batch_settle() summary
+    
+    Returns:
+        UTF-8 JSON body
+    """
+    settlement = json.dumps(
+        jsonable_encoder(settlement_summary), ensure_ascii=False, separators=(",", ":")
+    )
+    return (
+        b'{"payroll":' + payroll_results.to_json_bytes(numeric_amounts=True)
+        + b',"settlement":' + settlement.encode("utf-8") + b"}"
+    )
+
+
+def wants_ndjson(http_request: Request) -> bool:
+    """Whether the client asked for a streamed NDJSON response."""
+    return NDJSON_MEDIA_TYPE in http_request.headers.get("accept", "")
+
+
+async def payroll_ndjson_stream(
+    batches: AsyncIterator[List[EmployeePayrollInput]]
+) -> AsyncIterator[bytes]:
+    """
+    Stream payroll results as NDJSON while later batches are still running.
+    
+    Each batch (usually PAYROLL_INGEST_BATCH_SIZE employees) goes to COBOL
+    as soon as it is available; its results are sent as soon as they are
+    ready, one result object per line (same fields and values as
+    /api/payroll/process), and dropped. The last line is
+    {"summary": {"processed": n, "errors": n}}.
+    
+    The 200 status has already been sent when a batch fails, so a failure
+    ends the stream with an {"error": ..., "error_type": ..., "timestamp": ...}
+    line instead of the summary (plus "detail" for invalid uploaded records).
+    """
+    processed = 0
+    errors = 0
+    try:
+        async for results in iter_payroll_batches_async(batches):
+            processed += results.processed
+            errors += results.errors
+            yield await asyncio.to_thread(results.to_ndjson)
+    
+    except UploadValidationError as e:
+        logger.warning(str(e))
+        yield json.dumps({
+            "error": str(e),
+            "error_type": "ValidationError",
+            "detail": e.errors,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }, separators=(",", ":")).encode("utf-8") + b"\n"
+        return
+    
+    except Exception as e:
+        error_msg = f"Unexpected error during payroll processing: {str(e)}"
+        logger.error(error_msg)
+        yield json.dumps({
+            "error": error_msg,
+            "error_type": "UnexpectedError",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }, separators=(",", ":")).encode("utf-8") + b"\n"
+        return
+    
+    logger.info(f"Streamed payroll results: {processed} processed, {errors} errors")
+    yield json.dumps(
+        {"summary": {"processed": processed, "errors": errors}}, separators=(",", ":")
+    ).encode("utf-8") + b"\n"
+
+
+# OpenAPI body of the endpoints that validate PayrollRequest themselves
+PAYROLL_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/PayrollRequest"}}}
+    }
+}
+
+
+async def payroll_request_body(http_request: Request) -> PayrollRequest:
+    """
+    Read and validate a PayrollRequest body.
+    
+    Used instead of a PayrollRequest parameter so large batches (at least
+    PAYROLL_BULK_VALIDATION_THRESHOLD employees) are validated column-wise
+    rather than one EmployeePayrollInput at a time. Validation runs in a
+    worker thread; the request and the 422 errors are the same as FastAPI's.
+    
+    Raises:
+        RequestValidationError: If the body is not a valid PayrollRequest
+    """
+    body = await http_request.body()
+    try:
+        return await asyncio.to_thread(validate_payroll_request, body)
+    except RequestBodyValidationError as e:
+        raise RequestValidationError(e.errors, body=body)
+
+
 @app.get("/health")
 async def health_check():
     """
@@ -83,13 +243,46 @@ async def health_check():
     return {"status": "healthy"}
 
 
-@app.post("/api/payroll/process", response_model=PayrollResponse)
-async def process_payroll_endpoint(request: PayrollRequest):
+@app.get("/api/payroll/cache")
+async def cache_stats():
+    """
+    Result cache metrics of the default engine (PAYROLL_ENGINE).
+    
+    Returns:
+        dict: enabled flag plus hits, misses, disk_hits, evictions and
+              memory_entries when the cache is enabled (PAYROLL_CACHE_SIZE > 0)
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/api/payroll/coalescer")
+async def coalescer_stats():
+    """
+    Request coalescer metrics.
+    
+    Returns:
+        dict: enabled flag plus batch size and added wait time metrics when
+              coalescing is enabled (PAYROLL_COALESCE_WINDOW_MS > 0)
+    """
+    coalescer = get_coalescer()
+    if coalescer is None:
+        return {"enabled": False}
+    return {"enabled": True, **coalescer.stats()}
+
+
+@app.post("/api/payroll/process", response_model=PayrollResponse, openapi_extra=PAYROLL_REQUEST_BODY)
+async def process_payroll_endpoint(
+    http_request: Request,
+    request: PayrollRequest = Depends(payroll_request_body)
+):
     """
     Process payroll for a batch of employees.
     
     THE STITCHING: This endpoint orchestrates the entire payroll flow:
-    1. Validates JSON input (automatic via Pydantic)
+    1. Validates JSON input (Pydantic rules; column-wise for large batches)
     2. Converts to fixed-width format
     3. Invokes COBOL binary (where the real work happens)
     4. Parses results back to JSON
@@ -97,15 +290,24 @@ async def process_payroll_endpoint(request: PayrollRequest):
     
     The COBOL engine performs all calculations with exact decimal precision.
     This endpoint just handles the translation between modern JSON and legacy formats.
+    COBOL runs through the async bridge, so other requests (including /health)
+    keep being served while it works, and the run is killed if the client disconnects.
+    Results stay in integer cents until they are rendered as JSON here.
+    
+    With "Accept: application/x-ndjson" the results are streamed instead, one
+    JSON object per line followed by a summary line (see payroll_ndjson_stream),
+    so the response starts at once and is never buffered as a whole.
     
     Args:
         request: PayrollRequest containing list of employees to process
+        http_request: Raw request, used to detect client disconnects
         
     Returns:
         PayrollResponse: Processed payroll results with summary statistics
         
     Raises:
-        HTTPException 422: Validation error (automatic via Pydantic)
+        HTTPException 422: Validation error (see payroll_request_body)
+        HTTPException 499: Client disconnected (COBOL run cancelled)
         HTTPException 500: Processing error (file I/O, COBOL execution, parsing)
     
     Example:
@@ -141,18 +343,39 @@ async def process_payroll_endpoint(request: PayrollRequest):
     """
     logger.info(f"Received payroll processing request for {len(request.employees)} employees")
     
+    if wants_ndjson(http_request):
+        # Streamed mode: batches are rendered and sent as they finish
+        return StreamingResponse(
+            payroll_ndjson_stream(iter_employee_slices(request.employees, INGEST_BATCH_SIZE)),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    
     try:
         # Call the bridge module to process payroll
         # THE BRAIN DOES THE WORK: COBOL handles all calculations
-        response = process_payroll(request)
+        results = await run_until_disconnected(http_request, submit_payroll(request))
         
         logger.info(
             f"Payroll processing completed: "
-            f"{response.summary['processed']} processed, "
-            f"{response.summary['errors']} errors"
+            f"{results.processed} processed, "
+            f"{results.errors} errors"
         )
         
-        return response
+        # Same JSON as PayrollResponse, rendered straight from cents
+        return PayrollJSONResponse(await asyncio.to_thread(results.to_json_bytes))
+    
+    except ClientDisconnectedError as e:
+        # Client went away - COBOL run was cancelled and killed
+        error_msg = f"Payroll processing cancelled: {str(e)}"
+        logger.warning(error_msg)
+        raise HTTPException(
+            status_code=499,
+            detail={
+                "error": error_msg,
+                "error_type": "ClientDisconnected",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
         
     except FileNotFoundError as e:
         # COBOL binary or output file not found
@@ -207,27 +430,234 @@ async def process_payroll_endpoint(request: PayrollRequest):
         )
 
 
-@app.post("/api/payroll/process-and-settle")
-async def process_and_settle_endpoint(request: PayrollRequest):
+@app.post(
+    "/api/payroll/process-ndjson",
+    response_model=PayrollResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}}
+        }
+    }
+)
+async def process_payroll_ndjson_endpoint(http_request: Request):
+    """
+    Process payroll for a streamed NDJSON list of employees.
+    
+    Same calculation and response as /api/payroll/process, but the body is
+    one employee JSON object per line. Lines are validated as they arrive and
+    every PAYROLL_INGEST_BATCH_SIZE employees are handed to COBOL straight
+    away, so processing starts before the upload finishes and the whole
+    employee list is never held in memory at once.
+    
+    Args:
+        http_request: Raw request whose body is streamed
+    
+    Returns:
+        PayrollResponse: Processed payroll results with summary statistics
+    
+    Raises:
+        HTTPException 422: Invalid line (loc is ["body", line number, field]) or empty body
+        HTTPException 499: Client disconnected during the upload
+        HTTPException 500: Processing error
+    
+    Example:
+        curl -X POST -H "Content-Type: application/x-ndjson" \\
+             --data-binary @employees.ndjson http://localhost:8000/api/payroll/process-ndjson
+    """
+    logger.info("Received streamed NDJSON payroll request")
+    
+    try:
+        batches = iter_employee_batches(http_request.stream(), INGEST_BATCH_SIZE)
+        results = await process_payroll_stream_async(batches)
+        
+        logger.info(
+            f"NDJSON payroll processing completed: "
+            f"{results.processed} processed, "
+            f"{results.errors} errors"
+        )
+        
+        return PayrollJSONResponse(await asyncio.to_thread(results.to_json_bytes))
+    
+    except NDJSONValidationError as e:
+        # Same 422 response FastAPI gives for an invalid JSON body
+        logger.warning(str(e))
+        raise RequestValidationError(e.errors)
+    
+    except ClientDisconnect:
+        # Upload was aborted - batches already running were cancelled
+        error_msg = "Payroll processing cancelled: client disconnected during upload"
+        logger.warning(error_msg)
+        raise HTTPException(
+            status_code=499,
+            detail={
+                "error": error_msg,
+                "error_type": "ClientDisconnected",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+    
+    except Exception as e:
+        # Catch-all for unexpected errors
+        error_msg = f"Unexpected error during payroll processing: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": error_msg,
+                "error_type": "UnexpectedError",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+
+
+async def iter_upload_chunks(upload: UploadFile) -> AsyncIterator[bytes]:
+    """Read an uploaded file in UPLOAD_CHUNK_BYTES pieces."""
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+@app.post("/api/payroll/upload", response_model=PayrollResponse)
+async def upload_payroll_endpoint(
+    http_request: Request,
+    records: UploadFile = File(..., description="Fixed-width (23-byte records) or CSV employee file"),
+    wallets: Optional[UploadFile] = File(None, description="CSV of employee_id,wallet_address"),
+    upload_format: str = Form("auto", alias="format", description="auto, fixed or csv")
+):
+    """
+    Process payroll straight from an HR export file.
+    
+    Takes the 23-byte fixed-width records COBOL reads (or a CSV with
+    employee_id, hours_worked, hourly_rate and optional tax_code and
+    wallet_address columns) as a multipart upload. The file is validated
+    block by block with the EmployeePayrollInput rules - no JSON, no Pydantic
+    model per employee - and every PAYROLL_INGEST_BATCH_SIZE employees go to
+    COBOL while the rest is still being read. Wallet addresses come from the
+    optional wallets side file (or the CSV's wallet_address column).
+    
+    Responds like /api/payroll/process, including the streamed NDJSON mode
+    with "Accept: application/x-ndjson".
+    
+    Args:
+        http_request: Raw request, used for content negotiation
+        records: The employee file
+        wallets: Wallet side file, required unless the CSV has wallet addresses
+        upload_format: The "format" form field - "fixed", "csv" or "auto"
+            (CSV if the file name ends in .csv)
+    
+    Returns:
+        PayrollResponse: Processed payroll results with summary statistics
+    
+    Raises:
+        HTTPException 422: Invalid records (loc is ["body", "records", line, field])
+        HTTPException 500: Processing error
+    
+    Example:
+        curl -F records=@employees.dat -F wallets=@wallets.csv \\
+             http://localhost:8000/api/payroll/upload
+    """
+    logger.info(f"Received payroll upload: {records.filename}")
+    
+    try:
+        if upload_format not in UPLOAD_FORMATS:
+            raise UploadValidationError([{
+                "type": "enum",
+                "loc": ("body", "format"),
+                "msg": f"Input should be one of {UPLOAD_FORMATS}",
+                "input": upload_format
+            }])
+        if upload_format == "auto":
+            upload_format = "csv" if (records.filename or "").lower().endswith(".csv") else "fixed"
+        
+        wallet_map = parse_wallet_file(await wallets.read()) if wallets is not None else {}
+        batches = iter_upload_batches(
+            iter_upload_chunks(records), upload_format, wallet_map, INGEST_BATCH_SIZE
+        )
+        
+        if wants_ndjson(http_request):
+            # The whole upload has been received, so streaming the response is safe here
+            return StreamingResponse(payroll_ndjson_stream(batches), media_type=NDJSON_MEDIA_TYPE)
+        
+        results = await process_payroll_stream_async(batches)
+        
+        logger.info(
+            f"Uploaded payroll processing completed: "
+            f"{results.processed} processed, "
+            f"{results.errors} errors"
+        )
+        
+        return PayrollJSONResponse(await asyncio.to_thread(results.to_json_bytes))
+    
+    except UploadValidationError as e:
+        # Same 422 response FastAPI gives for an invalid JSON body
+        logger.warning(str(e))
+        raise RequestValidationError(e.errors)
+    
+    except Exception as e:
+        # Catch-all for unexpected errors
+        error_msg = f"Unexpected error during payroll processing: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": error_msg,
+                "error_type": "UnexpectedError",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+
+
+@app.post("/api/payroll/process-and-settle", openapi_extra=PAYROLL_REQUEST_BODY)
+async def process_and_settle_endpoint(
+    http_request: Request,
+    request: PayrollRequest = Depends(payroll_request_body),
+    wait_for_confirmation: bool = Query(True),
+    batch_id: Optional[str] = Query(None, min_length=1, max_length=100)
+):
     """
     Process payroll and execute blockchain settlement in one operation.
     
     THE COMPLETE FLOW: This endpoint orchestrates the entire Frankenstein system:
-    1. Validates JSON input (automatic via Pydantic)
+    1. Validates JSON input (Pydantic rules; column-wise for large batches)
     2. Processes payroll through COBOL (THE BRAIN does the calculations)
     3. Executes USDC transfers on Base L2 (THE BODY settles on blockchain)
     4. Returns combined payroll and settlement results
     
     This is the ultimate integration of legacy precision with modern settlement speed.
+    Both steps run off the event loop. A client disconnect cancels the COBOL run,
+    but once settlement has started it always runs to completion.
+    
+    With wait_for_confirmation=false the response comes back as soon as every
+    transfer has been submitted: settlement results are "pending" and carry a
+    settlement_id; GET /api/payroll/settlements/{settlement_id} reports
+    confirmations as the background tracker sees them.
+    
+    Employees sharing a wallet (e.g. a contractor with several employee IDs)
+    are paid with one transfer of their total. Each keeps a settlement result
+    of its own, with the shared transaction_hash, transfer_amount and
+    coalesced_employee_ids.
+    
+    Every transfer is journaled in the settlement ledger under batch_id
+    (a new one is generated when none is given, and returned with the
+    settlement). Repeating the request with the same batch_id - e.g. after a
+    crash or timeout - never pays anyone twice: transfers already made are
+    returned from the ledger, only the missing ones are sent.
     
     Args:
         request: PayrollRequest containing employees with wallet addresses
+        http_request: Raw request, used to detect client disconnects
+        wait_for_confirmation: Wait until every transfer is confirmed (default true)
+        batch_id: Payroll batch identifier; reuse it to resume an interrupted settlement
         
     Returns:
         dict: Combined response with payroll results and settlement summary
         
     Raises:
-        HTTPException 422: Validation error (automatic via Pydantic)
+        HTTPException 422: Validation error (see payroll_request_body)
+        HTTPException 499: Client disconnected before settlement started
         HTTPException 500: Processing or settlement error
     
     Example:
@@ -251,6 +681,7 @@ async def process_and_settle_endpoint(request: PayrollRequest):
                 "summary": {"processed": 1, "errors": 0}
             },
             "settlement": {
+                "batch_id": "6f1c...",
                 "total_processed": 1,
                 "total_succeeded": 1,
                 "total_failed": 0,
@@ -267,7 +698,8 @@ async def process_and_settle_endpoint(request: PayrollRequest):
         # Step 1: Process payroll through COBOL
         # THE BRAIN: COBOL handles all calculations with exact decimal precision
         logger.info("🧠 THE BRAIN: Processing payroll through COBOL...")
-        payroll_response = process_payroll(request)
+        payroll_results = await run_until_disconnected(http_request, submit_payroll(request))
+        payroll_response = await asyncio.to_thread(payroll_results.to_response)
         
         logger.info(
             f"✅ Payroll processing completed: "
@@ -280,16 +712,30 @@ async def process_and_settle_endpoint(request: PayrollRequest):
         # Note: Settlement works in mock mode without API keys
         logger.info("💸 THE BODY: Executing blockchain settlement...")
         try:
-            # Get network from environment or default to testnet
-            network = os.getenv("NETWORK_ID", "base-sepolia")
-            client = CoinbaseClient(network=network)
-            settlement_summary = client.batch_settle(payroll_response)
+            # Shared client for the configured network (NETWORK_ID, default testnet)
+            client = get_client_registry().get(DEFAULT_NETWORK)
+            batch_id = batch_id or uuid.uuid4().hex
+            # Blocking SDK calls run in a worker thread; never cancelled mid-settlement
+            if wait_for_confirmation:
+                settlement_summary = await asyncio.to_thread(
+                    client.batch_settle, payroll_response, batch_id=batch_id
+                )
             
-            logger.info(
-                f"✅ Settlement completed: "
-                f"{settlement_summary['total_succeeded']} succeeded, "
-                f"{settlement_summary['total_failed']} failed"
-            )
+                logger.info(
+                    f"✅ Settlement completed: "
+                    f"{settlement_summary['total_succeeded']} succeeded, "
+                    f"{settlement_summary['total_failed']} failed"
+                )
+            else:
+                settlement_summary = await asyncio.to_thread(
+                    get_settlement_tracker().submit, client, payroll_response, batch_id=batch_id
+                )
+                
+                logger.info(
+                    f"✅ Settlement {settlement_summary['settlement_id']} submitted: "
+                    f"{settlement_summary['total_submitted']} awaiting confirmation, "
+                    f"{settlement_summary['total_failed']} failed"
+                )
             
         except Exception as e:
             # Settlement error - payroll succeeded but settlement failed
@@ -305,17 +751,31 @@ async def process_and_settle_endpoint(request: PayrollRequest):
                 }
             )
         
-        # Step 3: Return combined response
-        combined_response = {
-            "payroll": payroll_response.model_dump(),
-            "settlement": settlement_summary
-        }
+        settlement_summary = {"batch_id": batch_id, **settlement_summary}
+        
+        # Step 3: Return combined response, rendered straight from cents
+        combined_response = await asyncio.to_thread(
+            render_settle_response, payroll_results, settlement_summary
+        )
         
         logger.info(
             f"🎉 FRANKENSTEIN COMPLETE: Payroll processed and settled successfully"
         )
         
-        return combined_response
+        return PayrollJSONResponse(combined_response)
+    
+    except ClientDisconnectedError as e:
+        # Client went away - COBOL run was cancelled and killed
+        error_msg = f"Payroll processing cancelled: {str(e)}"
+        logger.warning(error_msg)
+        raise HTTPException(
+            status_code=499,
+            detail={
+                "error": error_msg,
+                "error_type": "ClientDisconnected",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
         
     except FileNotFoundError as e:
         # COBOL binary or output file not found
@@ -370,6 +830,157 @@ async def process_and_settle_endpoint(request: PayrollRequest):
         )
 
 
+@app.post("/api/payroll/jobs", status_code=202, openapi_extra=PAYROLL_REQUEST_BODY)
+async def create_payroll_job(request: PayrollRequest = Depends(payroll_request_body)):
+    """
+    Queue a payroll batch as a background job.
+    
+    For batches too big to finish inside one HTTP request. The job ID is
+    returned at once; background workers run the batch through COBOL in
+    chunks of PAYROLL_JOB_CHUNK_SIZE employees and store every chunk's
+    results in SQLite, so results (and unfinished jobs) survive a restart.
+    
+    Args:
+        request: PayrollRequest containing list of employees to process
+    
+    Returns:
+        dict: The new job's status (see GET /api/payroll/jobs/{job_id})
+    
+    Raises:
+        HTTPException 422: Validation error (see payroll_request_body)
+        HTTPException 500: The job could not be stored
+    
+    Example:
+        POST /api/payroll/jobs
+        {"employees": [...]}
+        
+        Response (202):
+        {"job_id": "3f2a...", "status": "queued", "total": 250000, "completed": 0, ...}
+    """
+    logger.info(f"Received payroll job for {len(request.employees)} employees")
+    
+    try:
+        manager = await get_job_manager()
+        return await manager.submit(request)
+    
+    except Exception as e:
+        error_msg = f"Failed to queue payroll job: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": error_msg,
+                "error_type": "JobQueueError",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+
+
+async def _get_job_or_404(job_id: str) -> dict:
+    """Return a job's status, or raise 404 if it doesn't exist."""
+    manager = await get_job_manager()
+    job = await manager.status(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": f"Payroll job not found: {job_id}",
+                "error_type": "JobNotFound",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+    return job
+
+
+@app.get("/api/payroll/jobs/{job_id}")
+async def get_payroll_job(job_id: str):
+    """
+    Status and progress of a payroll job.
+    
+    Returns:
+        dict: job_id, status (queued/running/completed/failed), total and
+              completed employee counts, progress (0-1), summary so far,
+              error (when failed), created_at and updated_at
+    
+    Raises:
+        HTTPException 404: Unknown job ID
+    """
+    return await _get_job_or_404(job_id)
+
+
+@app.get("/api/payroll/jobs/{job_id}/results")
+async def get_payroll_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=100000)
+):
+    """
+    Results of a completed payroll job, one page at a time.
+    
+    Results are in request order and in the /api/payroll/process shape; the
+    summary covers the whole job.
+    
+    Args:
+        job_id: ID returned by POST /api/payroll/jobs
+        offset: Index of the first result to return
+        limit: Maximum number of results to return
+    
+    Returns:
+        dict: {"job_id", "offset", "limit", "total", "results": [...], "summary": {...}}
+    
+    Raises:
+        HTTPException 404: Unknown job ID
+        HTTPException 409: Job hasn't completed (yet)
+    """
+    job = await _get_job_or_404(job_id)
+    if job["status"] != "completed":
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "error": f"Payroll job {job_id} is {job['status']}, results are not available",
+                "error_type": "JobNotCompleted",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+    
+    manager = await get_job_manager()
+    return {
+        "job_id": job_id,
+        "offset": offset,
+        "limit": limit,
+        "total": job["total"],
+        "results": await manager.results(job_id, offset, limit),
+        "summary": job["summary"]
+    }
+
+
+@app.get("/api/payroll/settlements/{settlement_id}")
+async def get_settlement(settlement_id: str, include_results: bool = Query(True)):
+    """
+    Confirmation progress of a settlement submitted with wait_for_confirmation=false.
+    
+    Returns:
+        dict: settlement_id, status (pending/completed), total_processed,
+              confirmed, pending, failed and unknown counts, progress (0-1),
+              created_at, completed_at and (unless include_results=false)
+              every transfer's current result
+    
+    Raises:
+        HTTPException 404: Unknown settlement ID
+    """
+    settlement = get_settlement_tracker().status(settlement_id, include_results)
+    if settlement is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": f"Settlement not found: {settlement_id}",
+                "error_type": "SettlementNotFound",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+    return settlement
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -377,14 +988,46 @@ async def startup_event():
     logger.info("=" * 60)
     logger.info("Ledger-De-Main API Starting Up")
     logger.info("THE FRANKENSTEIN AWAKENS: Connecting COBOL brain to REST API")
+    logger.info(f"Payroll engine: {DEFAULT_ENGINE}")
     logger.info("=" * 60)
+    
+    # Warm up the persistent COBOL workers so the first request doesn't pay for startup
+    if DEFAULT_ENGINE == "pool":
+        try:
+            get_worker_pool()
+        except FileNotFoundError as e:
+            logger.error(f"COBOL worker pool unavailable: {e}")
+    
+    # Pick up background jobs a previous run left unfinished
+    await get_job_manager()
+    
+    # Load the settlement wallet now rather than on the first settle request
+    try:
+        await asyncio.to_thread(get_client_registry().warm_up, [DEFAULT_NETWORK])
+    except Exception as e:
+        logger.error(f"Settlement client warm-up failed: {e}")
+    
+    # Keep confirming the transfers a previous run left pending
+    try:
+        await asyncio.to_thread(
+            get_settlement_tracker().resume, get_client_registry().get(DEFAULT_NETWORK)
+        )
+    except Exception as e:
+        logger.error(f"Resuming pending settlements failed: {e}")
 
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Log shutdown information."""
+    """Log shutdown information and stop background COBOL workers."""
     logger.info("Ledger-De-Main API shutting down")
+    await shutdown_coalescer()
+    await shutdown_job_manager()
+    shutdown_settlement_tracker()
+    shutdown_client_registry()
+    shutdown_settlement_ledger()
+    shutdown_worker_pool()
+    shutdown_result_caches()
 
 
 # Serve frontend SPA - must be last route (catch-all)
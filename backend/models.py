@@ -7,6 +7,9 @@ from decimal import Decimal
 from typing import List
 from pydantic import BaseModel, Field
 
+# Printable ASCII: these fields go into the COBOL record one byte per character
+RECORD_TEXT_PATTERN = r"^[ -~]*$"
+
 
 class EmployeePayrollInput(BaseModel):
     """Single employee payroll input for processing."""
@@ -15,7 +18,8 @@ class EmployeePayrollInput(BaseModel):
         ...,
         min_length=1,
         max_length=10,
-        description="Unique employee identifier (max 10 characters)"
+        pattern=RECORD_TEXT_PATTERN,
+        description="Unique employee identifier (max 10 printable ASCII characters)"
     )
     hours_worked: Decimal = Field(
         ...,
@@ -35,6 +39,7 @@ class EmployeePayrollInput(BaseModel):
         default="US",
         min_length=2,
         max_length=2,
+        pattern=RECORD_TEXT_PATTERN,
         description="Two-character tax jurisdiction code"
     )
     wallet_address: str = Field(
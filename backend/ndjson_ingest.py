@@ -0,0 +1,134 @@
+"""
+Streaming NDJSON ingestion of employee records.
+
+A PayrollRequest body has to be read and turned into Pydantic objects as a
+whole before anything can run. An NDJSON body - one EmployeePayrollInput JSON
+object per line - is instead validated line by line as it arrives and handed
+on in fixed-size batches, so only the batches in flight are ever held in
+memory and COBOL can start on the first batch while the rest is uploading.
+
+Example body (Content-Type: application/x-ndjson):
+    {"employee_id": "EMP001", "hours_worked": "40.00", "hourly_rate": "25.50", "tax_code": "US", "wallet_address": "0x..."}
+    {"employee_id": "EMP002", "hours_worked": "35.50", "hourly_rate": "25.50", "tax_code": "US", "wallet_address": "0x..."}
+"""
+
+import logging
+from typing import AsyncIterator, Dict, List
+
+from pydantic import ValidationError
+
+from backend.models import EmployeePayrollInput
+
+logger = logging.getLogger("payroll_ingest")
+
+# A single employee record is ~200 bytes; anything this long is not one
+MAX_LINE_BYTES = 64 * 1024
+
+
+class NDJSONValidationError(ValueError):
+    """
+    Invalid NDJSON body.
+    
+    errors uses the shape of Pydantic/FastAPI validation errors, with loc
+    starting ("body", <line number>), so it can be raised as a 422
+    RequestValidationError.
+    """
+    
+    def __init__(self, errors: List[Dict]):
+        super().__init__(f"Invalid NDJSON body: {errors[0]['msg']}")
+        self.errors = errors
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[bytes]:
+    """
+    Split a stream of body chunks into lines without buffering the body.
+    
+    Args:
+        chunks: Raw body chunks (e.g. starlette Request.stream())
+        max_line_bytes: Longest line accepted
+    
+    Yields:
+        Each line without its trailing newline (a final unterminated line included)
+    
+    Raises:
+        NDJSONValidationError: If a line is longer than max_line_bytes
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            line_number += 1
+            yield line
+        if len(buffer) > max_line_bytes:
+            raise NDJSONValidationError([{
+                "type": "line_too_long",
+                "loc": ("body", line_number + 1),
+                "msg": f"NDJSON line longer than {max_line_bytes} bytes",
+                "input": None
+            }])
+    if buffer:
+        yield buffer
+
+
+async def iter_employee_batches(
+    chunks: AsyncIterator[bytes],
+    batch_size: int
+) -> AsyncIterator[List[EmployeePayrollInput]]:
+    """
+    Validate NDJSON employee records as they arrive, in batches.
+    
+    Blank lines are skipped. Validation is the same as for PayrollRequest,
+    only the error locations are (line number, field) instead of
+    ("employees", index, field).
+    
+    Args:
+        chunks: Raw body chunks
+        batch_size: Employees per yielded batch
+    
+    Yields:
+        Lists of up to batch_size validated EmployeePayrollInput
+    
+    Raises:
+        NDJSONValidationError: On the first invalid line, or if there are no records
+    """
+    if batch_size < 1:
+        raise ValueError(f"Batch size must be at least 1, got: {batch_size}")
+    
+    batch: List[EmployeePayrollInput] = []
+    line_number = 0
+    total = 0
+    async for line in iter_ndjson_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        
+        try:
+            batch.append(EmployeePayrollInput.model_validate_json(line))
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+            for error in errors:
+                error["loc"] = ("body", line_number, *error["loc"])
+            raise NDJSONValidationError(errors)
+        
+        if len(batch) >= batch_size:
+            total += len(batch)
+            yield batch
+            batch = []
+    
+    total += len(batch)
+    if total == 0:
+        raise NDJSONValidationError([{
+            "type": "too_short",
+            "loc": ("body",),
+            "msg": "NDJSON body must contain at least 1 employee",
+            "input": None
+        }])
+    if batch:
+        yield batch
+    logger.info(f"Ingested {total} employees from NDJSON ({line_number} lines)")
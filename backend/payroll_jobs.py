@@ -0,0 +1,346 @@
+"""
+Background payroll jobs for batches too big for one HTTP request.
+
+POST /api/payroll/jobs hands the request to PayrollJobManager and returns a
+job ID straight away. Background workers run the job in chunks of
+PAYROLL_JOB_CHUNK_SIZE employees, so every COBOL run stays well inside
+PAYROLL_COBOL_TIMEOUT, and store each finished chunk in SQLite. Progress can
+be polled while it runs, and both results and unfinished jobs survive a
+restart - a job interrupted by a shutdown resumes at its first missing chunk.
+"""
+
+import json
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from backend.models import PayrollRequest
+from backend.payroll_results import PayrollResultSet
+
+logger = logging.getLogger("payroll_jobs")
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+# Jobs in these states are picked up again when the manager starts
+UNFINISHED_STATUSES = ("queued", "running")
+
+
+def _timestamp() -> str:
+    """Current UTC time in the API's timestamp format."""
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class JobStore:
+    """
+    SQLite storage for payroll jobs, their requests and their result chunks.
+    
+    Example:
+        store = JobStore("data/payroll_jobs.db")
+        store.create("3f2a...", request.model_dump_json(), total=250000)
+        store.save_chunk("3f2a...", start=0, results=[...], processed=50000, errors=0)
+        store.get("3f2a...")["completed"]   # 50000
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the job database.
+        
+        Args:
+            db_path: SQLite file holding jobs and results (":memory:" for tests)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " total INTEGER NOT NULL,"
+            " completed INTEGER NOT NULL DEFAULT 0,"
+            " processed INTEGER NOT NULL DEFAULT 0,"
+            " errors INTEGER NOT NULL DEFAULT 0,"
+            " error TEXT,"
+            " request TEXT NOT NULL,"
+            " created_at TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_chunks ("
+            " job_id TEXT NOT NULL,"
+            " start INTEGER NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " results TEXT NOT NULL,"
+            " PRIMARY KEY (job_id, start))"
+        )
+        self._db.commit()
+        logger.info(f"Payroll job store: {db_path}")
+    
+    def create(self, job_id: str, request_json: str, total: int) -> None:
+        """Insert a new queued job."""
+        now = _timestamp()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (job_id, status, total, request, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, total, request_json, now, now)
+            )
+            self._db.commit()
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Return a job's status and progress.
+        
+        Returns:
+            Job dictionary (see PayrollJobManager.status), or None if unknown
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id, status, total, completed, processed, errors, error, "
+                "created_at, updated_at FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        
+        job = dict(row)
+        job["progress"] = round(job["completed"] / job["total"], 4) if job["total"] else 1.0
+        job["summary"] = {"processed": job.pop("processed"), "errors": job.pop("errors")}
+        return job
+    
+    def load_request(self, job_id: str) -> PayrollRequest:
+        """Return the stored request of a job."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT request FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return PayrollRequest.model_validate_json(row["request"])
+    
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """Update a job's status (and error message when it failed)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                (status, error, _timestamp(), job_id)
+            )
+            self._db.commit()
+    
+    def save_chunk(
+        self,
+        job_id: str,
+        start: int,
+        results: List[Dict],
+        processed: int,
+        errors: int
+    ) -> None:
+        """
+        Store one finished chunk and advance the job's progress atomically.
+        
+        Args:
+            job_id: Job the chunk belongs to
+            start: Index of the chunk's first employee in the request
+            results: The chunk's results in the /api/payroll/process JSON shape
+            processed: OK records in the chunk
+            errors: Error records in the chunk
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO job_chunks (job_id, start, count, results) VALUES (?, ?, ?, ?)",
+                (job_id, start, len(results), json.dumps(results))
+            )
+            self._db.execute(
+                "UPDATE jobs SET completed = completed + ?, processed = processed + ?, "
+                "errors = errors + ?, updated_at = ? WHERE job_id = ?",
+                (len(results), processed, errors, _timestamp(), job_id)
+            )
+    
+    def read_results(self, job_id: str, offset: int, limit: int) -> List[Dict]:
+        """
+        Return results offset..offset+limit of a job, in request order.
+        
+        Only the chunks overlapping the requested range are loaded.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT start, results FROM job_chunks "
+                "WHERE job_id = ? AND start < ? AND start + count > ? ORDER BY start",
+                (job_id, offset + limit, offset)
+            ).fetchall()
+        
+        results: List[Dict] = []
+        for row in rows:
+            chunk = json.loads(row["results"])
+            begin = max(offset - row["start"], 0)
+            results.extend(chunk[begin:begin + limit - len(results)])
+        return results
+    
+    def unfinished(self) -> List[str]:
+        """Return IDs of queued or running jobs, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id FROM jobs WHERE status IN (?, ?) ORDER BY created_at, rowid",
+                UNFINISHED_STATUSES
+            ).fetchall()
+        return [row["job_id"] for row in rows]
+    
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+
+class PayrollJobManager:
+    """
+    Runs payroll jobs on background asyncio workers.
+    
+    Example:
+        manager = PayrollJobManager(JobStore("data/payroll_jobs.db"), process_payroll_results_async)
+        await manager.start()
+        job = await manager.submit(request)         # {"job_id": ..., "status": "queued", ...}
+        await manager.status(job["job_id"])         # progress while it runs
+        await manager.results(job["job_id"], 0, 1000)
+    """
+    
+    def __init__(
+        self,
+        store: JobStore,
+        run: Callable[[PayrollRequest], Awaitable[PayrollResultSet]],
+        chunk_size: int = 50000,
+        workers: int = 1
+    ):
+        """
+        Create a job manager.
+        
+        Args:
+            store: Where jobs, requests and results are kept
+            run: Coroutine function that processes one chunk request
+            chunk_size: Employees per COBOL run (and per stored chunk)
+            workers: Jobs processed concurrently
+        """
+        if chunk_size < 1 or workers < 1:
+            raise ValueError(
+                f"Job chunk size and workers must be at least 1, got: {chunk_size}, {workers}"
+            )
+        
+        self.store = store
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self._run = run
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def start(self) -> None:
+        """Start the workers and requeue jobs left unfinished by a previous run."""
+        if self._queue is not None:
+            return
+        
+        self._queue = asyncio.Queue()
+        for job_id in await asyncio.to_thread(self.store.unfinished):
+            logger.info(f"Resuming payroll job {job_id}")
+            self._queue.put_nowait(job_id)
+        
+        for _ in range(self.workers):
+            task = asyncio.ensure_future(self._worker())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def submit(self, request: PayrollRequest) -> Dict:
+        """
+        Store a request as a new job and queue it.
+        
+        Args:
+            request: Validated payroll request of any size
+        
+        Returns:
+            The new job's status dictionary
+        """
+        await self.start()
+        
+        job_id = uuid.uuid4().hex
+        request_json = await asyncio.to_thread(request.model_dump_json)
+        await asyncio.to_thread(self.store.create, job_id, request_json, len(request.employees))
+        logger.info(f"Queued payroll job {job_id} for {len(request.employees)} employees")
+        
+        self._queue.put_nowait(job_id)
+        return await self.status(job_id)
+    
+    async def status(self, job_id: str) -> Optional[Dict]:
+        """
+        Return a job's status and progress.
+        
+        Returns:
+            {"job_id", "status", "total", "completed", "progress", "summary",
+             "error", "created_at", "updated_at"}, or None if the job is unknown
+        """
+        return await asyncio.to_thread(self.store.get, job_id)
+    
+    async def results(self, job_id: str, offset: int, limit: int) -> List[Dict]:
+        """Return results offset..offset+limit of a job in request order."""
+        return await asyncio.to_thread(self.store.read_results, job_id, offset, limit)
+    
+    async def _worker(self) -> None:
+        """Process queued jobs one after another."""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            finally:
+                self._queue.task_done()
+    
+    async def _process(self, job_id: str) -> None:
+        """Run the missing chunks of one job, storing each as it finishes."""
+        job = await self.status(job_id)
+        if job is None or job["status"] not in UNFINISHED_STATUSES:
+            return
+        
+        await asyncio.to_thread(self.store.set_status, job_id, "running")
+        
+        try:
+            request = await asyncio.to_thread(self.store.load_request, job_id)
+            employees = request.employees
+            
+            for start in range(job["completed"], len(employees), self.chunk_size):
+                chunk = PayrollRequest.model_construct(
+                    employees=employees[start:start + self.chunk_size]
+                )
+                results = await self._run(chunk)
+                response = await asyncio.to_thread(results.to_json)
+                await asyncio.to_thread(
+                    self.store.save_chunk,
+                    job_id,
+                    start,
+                    response["results"],
+                    results.processed,
+                    results.errors
+                )
+                logger.info(
+                    f"Payroll job {job_id}: {start + len(chunk.employees)}/{len(employees)} employees"
+                )
+        
+        except Exception as e:
+            error_msg = f"Payroll job {job_id} failed: {e}"
+            logger.error(error_msg)
+            await asyncio.to_thread(self.store.set_status, job_id, "failed", str(e))
+            return
+        
+        await asyncio.to_thread(self.store.set_status, job_id, "completed")
+        logger.info(f"Payroll job {job_id} completed")
+    
+    async def close(self) -> None:
+        """
+        Stop the workers and close the store.
+        
+        A job that was running stays "running" in the store and resumes from
+        its next chunk when a new manager starts.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._queue = None
+        self.store.close()
@@ -0,0 +1,333 @@
+"""
+Compact payroll result set with money held as integer cents.
+
+COBOL reports every amount as PIC 9(10)V99 digits, i.e. an integer number of
+cents. PayrollResultSet keeps them that way - one array('q') column per
+amount instead of four Decimal objects per employee - and only converts to
+Decimal (PayrollResponse) or JSON text at the API boundary.
+"""
+
+import json
+from array import array
+from decimal import Decimal
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Callable, Dict, Iterator, List, NamedTuple
+
+import numpy as np
+
+from backend.models import EmployeePayrollOutput, PayrollResponse
+
+# Status strings are shared instead of allocated per line
+STATUSES = {"OK": "OK", "ER": "ER"}
+
+# One result object as compact JSON, keys in EmployeePayrollOutput order,
+# amounts as strings (/api/payroll/process) or as numbers
+ROW_JSON_TEMPLATE = (
+    '{"employee_id":%s,"gross_pay":"%s","federal_tax":"%s","state_tax":"%s",'
+    '"net_pay":"%s","status":%s,"wallet_address":%s}'
+)
+ROW_JSON_NUMERIC_TEMPLATE = ROW_JSON_TEMPLATE.replace('"%s"', "%s")
+
+# format_cents() ending for every cents fraction: 0 -> "", 50 -> ".5", 5 -> ".05"
+CENTS_SUFFIXES = tuple(
+    "" if fraction == 0 else f".{fraction // 10}" if fraction % 10 == 0 else f".{fraction:02d}"
+    for fraction in range(100)
+)
+
+
+class ResultRow(NamedTuple):
+    """One employee result, amounts in integer cents."""
+    employee_id: str
+    gross_cents: int
+    federal_tax_cents: int
+    state_tax_cents: int
+    net_cents: int
+    status: str
+    wallet_address: str
+
+
+def format_cents(cents: int) -> str:
+    """
+    Render cents exactly like str(Decimal(cents) / 100).
+    
+    This is the text the API has always returned for amounts, produced
+    without creating a Decimal.
+    
+    Example:
+        format_cents(102000)  # "1020"
+        format_cents(72420)   # "724.2"
+        format_cents(13579)   # "135.79"
+    
+    Args:
+        cents: Non-negative amount in cents (COBOL amounts are unsigned)
+    
+    Returns:
+        Amount in dollars with trailing zeros removed
+    """
+    units, fraction = divmod(cents, 100)
+    if fraction == 0:
+        return str(units)
+    if fraction % 10 == 0:
+        return f"{units}.{fraction // 10}"
+    return f"{units}.{fraction:02d}"
+
+
+def format_cents_column(cents: array) -> List[str]:
+    """
+    format_cents() of a whole array('q') column.
+    
+    Dollars and cents are split in one NumPy pass and the text is joined
+    by C-level map() calls, so there is no Python call per amount.
+    """
+    dollars, fractions = np.divmod(np.frombuffer(cents, dtype=np.int64), 100)
+    return list(map(
+        str.__add__,
+        map(str, dollars.tolist()),
+        map(CENTS_SUFFIXES.__getitem__, fractions.tolist())
+    ))
+
+
+class PayrollResultSet:
+    """
+    Columnar payroll results.
+    
+    Example:
+        results = build_payroll_results(employees, output_lines)
+        results.net_cents[0]     # 81600
+        results.to_json()        # API JSON, amounts as "816"
+        results.to_response()    # PayrollResponse with Decimal amounts
+    """
+    
+    __slots__ = (
+        "employee_ids",
+        "gross_cents",
+        "federal_tax_cents",
+        "state_tax_cents",
+        "net_cents",
+        "statuses",
+        "wallet_addresses",
+        "processed",
+        "errors",
+    )
+    
+    def __init__(self):
+        self.employee_ids: List[str] = []
+        self.gross_cents = array("q")
+        self.federal_tax_cents = array("q")
+        self.state_tax_cents = array("q")
+        self.net_cents = array("q")
+        self.statuses: List[str] = []
+        self.wallet_addresses: List[str] = []
+        self.processed = 0
+        self.errors = 0
+    
+    def append(
+        self,
+        employee_id: str,
+        gross_cents: int,
+        federal_tax_cents: int,
+        state_tax_cents: int,
+        net_cents: int,
+        status: str,
+        wallet_address: str
+    ) -> None:
+        """Add one employee result."""
+        self.employee_ids.append(employee_id)
+        self.gross_cents.append(gross_cents)
+        self.federal_tax_cents.append(federal_tax_cents)
+        self.state_tax_cents.append(state_tax_cents)
+        self.net_cents.append(net_cents)
+        self.statuses.append(STATUSES.get(status, status))
+        self.wallet_addresses.append(wallet_address)
+    
+    def append_report_line(self, line: str, wallet_address: str) -> None:
+        """
+        Decode one 60-byte COBOL report record straight into cents and add it.
+        
+        Args:
+            line: Employee record line from the report (not the SUMMARY line)
+            wallet_address: Settlement wallet of this employee
+        
+        Raises:
+            ValueError: If the line is shorter than 60 bytes or an amount isn't numeric
+        """
+        if len(line) < 60:
+            raise ValueError(f"Output line too short: expected 60 bytes, got {len(line)}")
+        
+        self.append(
+            line[0:10].strip(),
+            int(line[10:22]),
+            int(line[22:34]),
+            int(line[34:46]),
+            int(line[46:58]),
+            line[58:60].strip(),
+            wallet_address
+        )
+    
+    def __len__(self) -> int:
+        return len(self.employee_ids)
+    
+    def __iter__(self) -> Iterator[ResultRow]:
+        return map(
+            ResultRow,
+            self.employee_ids,
+            self.gross_cents,
+            self.federal_tax_cents,
+            self.state_tax_cents,
+            self.net_cents,
+            self.statuses,
+            self.wallet_addresses
+        )
+    
+    def slice(self, start: int, stop: int) -> "PayrollResultSet":
+        """
+        Return results start..stop as a new set with its own summary.
+        
+        The summary is counted from the statuses exactly as COBOL counts
+        them: OK records are processed, everything else is an error.
+        
+        Args:
+            start: Index of the first result
+            stop: Index after the last result
+        
+        Returns:
+            PayrollResultSet holding copies of the selected rows
+        """
+        part = PayrollResultSet()
+        part.employee_ids = self.employee_ids[start:stop]
+        part.gross_cents = self.gross_cents[start:stop]
+        part.federal_tax_cents = self.federal_tax_cents[start:stop]
+        part.state_tax_cents = self.state_tax_cents[start:stop]
+        part.net_cents = self.net_cents[start:stop]
+        part.statuses = self.statuses[start:stop]
+        part.wallet_addresses = self.wallet_addresses[start:stop]
+        part.processed = part.statuses.count("OK")
+        part.errors = len(part.statuses) - part.processed
+        return part
+    
+    def extend(self, other: "PayrollResultSet") -> None:
+        """
+        Append another result set (e.g. the next batch of a stream) and its summary.
+        
+        Args:
+            other: Results to add after this set's results
+        """
+        self.employee_ids.extend(other.employee_ids)
+        self.gross_cents.extend(other.gross_cents)
+        self.federal_tax_cents.extend(other.federal_tax_cents)
+        self.state_tax_cents.extend(other.state_tax_cents)
+        self.net_cents.extend(other.net_cents)
+        self.statuses.extend(other.statuses)
+        self.wallet_addresses.extend(other.wallet_addresses)
+        self.processed += other.processed
+        self.errors += other.errors
+    
+    @property
+    def summary(self) -> Dict[str, int]:
+        """Processed/error counts in the PayrollResponse.summary shape."""
+        return {"processed": self.processed, "errors": self.errors}
+    
+    def to_response(self) -> PayrollResponse:
+        """
+        Convert to the Pydantic PayrollResponse (Decimal amounts).
+        
+        Returns:
+            PayrollResponse equal to what build_payroll_response() always produced
+        """
+        return PayrollResponse(
+            results=[
+                EmployeePayrollOutput(
+                    employee_id=row.employee_id,
+                    gross_pay=Decimal(row.gross_cents) / 100,
+                    federal_tax=Decimal(row.federal_tax_cents) / 100,
+                    state_tax=Decimal(row.state_tax_cents) / 100,
+                    net_pay=Decimal(row.net_cents) / 100,
+                    status=row.status,
+                    wallet_address=row.wallet_address
+                )
+                for row in self
+            ],
+            summary=self.summary
+        )
+    
+    @staticmethod
+    def _row_json(row: ResultRow) -> Dict:
+        """One result in the API JSON shape, amounts rendered with format_cents()."""
+        return {
+            "employee_id": row.employee_id,
+            "gross_pay": format_cents(row.gross_cents),
+            "federal_tax": format_cents(row.federal_tax_cents),
+            "state_tax": format_cents(row.state_tax_cents),
+            "net_pay": format_cents(row.net_cents),
+            "status": row.status,
+            "wallet_address": row.wallet_address
+        }
+    
+    def to_json(self) -> Dict:
+        """
+        Convert to JSON-ready data in the /api/payroll/process response shape.
+        
+        Amounts are rendered with format_cents(), so the output is identical
+        to serialising to_response(), without building any Decimal or model.
+        
+        Returns:
+            {"results": [...], "summary": {"processed": n, "errors": n}}
+        """
+        return {
+            "results": [self._row_json(row) for row in self],
+            "summary": self.summary
+        }
+    
+    def _json_rows(self, escape: Callable[[str], str], template: str = ROW_JSON_TEMPLATE) -> Iterator[str]:
+        """
+        Render every result as compact JSON text, column by column.
+        
+        Args:
+            escape: JSON string encoder for the text fields
+            template: ROW_JSON_TEMPLATE or ROW_JSON_NUMERIC_TEMPLATE
+        """
+        return map(template.__mod__, zip(
+            map(escape, self.employee_ids),
+            format_cents_column(self.gross_cents),
+            format_cents_column(self.federal_tax_cents),
+            format_cents_column(self.state_tax_cents),
+            format_cents_column(self.net_cents),
+            map(escape, self.statuses),
+            map(escape, self.wallet_addresses)
+        ))
+    
+    def to_json_bytes(self, numeric_amounts: bool = False) -> bytes:
+        """
+        Render the response body straight from the cents columns.
+        
+        Byte for byte what JSONResponse makes of to_json(), without building
+        a dict per result or walking them with the JSON encoder: every result
+        is one string template filled from the columns. With numeric_amounts
+        the amounts are JSON numbers instead, exactly as FastAPI's
+        jsonable_encoder renders to_response().model_dump() (1020, 905.25).
+        
+        Args:
+            numeric_amounts: Render amounts as numbers instead of strings
+        
+        Returns:
+            UTF-8 JSON: {"results": [...], "summary": {"processed": n, "errors": n}}
+        """
+        rows = self._json_rows(
+            encode_basestring, ROW_JSON_NUMERIC_TEMPLATE if numeric_amounts else ROW_JSON_TEMPLATE
+        )
+        summary = json.dumps(self.summary, separators=(",", ":"))
+        return ('{"results":[' + ",".join(rows) + '],"summary":' + summary + "}").encode("utf-8")
+    
+    def to_ndjson(self) -> bytes:
+        """
+        Render the results as NDJSON, one result object per line.
+        
+        Each line is the JSON of one entry of to_json()["results"]. The
+        summary is not included; a stream adds it as its trailing record.
+        
+        Returns:
+            UTF-8 NDJSON, every line terminated by a newline
+        """
+        return "".join(
+            row + "\n" for row in self._json_rows(encode_basestring_ascii)
+        ).encode("utf-8")
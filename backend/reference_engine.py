@@ -0,0 +1,178 @@
+"""
+NumPy reference payroll engine.
+
+A vectorised re-implementation of CALCULATE-PAYROLL from cobol/payroll.cbl
+that works on integer cents arrays. It reproduces the COBOL arithmetic
+bit-for-bit:
+
+- COMPUTE ... ROUNDED without a MODE clause rounds half away from zero
+  (the "BANKER'S ROUNDING" comment in payroll.cbl does not match the code;
+  the code is what we reproduce)
+- Results are stored in PIC 9(8)V99 fields, so high-order digits beyond
+  8 integer places are truncated
+- The PIC 9(5) summary counters wrap at 100000
+
+COBOL stays the source of truth. This engine exists to check the binary
+(differential runs) and to give very large batches a fast path when
+PAYROLL_ENGINE=reference is chosen on purpose.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+INPUT_RECORD_LENGTH = 23
+OUTPUT_RECORD_LENGTH = 60
+
+# WS-FEDERAL-RATE / WS-STATE-RATE (PIC V99) in hundredths
+FEDERAL_RATE = 15
+STATE_RATE = 5
+
+# PIC 9(8)V99 holds 10 digits of cents, PIC 9(5) counters hold 5 digits
+PAY_FIELD_MODULUS = 10 ** 10
+COUNTER_MODULUS = 10 ** 5
+
+# Output record layout: ID, 4 x PIC 9(10)V99, status
+OUTPUT_FIELD_WIDTH = 12
+OUTPUT_FIELD_OFFSETS = (10, 22, 34, 46)
+STATUS_OFFSET = 58
+
+_ZERO = ord("0")
+_POWERS_OF_TEN = 10 ** np.arange(OUTPUT_FIELD_WIDTH - 1, -1, -1, dtype=np.int64)
+
+
+def _rounded(value: np.ndarray, divisor: int) -> np.ndarray:
+    """COBOL ROUNDED for non-negative values: half away from zero."""
+    return (value + divisor // 2) // divisor
+
+
+def calculate_payroll(
+    hours_cents: np.ndarray,
+    rate_cents: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorised CALCULATE-PAYROLL on integer cents.
+    
+    Example:
+        gross, fed, state, net = calculate_payroll(
+            np.array([4000]), np.array([2550])
+        )
+        # gross=[102000], fed=[15300], state=[5100], net=[81600]
+    
+    Args:
+        hours_cents: Hours worked x 100 (PIC 999V99 as an integer)
+        rate_cents: Hourly rate x 100 (PIC 9999V99 as an integer)
+    
+    Returns:
+        (gross, federal_tax, state_tax, net) as int64 cents arrays
+    """
+    hours_cents = np.asarray(hours_cents, dtype=np.int64)
+    rate_cents = np.asarray(rate_cents, dtype=np.int64)
+    
+    # hours x rate carries 4 implied decimals, round it to 2
+    gross = _rounded(hours_cents * rate_cents, 100) % PAY_FIELD_MODULUS
+    federal_tax = _rounded(gross * FEDERAL_RATE, 100) % PAY_FIELD_MODULUS
+    state_tax = _rounded(gross * STATE_RATE, 100) % PAY_FIELD_MODULUS
+    net = (gross - federal_tax - state_tax) % PAY_FIELD_MODULUS
+    
+    return gross, federal_tax, state_tax, net
+
+
+def _digits_to_int(digits: np.ndarray) -> np.ndarray:
+    """Convert an (n, width) array of ASCII digits to int64 values."""
+    values = digits.astype(np.int64) - _ZERO
+    if values.size and (values.min() < 0 or values.max() > 9):
+        raise ValueError("Numeric input field contains non-digit characters")
+    weights = 10 ** np.arange(digits.shape[1] - 1, -1, -1, dtype=np.int64)
+    return values @ weights
+
+
+def _write_digits(out: np.ndarray, offset: int, values: np.ndarray) -> None:
+    """Write values as zero-padded 12-digit ASCII into out[:, offset:offset+12]."""
+    digits = (values[:, None] // _POWERS_OF_TEN) % 10
+    out[:, offset:offset + OUTPUT_FIELD_WIDTH] = digits + _ZERO
+
+
+def run_job(records: List[str]) -> List[str]:
+    """
+    Run one payroll job with the reference engine.
+    
+    Same contract as the COBOL engines: 23-byte records in, 60-byte result
+    lines plus the summary line out, in input order.
+    
+    Example:
+        lines = run_job(["EMP001    04000002550US"])
+        # ["EMP001    000000102000000000015300000000005100000000081600OK",
+        #  "SUMMARY: PROCESSED=00001 ERRORS=00000"]
+    
+    Args:
+        records: 23-byte fixed-width input records
+    
+    Returns:
+        Result lines in input order followed by the summary line
+    
+    Raises:
+        ValueError: If a record is not 23 ASCII bytes or a numeric field isn't numeric
+    """
+    count = len(records)
+    raw = "".join(records).encode("ascii")
+    if len(raw) != count * INPUT_RECORD_LENGTH:
+        raise ValueError("Every input record must be exactly 23 bytes")
+    
+    data = np.frombuffer(raw, dtype=np.uint8).reshape(count, INPUT_RECORD_LENGTH)
+    ids = data[:, 0:10]
+    hours_cents = _digits_to_int(data[:, 10:15])
+    rate_cents = _digits_to_int(data[:, 15:21])
+    
+    # VALIDATE-INPUT: blank ID, zero hours or zero rate make an error record
+    valid = (ids != ord(" ")).any(axis=1) & (hours_cents > 0) & (rate_cents > 0)
+    
+    values = calculate_payroll(hours_cents, rate_cents)
+    
+    out = np.empty((count, OUTPUT_RECORD_LENGTH), dtype=np.uint8)
+    out[:, 0:10] = ids
+    for offset, field in zip(OUTPUT_FIELD_OFFSETS, values):
+        # WRITE-ERROR-RECORD moves zero to every amount
+        _write_digits(out, offset, np.where(valid, field, 0))
+    out[:, STATUS_OFFSET] = np.where(valid, ord("O"), ord("E"))
+    out[:, STATUS_OFFSET + 1] = np.where(valid, ord("K"), ord("R"))
+    
+    text = out.tobytes().decode("ascii")
+    lines = [
+        text[offset:offset + OUTPUT_RECORD_LENGTH]
+        for offset in range(0, len(text), OUTPUT_RECORD_LENGTH)
+    ]
+    
+    processed = int(valid.sum()) % COUNTER_MODULUS
+    errors = (count - int(valid.sum())) % COUNTER_MODULUS
+    lines.append(f"SUMMARY: PROCESSED={processed:05d} ERRORS={errors:05d}")
+    return lines
+
+
+def compare_reports(expected: List[str], actual: List[str]) -> List[Dict]:
+    """
+    Compare two reports line by line.
+    
+    Example:
+        mismatches = compare_reports(cobol_lines, run_job(records))
+        # [{"line": 3, "expected": "EMP004 ...", "actual": "EMP004 ..."}]
+    
+    Args:
+        expected: Report lines from the authoritative engine
+        actual: Report lines from the engine under test
+    
+    Returns:
+        One dictionary per differing line (empty when the reports match).
+        A missing line on either side is reported as None.
+    """
+    mismatches = []
+    for index in range(max(len(expected), len(actual))):
+        expected_line = expected[index] if index < len(expected) else None
+        actual_line = actual[index] if index < len(actual) else None
+        if expected_line != actual_line:
+            mismatches.append({
+                "line": index,
+                "expected": expected_line,
+                "actual": actual_line
+            })
+    return mismatches
@@ -0,0 +1,229 @@
+"""
+Memory-mapped reader for COBOL report files (output.rpt).
+
+read_output_file() + parse_output_line() load the whole report as a list of
+strings and build four Decimals per line. For multi-million-line reports this
+module maps the file instead and decodes the fixed 60-byte layout straight
+into integer cents, one record at a time. Memory use stays flat no matter how
+large the report is.
+
+The subprocess engine reads its reports this way (read_report_results())
+whenever nothing needs them as lines - see bridge.reads_report_directly().
+"""
+
+import os
+import re
+import mmap
+from typing import Dict, Iterator, NamedTuple, Sequence
+
+from backend.models import EmployeePayrollInput
+from backend.payroll_results import PayrollResultSet
+
+OUTPUT_RECORD_LENGTH = 60
+
+# Byte offsets of the 60-byte output record
+EMPLOYEE_ID = slice(0, 10)
+GROSS_PAY = slice(10, 22)
+FEDERAL_TAX = slice(22, 34)
+STATE_TAX = slice(34, 46)
+NET_PAY = slice(46, 58)
+STATUS = slice(58, 60)
+
+SUMMARY_PREFIX = b"SUMMARY:"
+
+# Bytes of the report decoded per step (about 16k records)
+READ_BLOCK_BYTES = 1024 * 1024
+
+# The summary line is short; this much of the file tail always contains it
+SUMMARY_TAIL_BYTES = 256
+
+
+class ReportRecord(NamedTuple):
+    """One employee result from the COBOL report, amounts in integer cents."""
+    employee_id: str
+    gross_cents: int
+    federal_tax_cents: int
+    state_tax_cents: int
+    net_cents: int
+    status: str
+
+
+def parse_record(line: bytes) -> ReportRecord:
+    """
+    Decode one 60-byte report record.
+    
+    Example:
+        parse_record(b"EMP001    000000102000000000015300000000005100000000081600OK")
+        # ReportRecord(employee_id="EMP001", gross_cents=102000,
+        #              federal_tax_cents=15300, state_tax_cents=5100,
+        #              net_cents=81600, status="OK")
+    
+    Args:
+        line: Record bytes without the line terminator
+    
+    Returns:
+        ReportRecord with amounts in cents
+    
+    Raises:
+        ValueError: If the record is shorter than 60 bytes or an amount isn't numeric
+    """
+    if len(line) < OUTPUT_RECORD_LENGTH:
+        raise ValueError(
+            f"Output line too short: expected {OUTPUT_RECORD_LENGTH} bytes, got {len(line)}"
+        )
+    
+    return ReportRecord(
+        line[EMPLOYEE_ID].decode("ascii").strip(),
+        int(line[GROSS_PAY]),
+        int(line[FEDERAL_TAX]),
+        int(line[STATE_TAX]),
+        int(line[NET_PAY]),
+        line[STATUS].decode("ascii")
+    )
+
+
+def iter_report_records(output_file_path: str) -> Iterator[ReportRecord]:
+    """
+    Lazily yield the employee records of a COBOL report.
+    
+    The file is memory-mapped and decoded one block of lines at a time as
+    records are consumed; blank lines and the SUMMARY line are skipped.
+    Windows line endings are accepted (the trailing CR is past byte 60).
+    
+    Example:
+        for record in iter_report_records("data/jobs/job-x/output.rpt"):
+            total += record.net_cents
+    
+    Args:
+        output_file_path: Path of the fixed-width report written by COBOL
+    
+    Yields:
+        ReportRecord per employee, in report order
+    
+    Raises:
+        FileNotFoundError: If the report doesn't exist
+        ValueError: If a record is malformed
+    """
+    with open(output_file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as report:
+            size = len(report)
+            position = 0
+            while position < size:
+                # Decode a block of whole lines at a time; only the block is held in memory
+                end = report.rfind(b"\n", position, position + READ_BLOCK_BYTES) + 1
+                if end <= position:
+                    end = size
+                block = report[position:end]
+                position = end
+                
+                for line in block.split(b"\n"):
+                    if len(line) >= OUTPUT_RECORD_LENGTH and not line.startswith(SUMMARY_PREFIX):
+                        yield ReportRecord(
+                            line[EMPLOYEE_ID].decode("ascii").strip(),
+                            int(line[GROSS_PAY]),
+                            int(line[FEDERAL_TAX]),
+                            int(line[STATE_TAX]),
+                            int(line[NET_PAY]),
+                            line[STATUS].decode("ascii")
+                        )
+                    elif line.strip() and not line.startswith(SUMMARY_PREFIX):
+                        parse_record(line)  # Raises the "too short" error
+
+
+def read_report_summary(output_file_path: str) -> Dict[str, int]:
+    """
+    Read the SUMMARY line from the end of a COBOL report.
+    
+    Only the tail of the file is read, so this is O(1) in the report size.
+    
+    Example:
+        read_report_summary("data/output.rpt")
+        # {"processed": 42, "errors": 3}
+    
+    Args:
+        output_file_path: Path of the fixed-width report written by COBOL
+    
+    Returns:
+        Dictionary with processed and error counts
+    
+    Raises:
+        FileNotFoundError: If the report doesn't exist
+        ValueError: If the report has no summary line
+    """
+    with open(output_file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - SUMMARY_TAIL_BYTES))
+        tail = f.read()
+    
+    start = tail.rfind(SUMMARY_PREFIX)
+    if start == -1:
+        raise ValueError(f"No summary line found in {output_file_path}")
+    
+    line = tail[start:].split(b"\n", 1)[0]
+    processed_match = re.search(rb"PROCESSED=(\d+)", line)
+    errors_match = re.search(rb"ERRORS=(\d+)", line)
+    if not processed_match or not errors_match:
+        raise ValueError(f"Invalid summary line format: {line.decode('ascii', 'replace')}")
+    
+    return {"processed": int(processed_match.group(1)), "errors": int(errors_match.group(1))}
+
+
+def read_report_results(
+    employees: Sequence[EmployeePayrollInput],
+    output_file_path: str
+) -> PayrollResultSet:
+    """
+    Read a COBOL report straight into a PayrollResultSet.
+    
+    Counterpart of bridge.build_payroll_results() for a report file: records
+    come from iter_report_records() and the counts from read_report_summary(),
+    so the report is never held as lines. The n-th record belongs to the n-th
+    employee and is checked against its ID.
+    
+    Example:
+        results = read_report_results(employees, "data/jobs/job-x/output.rpt")
+        results.net_cents[0]  # 81600
+    
+    Args:
+        employees: The employee records that were sent to COBOL
+        output_file_path: Path of the fixed-width report written by COBOL
+    
+    Returns:
+        PayrollResultSet with each employee's result, wallet and the summary counts
+    
+    Raises:
+        FileNotFoundError: If the report doesn't exist
+        ValueError: If the report is malformed or doesn't line up with the employees
+    """
+    results = PayrollResultSet()
+    index = 0
+    for record in iter_report_records(output_file_path):
+        if index == len(employees):
+            raise ValueError(f"COBOL returned more results than the {len(employees)} records it was sent")
+        employee = employees[index]
+        if record.employee_id != employee.employee_id[:10].strip():
+            raise ValueError(
+                f"Result {index + 1} is for employee {record.employee_id!r}, "
+                f"expected {employee.employee_id!r}"
+            )
+        results.append(
+            record.employee_id,
+            record.gross_cents,
+            record.federal_tax_cents,
+            record.state_tax_cents,
+            record.net_cents,
+            record.status.strip(),
+            employee.wallet_address
+        )
+        index += 1
+    
+    if index != len(employees):
+        raise ValueError(f"COBOL returned {index} results for {len(employees)} records")
+    
+    summary = read_report_summary(output_file_path)
+    results.processed = summary["processed"]
+    results.errors = summary["errors"]
+    return results
@@ -0,0 +1,240 @@
+"""
+Content-addressed cache for COBOL payroll results.
+
+The COBOL calculation is a pure function of the 23-byte input record, so the
+60-byte result line for a record can be reused whenever the same record is
+submitted again. Entries live in an in-memory LRU tier and, optionally, in an
+SQLite file that survives restarts.
+
+Keys are namespaced by the engine and a fingerprint of the artifact that
+computed them (see bridge.engine_fingerprint), so another engine or a
+recompiled program (e.g. after a tax rule change) never serves results of
+the old code.
+"""
+
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("payroll_cache")
+
+# Keys per SELECT ... IN (...) statement (SQLite's default variable limit is 999)
+SQLITE_BATCH_SIZE = 500
+
+# A full disk tier is trimmed to this share of max_disk_entries, so it is
+# only counted and trimmed again after that many more new entries
+DISK_TRIM_RATIO = 0.9
+
+
+class ResultCache:
+    """
+    Two-tier LRU cache mapping fixed-width input records to result lines.
+    
+    Example:
+        cache = ResultCache(max_entries=100000, db_path="data/result_cache.db")
+        cache.get_many(["EMP001    04000002550US"])   # [None] (miss)
+        cache.put_many(["EMP001    04000002550US"], [result_line])
+        cache.get_many(["EMP001    04000002550US"])   # [result_line] (hit)
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 10000000,
+        namespace: str = ""
+    ):
+        """
+        Create the cache.
+        
+        Args:
+            max_entries: Entries kept in memory before the least recently used are evicted
+            db_path: SQLite file for the on-disk tier (None = memory only)
+            max_disk_entries: Entries kept on disk before the least recently used are evicted
+            namespace: Engine and fingerprint of the program the results came from
+        """
+        if max_entries < 1:
+            raise ValueError(f"Cache size must be at least 1, got: {max_entries}")
+        
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.namespace = namespace
+        self.db_path = db_path
+        
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        
+        self._db = None
+        self._disk_entries = 0  # Entries on disk as of the last count, plus those added since
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " namespace TEXT NOT NULL,"
+                " record TEXT NOT NULL,"
+                " line TEXT NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (namespace, record))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)"
+            )
+            self._db.commit()
+            (self._disk_entries,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+            logger.info(f"Result cache disk tier: {db_path}")
+    
+    def _remember(self, record: str, line: str) -> None:
+        """Insert into the memory tier, evicting the least recently used entries."""
+        self._memory[record] = line
+        self._memory.move_to_end(record)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+    
+    def _load_from_disk(self, records: List[str]) -> Dict[str, str]:
+        """Look records up in the SQLite tier and mark them as used."""
+        found = {}
+        now = time.time()
+        for start in range(0, len(records), SQLITE_BATCH_SIZE):
+            batch = records[start:start + SQLITE_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(
+                f"SELECT record, line FROM results "
+                f"WHERE namespace = ? AND record IN ({placeholders})",
+                [self.namespace, *batch]
+            ).fetchall()
+            found.update(rows)
+            if rows:
+                self._db.executemany(
+                    "UPDATE results SET last_used = ? WHERE namespace = ? AND record = ?",
+                    [(now, self.namespace, record) for record, _ in rows]
+                )
+        self._db.commit()
+        return found
+    
+    def get_many(self, records: List[str]) -> List[Optional[str]]:
+        """
+        Look up result lines for a list of records.
+        
+        Args:
+            records: 23-byte fixed-width input records
+        
+        Returns:
+            Result line per record in the same order, None for misses
+        """
+        with self._lock:
+            lines: List[Optional[str]] = []
+            missing = []
+            for record in records:
+                line = self._memory.get(record)
+                if line is not None:
+                    self._memory.move_to_end(record)
+                else:
+                    missing.append(record)
+                lines.append(line)
+            
+            if missing and self._db is not None:
+                found = self._load_from_disk(missing)
+                self.disk_hits += len(found)
+                for index, record in enumerate(records):
+                    if lines[index] is None and record in found:
+                        lines[index] = found[record]
+                        self._remember(record, found[record])
+            
+            hits = sum(1 for line in lines if line is not None)
+            self.hits += hits
+            self.misses += len(records) - hits
+            return lines
+    
+    def put_many(self, records: List[str], lines: List[str]) -> None:
+        """
+        Store result lines for a list of records.
+        
+        Args:
+            records: 23-byte fixed-width input records
+            lines: The COBOL result line for each record, same order
+        """
+        if len(records) != len(lines):
+            raise ValueError(
+                f"Got {len(lines)} result lines for {len(records)} records"
+            )
+        
+        with self._lock:
+            for record, line in zip(records, lines):
+                self._remember(record, line)
+            
+            if self._db is not None:
+                now = time.time()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (namespace, record, line, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(self.namespace, record, line, now) for record, line in zip(records, lines)]
+                )
+                self._evict_from_disk(len(records))
+                self._db.commit()
+    
+    def _evict_from_disk(self, added: int) -> None:
+        """
+        Keep the SQLite tier within max_disk_entries, least recently used first.
+        
+        The table is only counted once the running count (which also counts
+        replaced entries) passes the limit; it is then trimmed to
+        DISK_TRIM_RATIO of the limit.
+        """
+        self._disk_entries += added
+        if self._disk_entries <= self.max_disk_entries:
+            return
+        
+        (count,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+        self._disk_entries = count
+        if count <= self.max_disk_entries:
+            return
+        
+        excess = count - int(self.max_disk_entries * DISK_TRIM_RATIO)
+        self._db.execute(
+            "DELETE FROM results WHERE rowid IN "
+            "(SELECT rowid FROM results ORDER BY last_used, rowid LIMIT ?)",
+            (excess,)
+        )
+        self._disk_entries -= excess
+        self.evictions += excess
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss metrics.
+        
+        Returns:
+            Dictionary with hits, misses, disk_hits, evictions and memory_entries
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory)
+            }
+    
+    def clear(self) -> None:
+        """Drop every entry from both tiers (metrics are kept)."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+                self._disk_entries = 0
+    
+    def close(self) -> None:
+        """Close the SQLite tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,357 @@
+"""
+Durable settlement journal: who in a payroll batch has already been paid.
+
+Without it, a process that dies halfway through a settlement leaves no record
+of which transfers went out, and settling the batch again pays some people
+twice. CoinbaseClient writes ahead to this ledger: a batch's transfers are
+queued in one transaction, each is marked "sending" just before it goes out,
+and its outcome is recorded the moment it is known. Settling the same batch
+again consults the ledger first:
+
+    success / pending   recorded result returned, nothing is sent again
+    queued / failed     transfer (re)sent - no money moved for it ("failed"
+                        is only recorded for definitive failures: rejected
+                        or refused before anything was sent)
+    sending             another settlement of the batch is sending it, or
+                        the process died between sending and recording
+    unknown             sent without an answer, or sent but never confirmed
+
+Neither "sending" nor "unknown" is retried: the money may have moved. Both
+are reported with status "unknown" until recorded, or reconciled on chain
+and released with release().
+
+begin() is a compare-and-set: of two overlapping settlements of one batch
+(e.g. a request retried after a timeout), only one moves an entry from
+queued to sending, and only that one sends the transfer.
+
+Entries are keyed by batch ID, employee ID and occurrence (the n-th payment
+to that employee within the batch), so reordered or duplicated payroll
+results map to the same entries. Payouts coalesced into one transfer keep an
+entry each, sharing its transaction hash. SQLite runs in WAL mode with
+synchronous=FULL: every recorded state survives a crash or power loss.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.bridge import DATA_DIR
+
+logger = logging.getLogger("payroll_settlement")
+
+# Settlement journal (SQLite, WAL)
+SETTLEMENT_LEDGER_DB = os.getenv(
+    "PAYROLL_SETTLEMENT_LEDGER", os.path.join(DATA_DIR, "settlement_ledger.db")
+)
+
+# Ledger statuses whose transfer may be sent (again): never sent, or definitively not paid
+SENDABLE_STATUSES = ("queued", "failed")
+
+# (employee_id, occurrence): one transfer within a batch
+TransferKey = Tuple[str, int]
+
+_ledger: Optional["SettlementLedger"] = None
+_ledger_lock = threading.Lock()
+
+
+def _timestamp() -> str:
+    """Current UTC time in the API's timestamp format."""
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _entry(row: sqlite3.Row) -> Dict:
+    """Journal entry as returned by claim() and lookup()."""
+    return {
+        "status": row["status"],
+        "to_address": row["to_address"],
+        "amount": row["amount"],
+        "result": json.loads(row["result"]) if row["result"] else None
+    }
+
+
+class SettlementLedger:
+    """
+    SQLite write-ahead journal of settlement transfers.
+    
+    Thread-safe; one connection is shared by all settlement threads.
+    
+    Example:
+        ledger = SettlementLedger("data/settlement_ledger.db")
+        recorded = ledger.claim("payroll-2024-06", [(("EMP001", 0), "0x742d...", "1020.00")])
+        # {} - nothing recorded yet, EMP001 is now queued
+        ledger.begin("payroll-2024-06", ("EMP001", 0))
+        # [("EMP001", 0)] - this settlement sends it
+        ledger.record("payroll-2024-06", ("EMP001", 0), transfer_result)
+        ledger.claim("payroll-2024-06", [(("EMP001", 0), "0x742d...", "1020.00")])
+        # {("EMP001", 0): {"status": "success", "result": {...}, ...}}
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the settlement ledger.
+        
+        Args:
+            db_path: SQLite file holding the journal (":memory:" for tests)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS settlement_transfers ("
+            " batch_id TEXT NOT NULL,"
+            " employee_id TEXT NOT NULL,"
+            " occurrence INTEGER NOT NULL,"
+            " to_address TEXT NOT NULL,"
+            " amount TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " transaction_hash TEXT,"
+            " result TEXT,"
+            " updated_at TEXT NOT NULL,"
+            " PRIMARY KEY (batch_id, employee_id, occurrence))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS settlement_transfers_hash "
+            "ON settlement_transfers (transaction_hash)"
+        )
+        self._db.commit()
+        logger.info(f"Settlement ledger: {db_path}")
+    
+    def claim(
+        self,
+        batch_id: str,
+        transfers: Iterable[Tuple[TransferKey, str, str]]
+    ) -> Dict[TransferKey, Dict]:
+        """
+        Queue a batch's transfers, returning those already journaled.
+        
+        In one transaction (one fsync for the whole batch): every transfer
+        with no entry, still queued, or whose last attempt failed is queued
+        and may be sent, if begin() wins it; every other transfer is left
+        alone and returned.
+        
+        Args:
+            batch_id: Payroll batch the transfers belong to
+            transfers: (key, to_address, amount) per transfer
+        
+        Returns:
+            Key -> entry (status, to_address, amount, result) for each transfer
+            that must not be sent now: settled or with an unknown outcome
+        """
+        now = _timestamp()
+        recorded: Dict[TransferKey, Dict] = {}
+        
+        with self._lock, self._db:
+            existing = {
+                (row["employee_id"], row["occurrence"]): row
+                for row in self._db.execute(
+                    "SELECT employee_id, occurrence, to_address, amount, status, result "
+                    "FROM settlement_transfers WHERE batch_id = ?",
+                    (batch_id,)
+                )
+            }
+            
+            queued = []
+            for key, to_address, amount in transfers:
+                row = existing.get(key)
+                if row is not None and row["status"] not in SENDABLE_STATUSES:
+                    recorded[key] = _entry(row)
+                    continue
+                queued.append((batch_id, key[0], key[1], to_address, str(amount), now))
+            
+            # Another connection may have started sending one since the
+            # SELECT: only entries still sendable are (re)queued
+            self._db.executemany(
+                "INSERT INTO settlement_transfers "
+                "(batch_id, employee_id, occurrence, to_address, amount, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?) "
+                "ON CONFLICT (batch_id, employee_id, occurrence) DO UPDATE SET "
+                "to_address = excluded.to_address, amount = excluded.amount, "
+                "status = 'queued', updated_at = excluded.updated_at "
+                "WHERE status IN ('queued', 'failed')",
+                queued
+            )
+        
+        if recorded:
+            logger.info(f"Settlement ledger: {len(recorded)} transfers of batch {batch_id} already journaled")
+        return recorded
+    
+    def begin(self, batch_id: str, *keys: TransferKey) -> List[TransferKey]:
+        """
+        Mark queued transfers as being sent; call right before sending them.
+        
+        Compare-and-set: only entries still queued (or failed) are marked, so
+        when overlapping settlements of one batch race for a transfer exactly
+        one of them wins it. All keys are marked in one transaction.
+        
+        Returns:
+            The keys won - send only these; see lookup() for the others
+        """
+        now = _timestamp()
+        won = []
+        with self._lock, self._db:
+            for key in keys:
+                cursor = self._db.execute(
+                    "UPDATE settlement_transfers SET status = 'sending', updated_at = ? "
+                    "WHERE batch_id = ? AND employee_id = ? AND occurrence = ? "
+                    "AND status IN ('queued', 'failed')",
+                    (now, batch_id, key[0], key[1])
+                )
+                if cursor.rowcount == 1:
+                    won.append(key)
+        return won
+    
+    def lookup(self, batch_id: str, keys: Iterable[TransferKey]) -> Dict[TransferKey, Dict]:
+        """
+        Current entries of some of a batch's transfers (claim() format).
+        
+        Returns:
+            Key -> entry for each of keys that has one
+        """
+        keys = set(keys)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT employee_id, occurrence, to_address, amount, status, result "
+                "FROM settlement_transfers WHERE batch_id = ?",
+                (batch_id,)
+            ).fetchall()
+        return {
+            (row["employee_id"], row["occurrence"]): _entry(row)
+            for row in rows
+            if (row["employee_id"], row["occurrence"]) in keys
+        }
+    
+    def record(self, batch_id: str, key: TransferKey, result: Dict) -> None:
+        """
+        Record the outcome of a sent transfer.
+        
+        Args:
+            batch_id: Payroll batch the transfer belongs to
+            key: (employee_id, occurrence) passed to claim()
+            result: The transfer result; its status ("success", "pending",
+                    "failed" or "unknown") becomes the entry's status. Only
+                    record "failed" when no money can have moved: a failed
+                    entry is sent again by the next settlement of the batch
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE settlement_transfers SET status = ?, transaction_hash = ?, result = ?, "
+                "updated_at = ? WHERE batch_id = ? AND employee_id = ? AND occurrence = ?",
+                (
+                    result["status"],
+                    result.get("transaction_hash"),
+                    json.dumps(result),
+                    _timestamp(),
+                    batch_id,
+                    key[0],
+                    key[1]
+                )
+            )
+    
+    def confirm(self, batch_id: str, transaction_hashes: List[str]) -> None:
+        """Mark pending transfers confirmed (see SettlementTracker)."""
+        now = _timestamp()
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE settlement_transfers SET status = 'success', "
+                "result = json_set(result, '$.status', 'success', '$.confirmed_at', ?), updated_at = ? "
+                "WHERE batch_id = ? AND transaction_hash = ? AND status = 'pending'",
+                [(now, now, batch_id, transaction_hash) for transaction_hash in transaction_hashes]
+            )
+    
+    def expire(self, batch_id: str, transaction_hashes: List[str], error: str) -> None:
+        """
+        Mark pending transfers whose transaction never confirmed as outcome unknown.
+        
+        They become "unknown": not sent again, and reconciled with release()
+        (see SettlementTracker).
+        """
+        now = _timestamp()
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE settlement_transfers SET status = 'unknown', "
+                "result = json_set(result, '$.status', 'unknown', '$.error', ?), updated_at = ? "
+                "WHERE batch_id = ? AND transaction_hash = ? AND status = 'pending'",
+                [(error, now, batch_id, transaction_hash) for transaction_hash in transaction_hashes]
+            )
+    
+    def pending(self) -> Dict[str, List[Dict]]:
+        """
+        Results of every transfer sent but not yet confirmed, in any batch.
+        
+        Returns:
+            Batch ID -> recorded results, in the order they were queued
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT batch_id, result FROM settlement_transfers "
+                "WHERE status = 'pending' ORDER BY rowid"
+            ).fetchall()
+        pending: Dict[str, List[Dict]] = {}
+        for row in rows:
+            pending.setdefault(row["batch_id"], []).append(json.loads(row["result"]))
+        return pending
+    
+    def release(self, batch_id: str, employee_id: str, occurrence: int = 0) -> bool:
+        """
+        Allow an interrupted transfer, or one with an unknown outcome, to be sent again.
+        
+        Only for "sending" and "unknown" entries, after checking on chain
+        that the transfer never went out. A resend carries the same
+        idempotency key, so the provider still won't pay it twice.
+        
+        Returns:
+            True if an unresolved transfer was released
+        """
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "UPDATE settlement_transfers SET status = 'failed', updated_at = ? "
+                "WHERE batch_id = ? AND employee_id = ? AND occurrence = ? "
+                "AND status IN ('sending', 'unknown')",
+                (_timestamp(), batch_id, employee_id, occurrence)
+            )
+        return cursor.rowcount == 1
+    
+    def entries(self, batch_id: str) -> List[Dict]:
+        """Return a batch's journal entries, in the order they were queued."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT employee_id, occurrence, to_address, amount, status, transaction_hash, "
+                "updated_at FROM settlement_transfers WHERE batch_id = ? ORDER BY rowid",
+                (batch_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+
+def get_settlement_ledger() -> SettlementLedger:
+    """
+    Return the shared settlement ledger, opening it on first use.
+    
+    Stored in PAYROLL_SETTLEMENT_LEDGER (default data/settlement_ledger.db).
+    """
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            os.makedirs(os.path.dirname(SETTLEMENT_LEDGER_DB) or ".", exist_ok=True)
+            _ledger = SettlementLedger(SETTLEMENT_LEDGER_DB)
+        return _ledger
+
+
+def shutdown_settlement_ledger() -> None:
+    """Close the shared settlement ledger if it was opened."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is not None:
+            _ledger.close()
+            _ledger = None
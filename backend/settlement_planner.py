@@ -0,0 +1,198 @@
+"""
+Settlement planning: one balance check and one reservation per batch.
+
+Checking the wallet balance before every transfer costs a CDP round-trip per
+employee. Instead, CoinbaseClient plans the batch - the total net pay it is
+about to send - reads the balance once and reserves that total here. Each
+transfer then draws on the reservation in memory; whatever is left is
+released when the batch ends.
+
+Reservations are per wallet and process-wide, so concurrent settle requests
+(each with its own CoinbaseClient) never promise the same funds twice:
+a new reservation only gets the balance minus what other batches still hold.
+A standalone transfer makes a one-off reservation of its own amount.
+
+Planning also coalesces payouts: results paid to the same wallet (e.g. a
+contractor with several employee IDs) become one transfer of their total,
+one on-chain operation and one fee instead of one per result.
+
+Example:
+    reservation = get_balance_reservations().reserve(account, settlement_total(results), client.get_balance)
+    if reservation.hold(Decimal("1020.00")):
+        ...  # debit / send
+        reservation.spend(Decimal("1020.00"))
+    reservation.release()
+"""
+
+import logging
+import threading
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Sequence
+
+logger = logging.getLogger("payroll_settlement")
+
+
+def settlement_total(results: Iterable) -> Decimal:
+    """
+    Total a batch will transfer: the positive net pay of its results.
+    
+    Args:
+        results: EmployeePayrollOutput records to be settled (status "OK")
+    
+    Returns:
+        Decimal: Sum of net_pay (non-positive amounts are never sent)
+    """
+    return sum((result.net_pay for result in results if result.net_pay > 0), Decimal("0"))
+
+
+def coalesce_by_wallet(results: Sequence) -> List[List[int]]:
+    """
+    Group results paid to the same wallet into one transfer each.
+    
+    Wallet addresses are compared case-insensitively (EVM addresses are hex;
+    case is only a checksum). Results with a non-positive net pay are never
+    grouped: they are rejected on their own, without affecting the others.
+    
+    Args:
+        results: EmployeePayrollOutput records to be settled (status "OK")
+    
+    Returns:
+        List[List[int]]: Indices into results, one list per transfer, in
+        order of each wallet's first result
+    
+    Example:
+        coalesce_by_wallet([emp_a_wallet_1, emp_b_wallet_2, emp_c_wallet_1])
+        # [[0, 2], [1]]
+    """
+    transfers: List[List[int]] = []
+    by_wallet: Dict[str, List[int]] = {}
+    for index, result in enumerate(results):
+        if result.net_pay <= 0:
+            transfers.append([index])
+            continue
+        wallet = result.wallet_address.lower()
+        if wallet not in by_wallet:
+            by_wallet[wallet] = []
+            transfers.append(by_wallet[wallet])
+        by_wallet[wallet].append(index)
+    return transfers
+
+
+class Reservation:
+    """
+    Funds set aside for one settlement batch.
+    
+    remaining is what the batch may still spend; of that, held is taken by
+    transfers under way. Thread-safe.
+    """
+    
+    def __init__(self, reservations: "BalanceReservations", account: str, amount: Decimal):
+        self.account = account
+        self.amount = amount
+        self.remaining = amount
+        self.held = Decimal("0")
+        self._reservations = reservations
+        self._released = False
+    
+    @property
+    def available(self) -> Decimal:
+        """Reserved funds not yet spent or held by a transfer."""
+        return self.remaining - self.held
+    
+    def hold(self, amount: Decimal) -> bool:
+        """
+        Take amount for a transfer about to be made.
+        
+        Returns:
+            False if the reservation can't cover it
+        """
+        with self._reservations.lock:
+            if self._released or self.available < amount:
+                return False
+            self.held += amount
+            return True
+    
+    def spend(self, amount: Decimal) -> None:
+        """Turn a hold into spending; call once the balance has been debited."""
+        with self._reservations.lock:
+            self.held -= amount
+            self.remaining -= amount
+    
+    def release(self) -> None:
+        """Return the unspent funds to the wallet's pool. Idempotent."""
+        self._reservations.release(self)
+
+
+class BalanceReservations:
+    """
+    In-process reservation ledger: funds promised to running batches, per wallet.
+    
+    Example:
+        reservations = BalanceReservations()
+        first = reservations.reserve("0xabc...", Decimal("800"), lambda: Decimal("1000"))
+        second = reservations.reserve("0xabc...", Decimal("800"), lambda: Decimal("1000"))
+        second.amount   # Decimal("200") - the rest is held by the first batch
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._reservations: Dict[str, List[Reservation]] = {}
+    
+    def outstanding(self, account: str) -> Decimal:
+        """Funds reserved for account and not yet spent."""
+        with self.lock:
+            return self._outstanding(account)
+    
+    def _outstanding(self, account: str) -> Decimal:
+        return sum(
+            (reservation.remaining for reservation in self._reservations.get(account, ())),
+            Decimal("0")
+        )
+    
+    def reserve(self, account: str, amount: Decimal, get_balance: Callable[[], Decimal]) -> Reservation:
+        """
+        Reserve up to amount of account's balance, reading the balance once.
+        
+        Outstanding reservations are summed before the balance is read, so a
+        transfer spending from another reservation meanwhile can only make
+        the result smaller, never promise funds twice.
+        
+        Args:
+            account: Wallet address the funds are in
+            amount: Total the batch wants to transfer
+            get_balance: Reads the wallet's current balance
+        
+        Returns:
+            Reservation of min(amount, balance - outstanding), possibly zero
+        """
+        with self.lock:
+            outstanding = self._outstanding(account)
+            available = max(get_balance() - outstanding, Decimal("0"))
+            reservation = Reservation(self, account, min(amount, available))
+            self._reservations.setdefault(account, []).append(reservation)
+        
+        if reservation.amount < amount:
+            logger.warning(
+                f"Insufficient funds to reserve: Available={available} USDC "
+                f"({outstanding} USDC reserved by other batches), Required={amount} USDC"
+            )
+        return reservation
+    
+    def release(self, reservation: Reservation) -> None:
+        """Drop a reservation; its unspent funds become available again."""
+        with self.lock:
+            if reservation._released:
+                return
+            reservation._released = True
+            reservations = self._reservations[reservation.account]
+            reservations.remove(reservation)
+            if not reservations:
+                del self._reservations[reservation.account]
+
+
+_balance_reservations = BalanceReservations()
+
+
+def get_balance_reservations() -> BalanceReservations:
+    """Return the process-wide reservation ledger."""
+    return _balance_reservations
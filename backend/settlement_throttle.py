@@ -0,0 +1,377 @@
+"""
+Flow control for settlement provider calls: rate limit, retry, circuit breaker.
+
+Against the real CDP API a large batch runs into provider rate limits and
+the occasional transient error, and turning each of those into a permanent
+"failed" transfer would fail thousands of employees for a blip. Every
+provider call CoinbaseClient makes goes through a SettlementThrottle:
+
+- AdaptiveRateLimiter: token bucket whose rate adapts (AIMD). A rate-limit
+  response halves it and pauses for Retry-After; fast successes raise it
+  step by step; slow ones lower it. With no configured rate it runs
+  unlimited until the provider first pushes back.
+- Retries with full-jitter exponential backoff for transient errors.
+- CircuitBreaker: after a run of transient failures the provider is
+  considered down and calls *wait* (the batch pauses) instead of failing;
+  one probe call is let through after a cool-down. Failures during an
+  outage don't use up a call's retries: only if the outage outlasts
+  PAYROLL_SETTLEMENT_MAX_PAUSE seconds do calls fail.
+
+Retried calls must be safe to repeat: CoinbaseClient sends every transfer
+with an idempotency key, so a retried send that did go out the first time
+(e.g. timed out waiting for the answer) is not sent again.
+
+Example:
+    throttle = SettlementThrottle(transient_errors=(TransientSettlementError,))
+    transaction_hash = throttle.call(provider.send, to_address, amount)
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Optional, Tuple, Type
+
+logger = logging.getLogger("payroll_settlement")
+
+# Provider calls per second to start at (0: unlimited until rate limited)
+SETTLEMENT_RATE = float(os.getenv("PAYROLL_SETTLEMENT_RATE", "0"))
+
+# Slowest the adaptive limiter may go, calls per second
+SETTLEMENT_MIN_RATE = float(os.getenv("PAYROLL_SETTLEMENT_MIN_RATE", "1"))
+
+# Calls slower than this (seconds) make the limiter back off
+SETTLEMENT_LATENCY_TARGET = float(os.getenv("PAYROLL_SETTLEMENT_LATENCY_TARGET", "2"))
+
+# Retries of a transient provider error before the transfer fails
+SETTLEMENT_RETRIES = int(os.getenv("PAYROLL_SETTLEMENT_RETRIES", "4"))
+
+# Consecutive transient failures that open the circuit breaker
+SETTLEMENT_BREAKER_THRESHOLD = int(os.getenv("PAYROLL_SETTLEMENT_BREAKER_THRESHOLD", "5"))
+
+# Seconds the breaker stays open before letting a probe call through
+SETTLEMENT_BREAKER_RESET = float(os.getenv("PAYROLL_SETTLEMENT_BREAKER_RESET", "5"))
+
+# Longest a call waits on rate limits or an open breaker before failing
+SETTLEMENT_MAX_PAUSE = float(os.getenv("PAYROLL_SETTLEMENT_MAX_PAUSE", "300"))
+
+
+class CircuitOpenError(Exception):
+    """The provider stayed unavailable for longer than the maximum pause."""
+    pass
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose rate follows the provider's signals (AIMD).
+    
+    Thread-safe. acquire() blocks until a call may be made.
+    
+    Example:
+        limiter = AdaptiveRateLimiter(rate=20)
+        limiter.acquire()
+        ...  # provider call
+        limiter.on_success(latency=0.2)      # or limiter.on_throttled(retry_after=1)
+    """
+    
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        min_rate: float = SETTLEMENT_MIN_RATE,
+        max_rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        latency_target: float = SETTLEMENT_LATENCY_TARGET,
+        increase: float = 0.5,
+        decrease: float = 0.5
+    ):
+        """
+        Create the limiter.
+        
+        Args:
+            rate: Calls per second to start at (None or 0: unlimited until throttled)
+            min_rate: Lower bound of the adapted rate
+            max_rate: Upper bound of the adapted rate (None: unbounded)
+            burst: Bucket size (defaults to one second's worth of calls)
+            latency_target: Successful calls slower than this lower the rate
+            increase: Calls per second added per fast success
+            decrease: Factor applied to the rate on a rate-limit response
+        """
+        self.rate = rate or None
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self._lock = threading.Lock()
+        self._tokens = self._capacity()
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._decreased_at = float("-inf")
+        # Recent call times, to estimate the rate that got us throttled
+        self._recent = deque(maxlen=1000)
+    
+    def _capacity(self) -> float:
+        """Bucket size at the current rate."""
+        return self.burst or max(self.rate or 1.0, 1.0)
+    
+    def acquire(self) -> None:
+        """Wait until the bucket has a token (and any throttling pause is over), then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.rate is None:
+                        self._recent.append(now)
+                        return
+                    self._tokens = min(
+                        self._capacity(), self._tokens + (now - self._refilled_at) * self.rate
+                    )
+                    self._refilled_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self._recent.append(now)
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+    
+    def on_success(self, latency: float) -> None:
+        """Additive increase after a fast call; gentle decrease after a slow one."""
+        with self._lock:
+            if self.rate is None:
+                return
+            if latency > self.latency_target:
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            else:
+                self.rate += self.increase
+                if self.max_rate is not None:
+                    self.rate = min(self.rate, self.max_rate)
+    
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Multiplicative decrease on a rate-limit response, pausing for retry_after.
+        
+        An unlimited limiter starts limiting at half the rate it was just
+        sending at. The many calls rejected by one burst lower the rate once:
+        further decreases wait a second.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = 0.0
+            self._refilled_at = now
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if now - self._decreased_at < 1.0:
+                return
+            if self.rate is None:
+                observed = sum(1 for sent_at in self._recent if now - sent_at <= 1.0)
+                self.rate = float(max(observed, 1))
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._decreased_at = now
+            rate = self.rate
+        logger.warning(
+            f"Settlement provider rate limit: slowing to {rate:.1f} calls/s"
+            + (f", pausing {retry_after:.1f}s" if retry_after else "")
+        )
+
+
+class CircuitBreaker:
+    """
+    Pauses calls while the provider is failing instead of failing them.
+    
+    closed: calls go through. After failure_threshold consecutive transient
+    failures it opens: calls wait. After reset_timeout one probe call is let
+    through (half-open); success closes the breaker and releases everyone,
+    failure opens it again. Callers that have waited longer than max_pause
+    get CircuitOpenError.
+    
+    Thread-safe.
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = SETTLEMENT_BREAKER_THRESHOLD,
+        reset_timeout: float = SETTLEMENT_BREAKER_RESET,
+        max_pause: float = SETTLEMENT_MAX_PAUSE
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_pause = max_pause
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._changed = threading.Condition()
+    
+    def before_call(self, deadline: Optional[float] = None) -> None:
+        """
+        Wait until a call may go through.
+        
+        Args:
+            deadline: time.monotonic() by which the caller gives up waiting
+                      (never later than max_pause from now)
+        
+        Raises:
+            CircuitOpenError: If the breaker stayed open until the deadline
+        """
+        latest = time.monotonic() + self.max_pause
+        deadline = latest if deadline is None else min(deadline, latest)
+        with self._changed:
+            while True:
+                now = time.monotonic()
+                if self.state == "closed":
+                    return
+                if self.state == "open" and now - self._opened_at >= self.reset_timeout:
+                    self.state = "half-open"
+                # One probe at a time; a probe that never reported back is replaced
+                if self.state == "half-open" and (
+                    not self._probing or now - self._probe_started >= self.reset_timeout
+                ):
+                    self._probing = True
+                    self._probe_started = now
+                    return
+                if now >= deadline:
+                    raise CircuitOpenError(
+                        f"Settlement provider unavailable for more than {self.max_pause:.0f}s"
+                    )
+                if self.state == "open":
+                    wait = self._opened_at + self.reset_timeout - now
+                else:
+                    wait = self.reset_timeout
+                self._changed.wait(min(max(wait, 0.001), deadline - now))
+    
+    def record_success(self) -> None:
+        """The provider answered: close the breaker."""
+        with self._changed:
+            if self.state != "closed":
+                logger.info("Settlement provider recovered: circuit closed, resuming")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+            self._changed.notify_all()
+    
+    def record_failure(self) -> bool:
+        """
+        A transient failure: open the breaker at the threshold, or when a probe fails.
+        
+        Returns:
+            True if the breaker is open: the provider is down, so the failure
+            is the outage's, not the call's
+        """
+        with self._changed:
+            self.failures += 1
+            if self.state == "half-open" or (
+                self.state == "closed" and self.failures >= self.failure_threshold
+            ):
+                if self.state == "closed":
+                    logger.warning(
+                        f"Settlement provider failing ({self.failures} in a row): "
+                        f"circuit open, pausing settlement"
+                    )
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+                self._changed.notify_all()
+            return self.state != "closed"
+
+
+class SettlementThrottle:
+    """
+    Rate limiter, retries and circuit breaker around provider calls.
+    
+    Errors are classified by type: rate_limit_errors slow the limiter and are
+    retried after their retry_after attribute (if any); transient_errors are
+    retried with backoff and counted by the breaker; anything else is a
+    permanent answer and raised straight away. Once the breaker opens, a
+    call's failures stop counting against its retries: it waits for the
+    provider to recover until max_pause has passed.
+    
+    Example:
+        throttle = SettlementThrottle(transient_errors=(TransientSettlementError,),
+                                      rate_limit_errors=(RateLimitError,))
+        receipts = throttle.call(client.fetch_receipts, hashes)
+    """
+    
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        transient_errors: Tuple[Type[BaseException], ...] = (),
+        rate_limit_errors: Tuple[Type[BaseException], ...] = (),
+        retries: int = SETTLEMENT_RETRIES,
+        base_delay: float = 0.1,
+        max_delay: float = 5.0,
+        max_pause: float = SETTLEMENT_MAX_PAUSE
+    ):
+        """
+        Args:
+            limiter: Rate limiter (defaults to one starting at PAYROLL_SETTLEMENT_RATE)
+            breaker: Circuit breaker (defaults from the PAYROLL_SETTLEMENT_BREAKER_* settings)
+            transient_errors: Exception types worth retrying
+            rate_limit_errors: Exception types meaning "slow down" (retried too)
+            retries: Retries of transient errors per call
+            base_delay: First backoff delay, seconds (doubled per retry, fully jittered)
+            max_delay: Backoff delay cap, seconds
+            max_pause: Longest one call keeps retrying rate limits, seconds
+        """
+        self.limiter = limiter or AdaptiveRateLimiter(rate=SETTLEMENT_RATE)
+        self.breaker = breaker or CircuitBreaker(max_pause=max_pause)
+        self.transient_errors = tuple(transient_errors)
+        self.rate_limit_errors = tuple(rate_limit_errors)
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_pause = max_pause
+    
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for retry number attempt (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call fn through the limiter and breaker, retrying transient errors.
+        
+        Returns:
+            fn's result
+        
+        Raises:
+            The last transient error once retries are used up, any other
+            error straight away, CircuitOpenError if the provider is still
+            down max_pause after the call started
+        """
+        deadline = time.monotonic() + self.max_pause
+        attempt = 0
+        while True:
+            self.breaker.before_call(deadline)
+            self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except self.rate_limit_errors as e:
+                # Provider is up, just busy: not a breaker failure
+                self.breaker.record_success()
+                self.limiter.on_throttled(getattr(e, "retry_after", None))
+                if time.monotonic() >= deadline:
+                    raise
+                continue
+            except self.transient_errors:
+                if self.breaker.record_failure():
+                    # Provider down: before_call() pauses until it recovers
+                    # or the deadline passes; no retry is used up
+                    continue
+                if attempt >= self.retries:
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except Exception:
+                # A definite answer (e.g. rejected transfer): the provider is up
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            self.limiter.on_success(time.monotonic() - started)
+            return result
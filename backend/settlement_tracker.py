@@ -0,0 +1,358 @@
+"""
+Pipelined settlement: submit every transfer now, confirm in the background.
+
+CoinbaseClient.batch_settle() holds the caller until the last transfer of a
+batch is confirmed on chain. With a SettlementTracker the caller only waits
+for submission (CoinbaseClient.batch_submit()); a background thread then
+polls the receipts of all pending transfers in bulk, one call per settlement
+per interval, and flips each result from "pending" to "success". Progress is
+available at any time through status().
+
+A transfer whose transaction the provider doesn't know ("unknown" receipt:
+dropped, or sent by a client that has since restarted) for longer than the
+unknown timeout is reported "unknown", and so is its ledger entry (not sent
+again, reconciled with release()) rather than staying pending forever. resume() picks up the transfers a previous run left pending
+in the ledger.
+
+Example:
+    tracker = get_settlement_tracker()
+    submitted = tracker.submit(CoinbaseClient(), payroll_response)
+    # {"settlement_id": "9c1e...", "status": "pending", "total_submitted": 250, ...}
+    tracker.status(submitted["settlement_id"])
+    # {..., "confirmed": 120, "pending": 130, "progress": 0.48}
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from backend.coinbase_client import CoinbaseClient
+from backend.models import PayrollResponse
+
+logger = logging.getLogger("payroll_settlement")
+
+# Seconds between receipt polls
+SETTLEMENT_POLL_INTERVAL = float(os.getenv("PAYROLL_SETTLEMENT_POLL_INTERVAL", "1"))
+
+# Finished settlements kept for status queries (oldest are forgotten first)
+SETTLEMENT_HISTORY = int(os.getenv("PAYROLL_SETTLEMENT_HISTORY", "1000"))
+
+# Seconds a transfer's transaction may stay unknown to the provider before it is given up on
+SETTLEMENT_UNKNOWN_TIMEOUT = float(os.getenv("PAYROLL_SETTLEMENT_UNKNOWN_TIMEOUT", "300"))
+
+_tracker: Optional["SettlementTracker"] = None
+_tracker_lock = threading.Lock()
+
+
+class Settlement:
+    """One submitted batch: its client, results and still-pending transfers."""
+    
+    __slots__ = (
+        "settlement_id", "client", "batch_id", "results", "pending", "unknown_since",
+        "created_at", "completed_at"
+    )
+    
+    def __init__(
+        self,
+        settlement_id: str,
+        client: CoinbaseClient,
+        results: List[dict],
+        batch_id: Optional[str] = None
+    ):
+        self.settlement_id = settlement_id
+        self.client = client
+        self.batch_id = batch_id
+        self.results = results
+        # transaction hash -> indices into results (several for a coalesced transfer)
+        self.pending: Dict[str, List[int]] = {}
+        for index, result in enumerate(results):
+            if result["status"] == "pending":
+                self.pending.setdefault(result["transaction_hash"], []).append(index)
+        # transaction hash -> when the provider first didn't know it (time.monotonic())
+        self.unknown_since: Dict[str, float] = {}
+        self.created_at = datetime.utcnow().isoformat() + "Z"
+        self.completed_at: Optional[str] = None if self.pending else self.created_at
+    
+    def summary(self, include_results: bool = True) -> dict:
+        """Status and counts (and, optionally, every result)."""
+        confirmed = sum(1 for result in self.results if result["status"] == "success")
+        failed = sum(1 for result in self.results if result["status"] == "failed")
+        unknown = sum(1 for result in self.results if result["status"] == "unknown")
+        pending = sum(len(indices) for indices in self.pending.values())
+        summary = {
+            "settlement_id": self.settlement_id,
+            "status": "pending" if self.pending else "completed",
+            "total_processed": len(self.results),
+            "confirmed": confirmed,
+            "pending": pending,
+            "failed": failed,
+            "unknown": unknown,
+            "progress": round((confirmed + failed + unknown) / len(self.results), 4) if self.results else 1.0,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at
+        }
+        if include_results:
+            summary["results"] = [dict(result) for result in self.results]
+        return summary
+
+
+class SettlementTracker:
+    """
+    Tracks submitted settlements until every transfer is confirmed.
+    
+    Thread-safe; the polling thread starts with the tracker and stops on close().
+    
+    Example:
+        tracker = SettlementTracker(poll_interval=0.5)
+        submitted = tracker.submit(client, payroll_response)
+        tracker.status(submitted["settlement_id"])
+        tracker.close()
+    """
+    
+    def __init__(
+        self,
+        poll_interval: Optional[float] = SETTLEMENT_POLL_INTERVAL,
+        history: int = SETTLEMENT_HISTORY,
+        unknown_timeout: float = SETTLEMENT_UNKNOWN_TIMEOUT
+    ):
+        """
+        Start the tracker.
+        
+        Args:
+            poll_interval: Seconds between receipt polls (None or 0 disables the
+                           polling thread; call poll() yourself)
+            history: Finished settlements kept for status()
+            unknown_timeout: Seconds a transaction may stay unknown to the
+                             provider before its transfers are reported "unknown"
+        """
+        self.history = history
+        self.unknown_timeout = unknown_timeout
+        self._settlements: "OrderedDict[str, Settlement]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        
+        self._poll_thread = None
+        if poll_interval:
+            self._poll_thread = threading.Thread(
+                target=self._poll_loop,
+                args=(poll_interval,),
+                name="settlement-tracker",
+                daemon=True
+            )
+            self._poll_thread.start()
+    
+    def submit(
+        self,
+        client: CoinbaseClient,
+        payroll_response: PayrollResponse,
+        max_workers: Optional[int] = None,
+        batch_id: Optional[str] = None
+    ) -> dict:
+        """
+        Submit a batch's transfers and start tracking them.
+        
+        Args:
+            client: Client that submits the transfers and answers their receipts
+            payroll_response: Payroll results to settle (OK results only)
+            max_workers: Concurrent submissions (defaults to PAYROLL_SETTLEMENT_CONCURRENCY)
+            batch_id: Payroll batch identifier for the client's settlement ledger;
+                      confirmations are journaled there too
+        
+        Returns:
+            dict: client.batch_submit() summary plus settlement_id and status
+        """
+        submitted = client.batch_submit(payroll_response, max_workers=max_workers, batch_id=batch_id)
+        settlement = self._track(client, submitted["results"], batch_id)
+        logger.info(
+            f"Tracking settlement {settlement.settlement_id}: "
+            f"{len(settlement.pending)} transfers awaiting confirmation"
+        )
+        return {
+            "settlement_id": settlement.settlement_id,
+            "status": "pending" if settlement.pending else "completed",
+            **submitted,
+            "results": [dict(result) for result in submitted["results"]]
+        }
+    
+    def resume(self, client: CoinbaseClient) -> List[str]:
+        """
+        Track the transfers a previous run left pending in client's ledger.
+        
+        Their confirmations (or unknown-receipt timeouts) are journaled as
+        for submit(); without this, reruns of their batches report them
+        pending forever.
+        
+        Args:
+            client: Client that answers their receipts; its ledger is read
+        
+        Returns:
+            One settlement ID per batch with pending transfers
+        """
+        if client.ledger is None:
+            return []
+        
+        settlement_ids = []
+        for batch_id, results in client.ledger.pending().items():
+            settlement = self._track(client, results, batch_id)
+            settlement_ids.append(settlement.settlement_id)
+            logger.info(
+                f"Resumed settlement {settlement.settlement_id} of batch {batch_id}: "
+                f"{len(settlement.pending)} transfers awaiting confirmation"
+            )
+        return settlement_ids
+    
+    def status(self, settlement_id: str, include_results: bool = True) -> Optional[dict]:
+        """
+        Confirmation progress of a settlement.
+        
+        Args:
+            settlement_id: ID returned by submit()
+            include_results: Include every transfer's current result
+        
+        Returns:
+            Settlement summary, or None for an unknown (or forgotten) ID
+        """
+        with self._lock:
+            settlement = self._settlements.get(settlement_id)
+            if settlement is None:
+                return None
+            return settlement.summary(include_results)
+    
+    def poll(self) -> int:
+        """
+        Poll the receipts of every pending transfer, one call per settlement.
+        
+        Transfers whose transaction has been unknown to the provider for
+        unknown_timeout seconds are given up on: reported "unknown".
+        
+        Returns:
+            Number of payroll results confirmed by this poll
+        """
+        with self._lock:
+            pending = [
+                (settlement, list(settlement.pending))
+                for settlement in self._settlements.values()
+                if settlement.pending
+            ]
+        
+        confirmed = 0
+        for settlement, hashes in pending:
+            try:
+                receipts = settlement.client.get_receipts(hashes)
+            except Exception as e:
+                logger.warning(f"Receipt poll failed for settlement {settlement.settlement_id}: {e}")
+                continue
+            
+            confirmed_hashes = [
+                transaction_hash for transaction_hash, receipt in receipts.items() if receipt == "confirmed"
+            ]
+            expired_hashes = self._expired(settlement, receipts)
+            error = (
+                f"Transaction unknown to the provider for {self.unknown_timeout:g}s; "
+                f"outcome unknown - check on chain before paying again"
+            )
+            
+            now = datetime.utcnow().isoformat() + "Z"
+            with self._lock:
+                for transaction_hash in confirmed_hashes:
+                    if transaction_hash not in settlement.pending:
+                        continue
+                    for index in settlement.pending.pop(transaction_hash):
+                        result = settlement.results[index]
+                        result["status"] = "success"
+                        result["confirmed_at"] = now
+                        confirmed += 1
+                for transaction_hash in expired_hashes:
+                    for index in settlement.pending.pop(transaction_hash, []):
+                        settlement.results[index].update(status="unknown", error=error)
+                if not settlement.pending and settlement.completed_at is None:
+                    settlement.completed_at = now
+                    logger.info(f"Settlement {settlement.settlement_id} finished")
+                self._forget_finished()
+            
+            if expired_hashes:
+                logger.warning(
+                    f"Settlement {settlement.settlement_id}: {len(expired_hashes)} transactions "
+                    f"unknown to the provider for {self.unknown_timeout:g}s, outcome unknown"
+                )
+            if settlement.batch_id and settlement.client.ledger is not None:
+                # Unjournaled confirmations stay "pending" there, which is never sent again
+                if confirmed_hashes:
+                    settlement.client.ledger.confirm(settlement.batch_id, confirmed_hashes)
+                if expired_hashes:
+                    settlement.client.ledger.expire(settlement.batch_id, expired_hashes, error)
+        
+        return confirmed
+    
+    def _track(self, client: CoinbaseClient, results: List[dict], batch_id: Optional[str]) -> Settlement:
+        """Start tracking a settlement's results."""
+        settlement = Settlement(uuid.uuid4().hex, client, results, batch_id)
+        with self._lock:
+            self._settlements[settlement.settlement_id] = settlement
+            self._forget_finished()
+        return settlement
+    
+    def _expired(self, settlement: Settlement, receipts: Dict[str, str]) -> List[str]:
+        """Hashes unknown to the provider for unknown_timeout seconds (from poll())."""
+        now = time.monotonic()
+        expired = []
+        for transaction_hash, receipt in receipts.items():
+            if receipt != "unknown":
+                settlement.unknown_since.pop(transaction_hash, None)
+                continue
+            since = settlement.unknown_since.setdefault(transaction_hash, now)
+            if now - since >= self.unknown_timeout:
+                expired.append(transaction_hash)
+                del settlement.unknown_since[transaction_hash]
+        return expired
+    
+    def _forget_finished(self) -> None:
+        """Drop the oldest finished settlements beyond the history limit (lock held)."""
+        finished = [key for key, settlement in self._settlements.items() if not settlement.pending]
+        for key in finished[:max(0, len(finished) - self.history)]:
+            del self._settlements[key]
+    
+    def _poll_loop(self, interval: float) -> None:
+        """Background thread body: run poll() every interval seconds."""
+        while not self._closed.wait(interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Settlement tracker poll failed: {e}")
+    
+    def close(self) -> None:
+        """Stop the polling thread. Pending transfers stay pending."""
+        self._closed.set()
+        if self._poll_thread is not None:
+            self._poll_thread.join()
+        with self._lock:
+            pending = sum(len(settlement.pending) for settlement in self._settlements.values())
+        logger.info(f"Settlement tracker stopped ({pending} transfers still unconfirmed)")
+
+
+def get_settlement_tracker() -> SettlementTracker:
+    """
+    Return the shared settlement tracker, starting it on first use.
+    
+    Poll interval and history size come from PAYROLL_SETTLEMENT_POLL_INTERVAL
+    and PAYROLL_SETTLEMENT_HISTORY.
+    """
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = SettlementTracker()
+        return _tracker
+
+
+def shutdown_settlement_tracker() -> None:
+    """Stop the shared settlement tracker if it was started."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is not None:
+            _tracker.close()
+            _tracker = None
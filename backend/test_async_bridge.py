@@ -0,0 +1,142 @@
+"""
+Tests for the asyncio-native bridge.
+
+Usage:
+    python -m pytest backend/test_async_bridge.py
+"""
+import os
+import asyncio
+import threading
+
+import pytest
+
+from backend import async_bridge
+from backend.async_bridge import (
+    ClientDisconnectedError,
+    job_workspace_async,
+    process_payroll_async,
+    run_until_disconnected,
+)
+from backend.bridge import JOBS_DIR, process_payroll
+from backend.conftest import build_request, requires_cobol
+
+
+class FakeHttpRequest:
+    """Stands in for a Starlette Request that disconnects after a few polls."""
+    
+    def __init__(self, disconnect_after: int):
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+    
+    async def is_disconnected(self) -> bool:
+        self.polls += 1
+        return self.polls >= self.disconnect_after
+
+
+def test_disconnect_cancels_job():
+    """Test that a client disconnect cancels the running job"""
+    cancelled = asyncio.Event()
+    
+    async def slow_job():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    async def scenario():
+        with pytest.raises(ClientDisconnectedError):
+            await run_until_disconnected(
+                FakeHttpRequest(disconnect_after=2), slow_job(), poll_interval=0.01
+            )
+        assert cancelled.is_set()
+    
+    asyncio.run(scenario())
+    print("✓ Disconnect cancels job")
+
+
+def test_connected_client_gets_result():
+    """Test that the job result is returned while the client stays connected"""
+    async def quick_job():
+        await asyncio.sleep(0.02)
+        return "done"
+    
+    result = asyncio.run(run_until_disconnected(
+        FakeHttpRequest(disconnect_after=1000), quick_job(), poll_interval=0.005
+    ))
+    
+    assert result == "done"
+    print("✓ Connected client gets result")
+
+
+@requires_cobol
+def test_async_matches_sync():
+    """Test that the async bridge returns the same response as the sync bridge"""
+    request = build_request(250)
+    
+    assert asyncio.run(process_payroll_async(request, shard_size=100)) == process_payroll(request)
+    print("✓ Async bridge matches sync bridge")
+
+
+@requires_cobol
+def test_event_loop_stays_responsive():
+    """Test that other coroutines keep running while COBOL works"""
+    async def scenario():
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+        
+        ticker_task = asyncio.create_task(ticker())
+        await process_payroll_async(build_request(2000))
+        ticker_task.cancel()
+        return ticks
+    
+    assert asyncio.run(scenario()) > 10
+    print("✓ Event loop stays responsive")
+
+
+@requires_cobol
+def test_cancelled_job_cleans_up():
+    """Test that cancelling a job leaves no job directory behind"""
+    async def scenario():
+        task = asyncio.create_task(process_payroll_async(build_request(2000)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    
+    asyncio.run(scenario())
+    
+    leftover = os.listdir(JOBS_DIR) if os.path.isdir(JOBS_DIR) else []
+    assert leftover == []
+    print("✓ Cancelled job cleaned up")
+
+
+def test_job_workspace_off_event_loop(monkeypatch):
+    """Test that job directories are created and removed in worker threads"""
+    threads = []
+    
+    def on_thread(function):
+        def wrapper(*args):
+            threads.append(threading.current_thread())
+            return function(*args)
+        return wrapper
+    
+    monkeypatch.setattr(async_bridge, "create_job_workspace", on_thread(async_bridge.create_job_workspace))
+    monkeypatch.setattr(async_bridge, "remove_job_workspace", on_thread(async_bridge.remove_job_workspace))
+    
+    async def scenario():
+        async with job_workspace_async() as (input_file_path, output_file_path):
+            assert os.path.isdir(os.path.dirname(input_file_path))
+            assert os.path.dirname(output_file_path) == os.path.dirname(input_file_path)
+        return os.path.dirname(input_file_path)
+    
+    job_dir = asyncio.run(scenario())
+    
+    assert not os.path.exists(job_dir)
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    print("✓ Job workspace set up and torn down off the event loop")
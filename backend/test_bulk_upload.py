@@ -0,0 +1,237 @@
+"""
+Tests for fixed-width and CSV bulk uploads.
+
+Uploaded employees must produce exactly the COBOL input records and results
+of the equivalent JSON request. Runs on the reference engine, so no COBOL
+binary is needed.
+
+Usage:
+    python -m pytest backend/test_bulk_upload.py
+"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from backend import async_bridge
+from backend.async_bridge import process_payroll_results_async, process_payroll_stream_async
+from backend.bridge import json_to_fixed_width
+from backend.bulk_upload import (
+    UploadValidationError,
+    iter_upload_batches,
+    parse_fixed_width_block,
+    parse_wallet_file,
+)
+from backend.conftest import TEST_WALLET, build_employees
+from backend.models import EmployeePayrollInput, PayrollRequest
+
+
+def fixed_width_file(employees) -> bytes:
+    return "".join(json_to_fixed_width(emp) + "\n" for emp in employees).encode("ascii")
+
+
+def wallet_map(employees):
+    return {emp.employee_id: emp.wallet_address for emp in employees}
+
+
+async def stream(body: bytes, chunk_size: int):
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+def upload(body: bytes, upload_format: str, wallets, batch_size: int = 1000, chunk_size: int = 4096):
+    async def collect():
+        return [
+            batch async for batch in
+            iter_upload_batches(stream(body, chunk_size), upload_format, wallets, batch_size)
+        ]
+    return asyncio.run(collect())
+
+
+def test_fixed_width_round_trip():
+    """Test that uploaded records encode back to the same COBOL input"""
+    employees = build_employees(2500)
+    
+    batches = upload(fixed_width_file(employees), "fixed", wallet_map(employees), chunk_size=1000)
+    uploaded = [emp for batch in batches for emp in batch]
+    
+    assert [len(batch) for batch in batches] == [1000, 1000, 500]
+    assert [json_to_fixed_width(emp) for emp in uploaded] == [json_to_fixed_width(emp) for emp in employees]
+    assert [emp.wallet_address for emp in uploaded] == [emp.wallet_address for emp in employees]
+    print("✓ Fixed-width upload round-trips 2500 records")
+
+
+def test_csv_matches_fixed_width():
+    """Test that a CSV export yields the same employees as the fixed-width file"""
+    employees = build_employees(50)
+    rows = ["employee_id,hours_worked,hourly_rate,tax_code,wallet_address"] + [
+        f"{emp.employee_id},{emp.hours_worked},{emp.hourly_rate},{emp.tax_code},{emp.wallet_address}"
+        for emp in employees
+    ]
+    
+    from_csv = upload("\r\n".join(rows).encode(), "csv", {}, chunk_size=300)
+    from_fixed = upload(fixed_width_file(employees), "fixed", wallet_map(employees))
+    
+    assert from_csv == from_fixed
+    print("✓ CSV upload matches fixed-width upload")
+
+
+def test_crlf_and_blank_lines_accepted():
+    """Test that Windows line endings and blank lines are handled"""
+    employees = build_employees(3)
+    body = b"\r\n".join(json_to_fixed_width(emp).encode() for emp in employees) + b"\r\n\r\n"
+    
+    batches = upload(body, "fixed", wallet_map(employees))
+    
+    assert [emp.employee_id for emp in batches[0]] == ["EMP00000", "EMP00001", "EMP00002"]
+    print("✓ CRLF and blank lines accepted")
+
+
+def test_invalid_records_report_line_and_field():
+    """Test that invalid records are reported with the EmployeePayrollInput rules"""
+    employees = build_employees(3)
+    lines = [json_to_fixed_width(emp) for emp in employees]
+    lines[1] = lines[1][:10] + "00000" + lines[1][15:]
+    lines[2] = "          " + lines[2][10:]
+    body = ("\n".join(lines) + "\n").encode()
+    
+    with pytest.raises(UploadValidationError) as excinfo:
+        upload(body, "fixed", wallet_map(employees))
+    
+    assert [(error["loc"], error["type"]) for error in excinfo.value.errors] == [
+        (("body", "records", 2, "hours_worked"), "greater_than"),
+        (("body", "records", 3, "employee_id"), "string_too_short"),
+    ]
+    print("✓ Invalid records reported by line and field")
+
+
+def test_vectorised_and_per_record_checks_agree():
+    """Test that the NumPy fast path flags exactly what the per-record check rejects"""
+    employees = build_employees(4)
+    good = [json_to_fixed_width(emp) for emp in employees]
+    bad = good[:]
+    bad[3] = bad[3][:16] + "x" + bad[3][17:]
+    
+    uniform = ("\n".join(bad) + "\n").encode()
+    non_uniform = ("\r\n".join(bad) + "\r\n").encode()
+    
+    for body in (uniform, non_uniform):
+        with pytest.raises(UploadValidationError) as excinfo:
+            parse_fixed_width_block(body, 1, wallet_map(employees))
+        assert excinfo.value.errors[0]["loc"] == ("body", "records", 4, "hourly_rate")
+    print("✓ Fast path and per-record check agree")
+
+
+def test_csv_amount_rules():
+    """Test CSV amounts against the EmployeePayrollInput Decimal constraints"""
+    header = "employee_id,hours_worked,hourly_rate"
+    wallets = {"E1": TEST_WALLET}
+    
+    for hours, error_type in (("1000", "decimal_whole_digits"), ("40.123", "decimal_max_places"),
+                              ("0", "greater_than"), ("forty", "decimal_parsing")):
+        with pytest.raises(UploadValidationError) as excinfo:
+            upload(f"{header}\nE1,{hours},25.50\n".encode(), "csv", wallets)
+        assert excinfo.value.errors[0]["type"] == error_type, hours
+        with pytest.raises(Exception):
+            EmployeePayrollInput(
+                employee_id="E1", hours_worked=hours, hourly_rate="25.50", wallet_address=TEST_WALLET
+            )
+    
+    accepted = upload(f"{header}\nE1,040.50,25.5\n".encode(), "csv", wallets)
+    assert accepted[0][0].hours_worked == Decimal("40.50")
+    assert accepted[0][0].tax_code == "US"
+    print("✓ CSV amount rules match EmployeePayrollInput")
+
+
+def test_csv_non_ascii_rejected():
+    """Test that CSV text fields must fit the ASCII fixed-width record"""
+    header = "employee_id,hours_worked,hourly_rate,tax_code"
+    wallets = {"José": TEST_WALLET, "E1": TEST_WALLET}
+    
+    with pytest.raises(UploadValidationError) as excinfo:
+        upload(f"{header}\nJosé,40.00,25.50,US\nE1,40.00,25.50,Ü1\n".encode(), "csv", wallets)
+    
+    assert [(error["loc"], error["type"]) for error in excinfo.value.errors] == [
+        (("body", "records", 2, "employee_id"), "string_pattern_mismatch"),
+        (("body", "records", 3, "tax_code"), "string_pattern_mismatch"),
+    ]
+    print("✓ Non-ASCII CSV fields rejected")
+
+
+def test_wallet_file():
+    """Test wallet side file parsing and its errors"""
+    data = f"employee_id,wallet_address\nEMP001,{TEST_WALLET}\n\nEMP002,{TEST_WALLET}\n".encode()
+    assert parse_wallet_file(data) == {"EMP001": TEST_WALLET, "EMP002": TEST_WALLET}
+    
+    with pytest.raises(UploadValidationError) as excinfo:
+        parse_wallet_file(f"EMP001,{TEST_WALLET}\nEMP001,0x{'0' * 40}\nEMP003,0x123\n".encode())
+    assert [error["loc"] for error in excinfo.value.errors] == [
+        ("body", "wallets", 2, "employee_id"),
+        ("body", "wallets", 3, "wallet_address"),
+    ]
+    print("✓ Wallet side file parsed and validated")
+
+
+def test_missing_wallet_rejected():
+    """Test that every employee needs a wallet address"""
+    employees = build_employees(2)
+    
+    with pytest.raises(UploadValidationError) as excinfo:
+        upload(fixed_width_file(employees), "fixed", {"EMP00000": TEST_WALLET})
+    
+    assert excinfo.value.errors[0]["loc"] == ("body", "records", 2, "wallet_address")
+    print("✓ Missing wallet rejected")
+
+
+def test_empty_upload_rejected():
+    """Test that an upload without records is rejected"""
+    with pytest.raises(UploadValidationError):
+        upload(b"\n", "fixed", {})
+    with pytest.raises(UploadValidationError):
+        upload(b"employee_id,hours_worked,hourly_rate\n", "csv", {})
+    print("✓ Empty upload rejected")
+
+
+def test_uploaded_results_match_json_request(monkeypatch):
+    """Test that an upload gives the same results as the JSON request"""
+    monkeypatch.setattr(async_bridge, "DEFAULT_ENGINE", "reference")
+    employees = build_employees(300)
+    
+    async def scenario():
+        batches = iter_upload_batches(
+            stream(fixed_width_file(employees), 2048), "fixed", wallet_map(employees), 64
+        )
+        uploaded = await process_payroll_stream_async(batches)
+        direct = await process_payroll_results_async(PayrollRequest(employees=employees), engine="reference")
+        return uploaded.to_json(), direct.to_json()
+    
+    uploaded, direct = asyncio.run(scenario())
+    
+    assert uploaded == direct
+    print("✓ Upload results match the JSON request")
+
+
+def test_upload_endpoint_format_field(monkeypatch):
+    """Test that the endpoint's "format" form field overrides the file name"""
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    
+    monkeypatch.setattr(async_bridge, "DEFAULT_ENGINE", "reference")
+    client = TestClient(app)
+    employees = build_employees(3)
+    rows = ["employee_id,hours_worked,hourly_rate,wallet_address"] + [
+        f"{emp.employee_id},{emp.hours_worked},{emp.hourly_rate},{emp.wallet_address}"
+        for emp in employees
+    ]
+    files = {"records": ("employees.dat", "\n".join(rows).encode())}
+    
+    accepted = client.post("/api/payroll/upload", files=files, data={"format": "csv"})
+    rejected = client.post("/api/payroll/upload", files=files, data={"format": "xml"})
+    
+    assert accepted.status_code == 200
+    assert [result["employee_id"] for result in accepted.json()["results"]] == [
+        emp.employee_id for emp in employees
+    ]
+    assert rejected.status_code == 422
+    assert rejected.json()["detail"][0]["loc"] == ["body", "format"]
+    print("✓ Upload endpoint reads the format form field")
@@ -0,0 +1,170 @@
+"""
+Tests for column-wise validation of large PayrollRequest bodies.
+
+The column-wise path must accept exactly what PayrollRequest accepts, with
+the same values, and reject everything else with the same errors.
+
+Usage:
+    python -m pytest backend/test_bulk_validation.py
+"""
+import json
+
+from fastapi.testclient import TestClient
+
+from backend import bulk_validation
+from backend.bulk_validation import RequestBodyValidationError, validate_payroll_request
+from backend.conftest import TEST_WALLET
+
+
+def employee(index: int, **fields) -> dict:
+    row = {
+        "employee_id": f"EMP{index:05d}",
+        "hours_worked": "40.00",
+        "hourly_rate": "25.50",
+        "tax_code": "US",
+        "wallet_address": TEST_WALLET
+    }
+    row.update(fields)
+    return row
+
+
+def body(rows) -> bytes:
+    return json.dumps({"employees": rows}).encode()
+
+
+def both_paths(data: bytes):
+    """Validate per object and column-wise; return (result or errors) of each."""
+    outcomes = []
+    for threshold in (10 ** 9, 1):
+        try:
+            outcomes.append(validate_payroll_request(data, threshold=threshold))
+        except RequestBodyValidationError as e:
+            outcomes.append(e.errors)
+    return outcomes
+
+
+def test_valid_rows_match_model_validation():
+    """Test that every accepted input form gives the model's values"""
+    rows = [employee(0)]
+    for index, (hours, rate) in enumerate([
+        (40, 25.5), (40.0, "25.5"), ("040.5", "0025.50"), ("0.01", "9999.99"),
+        (" 40.5 ", "25"), ("4e1", "25"), ("40.", ".5"), (99.99, 1234)
+    ], start=1):
+        rows.append(employee(index, hours_worked=hours, hourly_rate=rate))
+    rows.append({key: value for key, value in employee(20).items() if key != "tax_code"})
+    rows.append(employee(21, department="Sales"))
+    
+    by_model, column_wise = both_paths(body(rows))
+    
+    assert len(column_wise.employees) == len(rows)
+    for expected, actual in zip(by_model.employees, column_wise.employees):
+        assert actual == expected
+        assert actual.model_fields_set == expected.model_fields_set
+        assert repr(actual.hours_worked) == repr(expected.hours_worked)
+        assert repr(actual.hourly_rate) == repr(expected.hourly_rate)
+    assert column_wise.model_dump_json() == by_model.model_dump_json()
+    print("✓ Column-wise validation accepts the same values as the model")
+
+
+def test_invalid_rows_give_the_same_errors():
+    """Test that errors and their row indices match per-object validation"""
+    rows = [employee(index) for index in range(10)]
+    rows[1] = 7
+    rows[2] = employee(2, employee_id="")
+    rows[3] = employee(3, hours_worked="0.00", hourly_rate=-1)
+    rows[4] = employee(4, hours_worked="1000", hourly_rate="25.505")
+    rows[5] = employee(5, hours_worked=True, tax_code=None)
+    rows[6] = employee(6, wallet_address="0x123")
+    rows[7] = {key: value for key, value in employee(7).items() if key != "hourly_rate"}
+    rows[8] = employee(8, employee_id=12345, hours_worked=0.1 + 0.2)
+    rows[9] = employee(9, employee_id="José", tax_code="\t1")
+    
+    by_model, column_wise = both_paths(body(rows))
+    
+    assert column_wise == by_model
+    assert {error["loc"][2] for error in column_wise} == {1, 2, 3, 4, 5, 6, 7, 8, 9}
+    assert all(error["loc"][:2] == ("body", "employees") for error in column_wise)
+    print("✓ Column-wise validation reports the model's errors per row")
+
+
+def test_malformed_bodies_give_fastapi_errors():
+    """Test empty, undecodable and wrongly shaped bodies"""
+    for data in (b"", b"{bad", b"[]", b"{}", body([]), json.dumps({"employees": "x"}).encode()):
+        by_model, column_wise = both_paths(data)
+        assert isinstance(column_wise, list) and column_wise == by_model
+        assert column_wise[0]["loc"][0] == "body"
+    print("✓ Malformed bodies rejected like FastAPI does")
+
+
+def test_threshold_selects_path(monkeypatch):
+    """Test that only requests at or above the threshold are validated column-wise"""
+    calls = []
+    real = bulk_validation.validate_employee_rows
+    monkeypatch.setattr(
+        bulk_validation, "validate_employee_rows", lambda rows: calls.append(len(rows)) or real(rows)
+    )
+    monkeypatch.setattr(bulk_validation, "BULK_VALIDATION_THRESHOLD", 5)
+    
+    validate_payroll_request(body([employee(index) for index in range(4)]))
+    validate_payroll_request(body([employee(index) for index in range(5)]))
+    
+    assert calls == [5]
+    print("✓ Threshold selects the column-wise path")
+
+
+def test_endpoint_422_is_unchanged(monkeypatch):
+    """Test that /api/payroll/process answers a bad large batch like a small one"""
+    from backend.main import app
+    
+    client = TestClient(app)
+    rows = [employee(index) for index in range(3)]
+    rows[2] = employee(2, hourly_rate="abc")
+    
+    responses = []
+    for threshold in (10 ** 9, 1):
+        monkeypatch.setattr(bulk_validation, "BULK_VALIDATION_THRESHOLD", threshold)
+        responses.append(client.post("/api/payroll/process", content=body(rows)))
+    
+    assert [response.status_code for response in responses] == [422, 422]
+    assert responses[0].json() == responses[1].json()
+    assert responses[1].json()["detail"][0]["loc"] == ["body", "employees", 2, "hourly_rate"]
+    print("✓ Endpoint 422 identical on both paths")
+
+
+def test_process_and_settle_validated_column_wise(monkeypatch):
+    """Test that /api/payroll/process-and-settle validates large batches column-wise too"""
+    from backend.main import app
+    
+    calls = []
+    real = bulk_validation.validate_employee_rows
+    monkeypatch.setattr(
+        bulk_validation, "validate_employee_rows", lambda rows: calls.append(len(rows)) or real(rows)
+    )
+    monkeypatch.setattr(bulk_validation, "BULK_VALIDATION_THRESHOLD", 1)
+    client = TestClient(app)
+    rows = [employee(index) for index in range(3)]
+    rows[2] = employee(2, hourly_rate="abc")
+    
+    settle = client.post("/api/payroll/process-and-settle", content=body(rows))
+    process = client.post("/api/payroll/process", content=body(rows))
+    
+    assert calls == [3, 3]
+    assert settle.status_code == 422
+    assert settle.json() == process.json()
+    print("✓ Process-and-settle uses the column-wise validator")
+
+
+def test_non_ascii_employee_id_rejected(monkeypatch):
+    """Test that every JSON endpoint rejects IDs the fixed-width record can't hold"""
+    from backend.main import app
+    
+    client = TestClient(app)
+    rows = [employee(0), employee(1, employee_id="José")]
+    
+    for threshold in (10 ** 9, 1):
+        monkeypatch.setattr(bulk_validation, "BULK_VALIDATION_THRESHOLD", threshold)
+        for path in ("/api/payroll/process", "/api/payroll/jobs", "/api/payroll/process-and-settle"):
+            response = client.post(path, content=body(rows))
+            assert response.status_code == 422, path
+            assert response.json()["detail"][0]["loc"] == ["body", "employees", 1, "employee_id"]
+    print("✓ Non-ASCII employee IDs rejected with 422 on every path")
@@ -0,0 +1,128 @@
+"""
+Tests for the payroll request coalescer.
+
+Requests run on the reference engine, so no COBOL binary is needed.
+
+Usage:
+    python -m pytest backend/test_coalescer.py
+"""
+import asyncio
+from decimal import Decimal
+from functools import partial
+
+import pytest
+
+from backend.async_bridge import process_payroll_results_async
+from backend.coalescer import PayrollCoalescer
+from backend.conftest import build_employee
+from backend.models import PayrollRequest
+
+
+run_reference = partial(process_payroll_results_async, engine="reference")
+
+
+def build_numbered_request(request_number: int, count: int = 3) -> PayrollRequest:
+    """Same employee IDs in every request, but unique hours and wallets."""
+    return PayrollRequest(employees=[
+        build_employee(
+            index,
+            hours_worked=Decimal(request_number + 1),
+            hourly_rate=Decimal("10.00"),
+            wallet_address=f"0x{request_number:020x}{index:020x}"
+        )
+        for index in range(count)
+    ])
+
+
+def test_concurrent_requests_share_one_run():
+    """Test that requests within the window share a run and get only their own results"""
+    calls = []
+    
+    async def run(request):
+        calls.append(len(request.employees))
+        return await run_reference(request)
+    
+    async def scenario():
+        coalescer = PayrollCoalescer(run, window=0.05, max_records=1000)
+        requests = [build_numbered_request(n) for n in range(20)]
+        responses = await asyncio.gather(*(coalescer.submit(r) for r in requests))
+        return coalescer, requests, responses
+    
+    coalescer, requests, responses = asyncio.run(scenario())
+    
+    assert calls == [60]
+    for request_number, (request, results) in enumerate(zip(requests, responses)):
+        assert results.employee_ids == [emp.employee_id for emp in request.employees]
+        assert results.wallet_addresses == [emp.wallet_address for emp in request.employees]
+        assert list(results.gross_cents) == [(request_number + 1) * 1000] * 3
+        assert results.summary == {"processed": 3, "errors": 0}
+    
+    stats = coalescer.stats()
+    assert stats["batches"] == 1
+    assert stats["requests"] == 20
+    assert stats["avg_records_per_batch"] == 60
+    assert stats["max_wait_ms"] > 0
+    print("✓ 20 requests coalesced into one run")
+
+
+def test_max_records_flushes_early():
+    """Test that reaching max_records starts the run without waiting for the window"""
+    async def scenario():
+        coalescer = PayrollCoalescer(run_reference, window=30, max_records=6)
+        return await asyncio.wait_for(
+            asyncio.gather(coalescer.submit(build_numbered_request(0)), coalescer.submit(build_numbered_request(1))),
+            timeout=5
+        )
+    
+    first, second = asyncio.run(scenario())
+    
+    assert len(first) == len(second) == 3
+    print("✓ max_records flushes the batch early")
+
+
+def test_large_request_bypasses_queue():
+    """Test that a request of max_records or more runs immediately on its own"""
+    async def scenario():
+        coalescer = PayrollCoalescer(run_reference, window=30, max_records=5)
+        results = await asyncio.wait_for(coalescer.submit(build_numbered_request(0, count=5)), timeout=5)
+        return coalescer, results
+    
+    coalescer, results = asyncio.run(scenario())
+    
+    assert len(results) == 5
+    assert coalescer.stats()["bypassed"] == 1
+    assert coalescer.stats()["batches"] == 0
+    print("✓ Large request bypasses the queue")
+
+
+def test_failed_batch_is_retried_per_request():
+    """Test that one failing request does not fail the others in its batch"""
+    async def run(request):
+        if any(emp.hours_worked == Decimal(3) for emp in request.employees):
+            raise RuntimeError("bad request")
+        return await run_reference(request)
+    
+    async def scenario():
+        coalescer = PayrollCoalescer(run, window=0.02, max_records=1000)
+        outcomes = await asyncio.gather(
+            *(coalescer.submit(build_numbered_request(n)) for n in range(4)),
+            return_exceptions=True
+        )
+        return coalescer, outcomes
+    
+    coalescer, outcomes = asyncio.run(scenario())
+    
+    assert isinstance(outcomes[2], RuntimeError)
+    for index in (0, 1, 3):
+        assert outcomes[index].summary == {"processed": 3, "errors": 0}
+    assert coalescer.stats()["isolated_retries"] == 4
+    print("✓ Failed batch retried per request")
+
+
+def test_invalid_settings_rejected():
+    """Test that a non-positive window or record limit is rejected"""
+    with pytest.raises(ValueError):
+        PayrollCoalescer(run_reference, window=0)
+    with pytest.raises(ValueError):
+        PayrollCoalescer(run_reference, window=0.01, max_records=0)
+    print("✓ Invalid settings rejected")
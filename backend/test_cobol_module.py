@@ -0,0 +1,55 @@
+"""
+Tests for the in-process COBOL engine (PAYCALC shared module via ctypes).
+
+Usage:
+    python -m pytest backend/test_cobol_module.py
+"""
+import os
+import ctypes.util
+
+import pytest
+
+from backend import cobol_module
+from backend.bridge import (
+    cobol_binary_path,
+    cobol_module_path,
+    get_cobol_module,
+    json_to_fixed_width,
+    process_payroll,
+)
+from backend.conftest import build_request
+
+
+requires_module = pytest.mark.skipif(
+    not (
+        os.path.exists(cobol_binary_path())
+        and os.path.exists(cobol_module_path())
+        and ctypes.util.find_library("cob")
+    ),
+    reason="COBOL payroll binary, paycalc module or libcob runtime not available"
+)
+
+
+@requires_module
+def test_inprocess_matches_subprocess_engine():
+    """Test that the in-process engine returns the same response as the binary"""
+    request = build_request(500)
+    
+    assert process_payroll(request, engine="inprocess") == process_payroll(request, engine="subprocess")
+    print("✓ In-process engine matches subprocess engine")
+
+
+@requires_module
+def test_inprocess_splits_large_jobs(monkeypatch):
+    """Test that jobs larger than one PAYCALC call are chunked and summed"""
+    monkeypatch.setattr(cobol_module, "MAX_RECORDS_PER_CALL", 7)
+    request = build_request(50)
+    
+    lines = get_cobol_module().run_job(
+        [json_to_fixed_width(emp) for emp in request.employees]
+    )
+    
+    assert len(lines) == 51
+    assert lines[-1] == "SUMMARY: PROCESSED=00050 ERRORS=00000"
+    assert process_payroll(request, engine="inprocess").summary == {"processed": 50, "errors": 0}
+    print("✓ In-process engine chunks large jobs")
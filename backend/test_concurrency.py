@@ -0,0 +1,103 @@
+"""
+Concurrency stress test for the Python Bridge.
+
+Fires many payroll requests at process_payroll at the same time and checks
+that every response contains exactly its own employees. Before per-job work
+directories, parallel calls shared data/input.dat and data/output.rpt and
+could read each other's results.
+
+Usage:
+    python -m pytest backend/test_concurrency.py
+    python backend/test_concurrency.py
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+
+from backend.bridge import (
+    COBOL_PATH_LENGTH,
+    JOBS_DIR,
+    cobol_binary_path,
+    cobol_environment,
+    process_payroll,
+)
+from backend.conftest import build_employee, requires_cobol
+from backend.models import PayrollRequest
+
+
+PARALLEL_REQUESTS = 64
+EMPLOYEES_PER_REQUEST = 5
+
+
+def build_numbered_request(request_number: int) -> PayrollRequest:
+    """Build a request whose employee IDs and hours are unique to request_number."""
+    return PayrollRequest(employees=[
+        build_employee(
+            index,
+            employee_id=f"R{request_number:03d}E{index:02d}",
+            hours_worked=Decimal(request_number + 1),
+            hourly_rate=Decimal("10.00")
+        )
+        for index in range(EMPLOYEES_PER_REQUEST)
+    ])
+
+
+@requires_cobol
+def test_parallel_requests_do_not_mix():
+    """Test that 64 simultaneous requests each get back only their own results"""
+    requests = [build_numbered_request(n) for n in range(PARALLEL_REQUESTS)]
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_REQUESTS) as executor:
+        responses = list(executor.map(process_payroll, requests))
+
+    for request_number, (request, response) in enumerate(zip(requests, responses)):
+        expected_ids = [emp.employee_id for emp in request.employees]
+        actual_ids = [result.employee_id for result in response.results]
+        assert actual_ids == expected_ids, (
+            f"Request {request_number} got foreign results: {actual_ids}"
+        )
+
+        # Gross pay = (request_number + 1) hours * $10.00, so any mixing shows up here too
+        expected_gross = Decimal(request_number + 1) * 10
+        for result in response.results:
+            assert result.gross_pay == expected_gross
+            assert result.status == "OK"
+
+        assert response.summary == {"processed": EMPLOYEES_PER_REQUEST, "errors": 0}
+
+    print(f"✓ {PARALLEL_REQUESTS} parallel requests returned isolated results")
+
+
+@requires_cobol
+def test_job_directories_are_cleaned_up():
+    """Test that per-job work directories are removed after processing"""
+    process_payroll(build_numbered_request(0))
+
+    leftover = os.listdir(JOBS_DIR) if os.path.isdir(JOBS_DIR) else []
+    assert leftover == [], f"Job directories left behind: {leftover}"
+
+    print("✓ Job directories cleaned up")
+
+
+def test_overlong_job_paths_rejected():
+    """Test that job paths payroll.cbl would truncate are rejected, not passed on"""
+    env = cobol_environment("input.dat", "output.rpt")
+    assert env["PAYROLL_INPUT_FILE"] == os.path.abspath("input.dat")
+    assert env["PAYROLL_OUTPUT_FILE"] == os.path.abspath("output.rpt")
+    
+    with pytest.raises(IOError, match="PAYROLL_OUTPUT_FILE"):
+        cobol_environment("input.dat", os.path.join("x" * COBOL_PATH_LENGTH, "output.rpt"))
+    
+    print("✓ Over-long job paths rejected")
+
+
+if __name__ == "__main__":
+    if not os.path.exists(cobol_binary_path()):
+        print(f"COBOL binary not found at {cobol_binary_path()} - compile it first")
+        sys.exit(1)
+    test_parallel_requests_do_not_mix()
+    test_job_directories_are_cleaned_up()
+    test_overlong_job_paths_rejected()
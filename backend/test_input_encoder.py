@@ -0,0 +1,113 @@
+"""
+Tests for the bulk fixed-width input encoder.
+
+The encoder must produce byte-for-byte what json_to_fixed_width() + newline
+produced for every employee.
+
+Usage:
+    python -m pytest backend/test_input_encoder.py
+"""
+import random
+from decimal import Decimal
+
+import pytest
+
+from backend.bridge import (
+    fixed_width_records,
+    iter_input_blocks,
+    json_to_fixed_width,
+    write_input_file,
+)
+from backend.conftest import TEST_WALLET
+from backend.models import EmployeePayrollInput
+
+
+def employee(employee_id: str, hours: str, rate: str, tax_code: str = "US") -> EmployeePayrollInput:
+    return EmployeePayrollInput(
+        employee_id=employee_id,
+        hours_worked=Decimal(hours),
+        hourly_rate=Decimal(rate),
+        tax_code=tax_code,
+        wallet_address=TEST_WALLET
+    )
+
+
+def expected_bytes(employees) -> bytes:
+    return "".join(json_to_fixed_width(emp) + "\n" for emp in employees).encode("ascii")
+
+
+def test_matches_json_to_fixed_width():
+    """Test edge-case values against the per-record encoder"""
+    employees = [
+        employee("EMP001", "40.00", "25.50"),
+        employee("E", "40", "25.5", "CA"),
+        employee("EMP0001234", "0.01", "0.01"),
+        employee("X" * 10, "999.99", "9999.99"),
+        employee("A B", "1E+1", "7.5"),
+    ]
+    
+    assert b"".join(iter_input_blocks(employees)) == expected_bytes(employees)
+    assert fixed_width_records(employees) == [json_to_fixed_width(emp) for emp in employees]
+    print("✓ Bulk encoder matches json_to_fixed_width on edge cases")
+
+
+def test_matches_on_random_batch():
+    """Test a random batch spanning several blocks"""
+    rng = random.Random(7)
+    employees = [
+        employee(
+            f"R{index:05d}",
+            str(Decimal(rng.randint(1, 99999)) / 100),
+            str(Decimal(rng.randint(1, 999999)) / 100)
+        )
+        for index in range(2500)
+    ]
+    
+    blocks = list(iter_input_blocks(employees, block_records=1000))
+    
+    assert [len(block) for block in blocks] == [24000, 24000, 12000]
+    assert b"".join(blocks) == expected_bytes(employees)
+    print("✓ Bulk encoder matches on 2500 random records in 3 blocks")
+
+
+def test_write_input_file(tmp_path):
+    """Test that write_input_file writes the encoded records"""
+    employees = [employee("EMP001", "40.00", "25.50"), employee("EMP002", "35.50", "25.50")]
+    path = tmp_path / "input.dat"
+    
+    write_input_file(employees, str(path))
+    
+    assert path.read_bytes() == b"EMP001    04000002550US\nEMP002    03550002550US\n"
+    print("✓ write_input_file writes bulk-encoded records")
+
+
+def test_rejects_values_that_overflow_the_record():
+    """Test that a value too wide for its field is rejected instead of shifting the record"""
+    too_many_hours = EmployeePayrollInput.model_construct(
+        employee_id="EMP001",
+        hours_worked=Decimal("1000.00"),
+        hourly_rate=Decimal("25.50"),
+        tax_code="US",
+        wallet_address=TEST_WALLET
+    )
+    
+    with pytest.raises(ValueError):
+        list(iter_input_blocks([too_many_hours]))
+    print("✓ Overflowing values rejected")
+
+
+def test_rejects_non_ascii_records():
+    """Test that a record that wouldn't be 23 ASCII bytes never reaches an engine"""
+    unicode_id = EmployeePayrollInput.model_construct(
+        employee_id="José",
+        hours_worked=Decimal("1.00"),
+        hourly_rate=Decimal("1.00"),
+        tax_code="US",
+        wallet_address=TEST_WALLET
+    )
+    
+    with pytest.raises(ValueError, match="José"):
+        fixed_width_records([employee("EMP001", "40.00", "25.50"), unicode_id])
+    with pytest.raises(ValueError, match="José"):
+        list(iter_input_blocks([unicode_id]))
+    print("✓ Non-ASCII records rejected")
@@ -0,0 +1,199 @@
+"""
+Tests for streaming NDJSON ingestion.
+
+Batches run on the reference engine, so no COBOL binary is needed.
+
+Usage:
+    python -m pytest backend/test_ndjson_ingest.py
+"""
+import asyncio
+import json
+from decimal import Decimal
+
+import pytest
+
+from backend import async_bridge
+from backend.async_bridge import (
+    iter_employee_slices,
+    process_payroll_results_async,
+    process_payroll_stream_async,
+)
+from backend.models import EmployeePayrollInput, PayrollRequest
+from backend.ndjson_ingest import NDJSONValidationError, iter_employee_batches
+
+
+def employee_json(index: int) -> dict:
+    return {
+        "employee_id": f"EMP{index:05d}",
+        "hours_worked": str(Decimal(index % 40 + 1) + Decimal("0.25")),
+        "hourly_rate": "25.50",
+        "tax_code": "US",
+        "wallet_address": f"0x{index:040x}"
+    }
+
+
+def ndjson_body(count: int) -> bytes:
+    return b"".join(json.dumps(employee_json(index)).encode() + b"\n" for index in range(count))
+
+
+async def stream(body: bytes, chunk_size: int):
+    """Yield the body in chunks that cut lines at arbitrary places."""
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+async def collect(batches):
+    return [batch async for batch in batches]
+
+
+def test_batches_across_chunk_boundaries():
+    """Test that records split over chunks are reassembled and batched in order"""
+    batches = asyncio.run(collect(iter_employee_batches(stream(ndjson_body(25), 37), batch_size=10)))
+    
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    ids = [emp.employee_id for batch in batches for emp in batch]
+    assert ids == [f"EMP{index:05d}" for index in range(25)]
+    assert batches[0][0] == EmployeePayrollInput(**employee_json(0))
+    print("✓ Records reassembled across chunk boundaries")
+
+
+def test_blank_lines_and_missing_final_newline():
+    """Test that blank lines are skipped and the last line needs no newline"""
+    body = b"\n" + ndjson_body(2) + b"\n\n" + json.dumps(employee_json(2)).encode()
+    
+    batches = asyncio.run(collect(iter_employee_batches(stream(body, 1000), batch_size=10)))
+    
+    assert [emp.employee_id for emp in batches[0]] == ["EMP00000", "EMP00001", "EMP00002"]
+    print("✓ Blank lines skipped, unterminated last line accepted")
+
+
+def test_invalid_line_reports_line_number():
+    """Test that validation errors point at the line and field"""
+    bad = employee_json(1)
+    bad["hours_worked"] = "-5"
+    body = ndjson_body(1) + json.dumps(bad).encode() + b"\n"
+    
+    with pytest.raises(NDJSONValidationError) as excinfo:
+        asyncio.run(collect(iter_employee_batches(stream(body, 64), batch_size=10)))
+    
+    assert excinfo.value.errors[0]["loc"] == ("body", 2, "hours_worked")
+    print("✓ Invalid line reported with line number")
+
+
+def test_non_ascii_employee_id_rejected():
+    """Test that NDJSON lines are held to the same record rules as JSON bodies"""
+    bad = employee_json(1)
+    bad["employee_id"] = "José"
+    body = ndjson_body(1) + json.dumps(bad).encode() + b"\n"
+    
+    with pytest.raises(NDJSONValidationError) as excinfo:
+        asyncio.run(collect(iter_employee_batches(stream(body, 64), batch_size=10)))
+    
+    assert excinfo.value.errors[0]["loc"] == ("body", 2, "employee_id")
+    print("✓ Non-ASCII employee ID rejected")
+
+
+def test_empty_body_rejected():
+    """Test that a body without records is rejected like an empty employees list"""
+    with pytest.raises(NDJSONValidationError) as excinfo:
+        asyncio.run(collect(iter_employee_batches(stream(b"\n\n", 10), batch_size=10)))
+    
+    assert excinfo.value.errors[0]["type"] == "too_short"
+    print("✓ Empty body rejected")
+
+
+def test_overlong_line_rejected():
+    """Test that a line without newline can't grow without bound"""
+    body = b"x" * (70 * 1024)
+    
+    with pytest.raises(NDJSONValidationError) as excinfo:
+        asyncio.run(collect(iter_employee_batches(stream(body, 4096), batch_size=10)))
+    
+    assert excinfo.value.errors[0]["type"] == "line_too_long"
+    print("✓ Overlong line rejected")
+
+
+def test_stream_matches_single_request(monkeypatch):
+    """Test that streamed processing gives the same results as one PayrollRequest"""
+    monkeypatch.setattr(async_bridge, "DEFAULT_ENGINE", "reference")
+    body = ndjson_body(230)
+    request = PayrollRequest(employees=[employee_json(index) for index in range(230)])
+    
+    async def scenario():
+        streamed = await process_payroll_stream_async(
+            iter_employee_batches(stream(body, 1000), batch_size=50), parallelism=2
+        )
+        direct = await process_payroll_results_async(request, engine="reference")
+        return streamed, direct
+    
+    streamed, direct = asyncio.run(scenario())
+    
+    assert streamed.to_json() == direct.to_json()
+    print("✓ Streamed processing matches a single request")
+
+
+def test_batches_in_flight_are_bounded(monkeypatch):
+    """Test that no more than parallelism batches run at once"""
+    running = 0
+    peak = 0
+    
+    async def slow_run(request, engine=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return await process_payroll_results_async(request, engine="reference")
+    
+    monkeypatch.setattr(async_bridge, "process_payroll_results_async", slow_run)
+    
+    results = asyncio.run(process_payroll_stream_async(
+        iter_employee_batches(stream(ndjson_body(100), 500), batch_size=10), parallelism=3
+    ))
+    
+    assert len(results) == 100
+    assert peak == 3
+    print("✓ Batches in flight bounded by parallelism")
+
+
+def test_payroll_ndjson_stream_ends_with_summary(monkeypatch):
+    """Test the streamed response: one result per line, then the summary"""
+    from backend import main
+    
+    monkeypatch.setattr(async_bridge, "DEFAULT_ENGINE", "reference")
+    request = PayrollRequest(employees=[employee_json(index) for index in range(20)])
+    
+    async def scenario():
+        batches = iter_employee_slices(request.employees, 7)
+        chunks = [chunk async for chunk in main.payroll_ndjson_stream(batches)]
+        direct = await process_payroll_results_async(request, engine="reference")
+        return chunks, direct.to_json()
+    
+    chunks, direct = asyncio.run(scenario())
+    lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    
+    assert len(chunks) == 4
+    assert lines[:-1] == direct["results"]
+    assert lines[-1] == {"summary": direct["summary"]}
+    print("✓ NDJSON response streams results per batch and ends with the summary")
+
+
+def test_payroll_ndjson_stream_reports_failure(monkeypatch):
+    """Test that a failing batch ends the stream with an error record"""
+    from backend import main
+    
+    async def failing_run(request, engine=None):
+        raise RuntimeError("COBOL binary exited with non-zero status 1")
+    
+    monkeypatch.setattr(async_bridge, "process_payroll_results_async", failing_run)
+    request = PayrollRequest(employees=[employee_json(0)])
+    
+    async def scenario():
+        batches = iter_employee_slices(request.employees, 10)
+        return [chunk async for chunk in main.payroll_ndjson_stream(batches)]
+    
+    last = json.loads(b"".join(asyncio.run(scenario())).splitlines()[-1])
+    
+    assert last["error_type"] == "UnexpectedError"
+    assert "non-zero status" in last["error"]
+    print("✓ Failed batch ends the stream with an error record")
@@ -0,0 +1,152 @@
+"""
+Tests for background payroll jobs.
+
+Jobs run on the reference engine, so no COBOL binary is needed.
+
+Usage:
+    python -m pytest backend/test_payroll_jobs.py
+"""
+import asyncio
+from functools import partial
+
+import pytest
+
+from backend.async_bridge import process_payroll_results_async
+from backend.conftest import build_request
+from backend.payroll_jobs import JobStore, PayrollJobManager
+
+
+run_reference = partial(process_payroll_results_async, engine="reference")
+
+
+async def wait_for_job(manager: PayrollJobManager, job_id: str) -> dict:
+    for _ in range(500):
+        job = await manager.status(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_runs_in_chunks_and_returns_results(tmp_path):
+    """Test that a job completes chunk by chunk with the same results as a direct run"""
+    request = build_request(250)
+    chunk_sizes = []
+    
+    async def run(chunk):
+        chunk_sizes.append(len(chunk.employees))
+        return await run_reference(chunk)
+    
+    async def scenario():
+        manager = PayrollJobManager(JobStore(str(tmp_path / "jobs.db")), run, chunk_size=100)
+        queued = await manager.submit(request)
+        job = await wait_for_job(manager, queued["job_id"])
+        page = await manager.results(queued["job_id"], 90, 20)
+        everything = await manager.results(queued["job_id"], 0, 1000)
+        direct = await run_reference(request)
+        await manager.close()
+        return queued, job, page, everything, direct.to_json()
+    
+    queued, job, page, everything, direct = asyncio.run(scenario())
+    
+    assert queued["status"] == "queued"
+    assert queued["total"] == 250
+    assert chunk_sizes == [100, 100, 50]
+    assert job["status"] == "completed"
+    assert job["completed"] == 250
+    assert job["progress"] == 1.0
+    assert job["summary"] == direct["summary"]
+    assert everything == direct["results"]
+    assert page == direct["results"][90:110]
+    print("✓ Job ran in 3 chunks and matches a direct run")
+
+
+def test_unfinished_job_resumes_after_restart(tmp_path):
+    """Test that a job interrupted mid-way resumes at its first missing chunk"""
+    db_path = str(tmp_path / "jobs.db")
+    request = build_request(30)
+    
+    async def first_run():
+        gate = asyncio.Event()
+        
+        async def run(chunk):
+            if chunk.employees[0].employee_id != "EMP00000":
+                await gate.wait()
+            return await run_reference(chunk)
+        
+        manager = PayrollJobManager(JobStore(db_path), run, chunk_size=10)
+        queued = await manager.submit(request)
+        for _ in range(500):
+            if (await manager.status(queued["job_id"]))["completed"] == 10:
+                break
+            await asyncio.sleep(0.01)
+        await manager.close()
+        return queued["job_id"]
+    
+    job_id = asyncio.run(first_run())
+    
+    resumed_chunks = []
+    
+    async def second_run():
+        async def run(chunk):
+            resumed_chunks.append(chunk.employees[0].employee_id)
+            return await run_reference(chunk)
+        
+        manager = PayrollJobManager(JobStore(db_path), run, chunk_size=10)
+        interrupted = await manager.status(job_id)
+        await manager.start()
+        job = await wait_for_job(manager, job_id)
+        results = await manager.results(job_id, 0, 100)
+        await manager.close()
+        return interrupted, job, results
+    
+    interrupted, job, results = asyncio.run(second_run())
+    
+    assert interrupted["status"] == "running"
+    assert interrupted["completed"] == 10
+    assert resumed_chunks == ["EMP00010", "EMP00020"]
+    assert job["status"] == "completed"
+    assert [row["employee_id"] for row in results] == [emp.employee_id for emp in request.employees]
+    print("✓ Interrupted job resumed after restart")
+
+
+def test_failed_job_reports_error(tmp_path):
+    """Test that a failing chunk marks the job as failed with its error"""
+    async def run(chunk):
+        raise RuntimeError("COBOL execution timed out")
+    
+    async def scenario():
+        manager = PayrollJobManager(JobStore(str(tmp_path / "jobs.db")), run)
+        queued = await manager.submit(build_request(5))
+        job = await wait_for_job(manager, queued["job_id"])
+        await manager.close()
+        return job
+    
+    job = asyncio.run(scenario())
+    
+    assert job["status"] == "failed"
+    assert "timed out" in job["error"]
+    print("✓ Failed job reports its error")
+
+
+def test_unknown_job_is_none(tmp_path):
+    """Test that status() returns None for unknown job IDs"""
+    async def scenario():
+        manager = PayrollJobManager(JobStore(str(tmp_path / "jobs.db")), run_reference)
+        status = await manager.status("does-not-exist")
+        await manager.close()
+        return status
+    
+    assert asyncio.run(scenario()) is None
+    print("✓ Unknown job returns None")
+
+
+def test_invalid_settings_rejected(tmp_path):
+    """Test that a chunk size or worker count below 1 is rejected"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    with pytest.raises(ValueError):
+        PayrollJobManager(store, run_reference, chunk_size=0)
+    with pytest.raises(ValueError):
+        PayrollJobManager(store, run_reference, workers=0)
+    store.close()
+    print("✓ Invalid settings rejected")
@@ -0,0 +1,203 @@
+"""
+Tests for the integer-cents PayrollResultSet.
+
+The result set must convert to exactly the PayrollResponse and JSON the
+Decimal-based parser always produced.
+
+Usage:
+    python -m pytest backend/test_payroll_results.py
+"""
+import json
+from decimal import Decimal
+
+import pytest
+
+from backend import reference_engine
+from backend.bridge import (
+    build_payroll_response,
+    build_payroll_results,
+    json_to_fixed_width,
+    parse_output_line,
+    process_payroll,
+    process_payroll_results,
+)
+from backend.conftest import TEST_WALLET, build_employees
+from backend.models import EmployeePayrollInput, PayrollRequest
+from backend.payroll_results import format_cents
+
+
+def report_for(employees):
+    return reference_engine.run_job([json_to_fixed_width(emp) for emp in employees])
+
+
+def test_format_cents_matches_decimal():
+    """Test that format_cents renders exactly like str(Decimal(cents) / 100)"""
+    values = list(range(0, 20000)) + [10 ** 9, 999999999999, 123456789000, 100000000010]
+    for cents in values:
+        assert format_cents(cents) == str(Decimal(cents) / 100), cents
+    print("✓ format_cents matches Decimal rendering")
+
+
+def test_results_match_decimal_parser():
+    """Test that cents columns equal parse_output_line's Decimal values"""
+    employees = build_employees(300)
+    lines = report_for(employees)
+    
+    results = build_payroll_results(employees, lines)
+    
+    assert len(results) == 300
+    assert results.summary == {"processed": 300, "errors": 0}
+    for row, line in zip(results, lines):
+        parsed = parse_output_line(line)
+        assert row.employee_id == parsed["employee_id"]
+        assert Decimal(row.gross_cents) / 100 == parsed["gross_pay"]
+        assert Decimal(row.federal_tax_cents) / 100 == parsed["federal_tax"]
+        assert Decimal(row.state_tax_cents) / 100 == parsed["state_tax"]
+        assert Decimal(row.net_cents) / 100 == parsed["net_pay"]
+        assert row.status == parsed["status"]
+    print("✓ Cents columns match the Decimal parser")
+
+
+def test_to_json_matches_response_serialisation():
+    """Test that to_json() equals the JSON of the Pydantic response"""
+    employees = build_employees(300)
+    lines = report_for(employees)
+    
+    results = build_payroll_results(employees, lines)
+    
+    assert results.to_json() == build_payroll_response(employees, lines).model_dump(mode="json")
+    print("✓ to_json matches PayrollResponse JSON")
+
+
+def with_edge_rows(results):
+    """Add rows with extreme amounts and characters JSON has to escape."""
+    results.append('É"\\1', 0, 5, 50, 999999999999, "OK", TEST_WALLET)
+    results.append("EMP\t2", 100000000010, 123456789000, 1, 72420, "ER", TEST_WALLET)
+    return results
+
+
+def test_to_json_bytes_matches_json_response():
+    """Test that to_json_bytes() is byte for byte JSONResponse(to_json())"""
+    from fastapi.responses import JSONResponse
+    
+    employees = build_employees(300)
+    results = with_edge_rows(build_payroll_results(employees, report_for(employees)))
+    
+    assert results.to_json_bytes() == JSONResponse(results.to_json()).body
+    print("✓ to_json_bytes matches JSONResponse rendering")
+
+
+def test_numeric_amounts_match_fastapi_encoding():
+    """Test numeric amounts against FastAPI's rendering of the Decimal response"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    
+    employees = build_employees(300)
+    results = with_edge_rows(build_payroll_results(employees, report_for(employees)))
+    
+    expected = JSONResponse(jsonable_encoder(results.to_response().model_dump())).body
+    
+    assert results.to_json_bytes(numeric_amounts=True) == expected
+    print("✓ Numeric amounts match FastAPI's Decimal encoding")
+
+
+def test_settle_response_matches_fastapi_encoding():
+    """Test the process-and-settle body against FastAPI's rendering of the old dict"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from backend.main import render_settle_response
+    
+    employees = build_employees(20)
+    results = build_payroll_results(employees, report_for(employees))
+    settlement = {
+        "total_processed": 1,
+        "total_succeeded": 0,
+        "total_failed": 1,
+        "results": [{"transaction_hash": None, "status": "failed", "amount": "816", "error": "Saldo ünzureichend"}]
+    }
+    combined = {"payroll": results.to_response().model_dump(), "settlement": settlement}
+    
+    assert render_settle_response(results, settlement) == JSONResponse(jsonable_encoder(combined)).body
+    print("✓ Settle response matches FastAPI rendering")
+
+
+def test_wallets_attached():
+    """Test that wallet addresses from the request are attached"""
+    employees = build_employees(3)
+    
+    results = build_payroll_results(employees, report_for(employees))
+    
+    assert results.wallet_addresses == [emp.wallet_address for emp in employees]
+    print("✓ Wallet addresses attached")
+
+
+def test_duplicate_ids_keep_their_own_wallets():
+    """Test that repeated employee IDs are joined to their own record by position"""
+    employees = [
+        EmployeePayrollInput(
+            employee_id="EMP00001",
+            hours_worked=Decimal(hours),
+            hourly_rate=Decimal("20.00"),
+            wallet_address=f"0x{index:040x}"
+        )
+        for index, hours in enumerate(["10", "20", "30"])
+    ]
+    
+    results = process_payroll_results(PayrollRequest(employees=employees), engine="reference")
+    
+    assert results.employee_ids == ["EMP00001"] * 3
+    assert results.wallet_addresses == [emp.wallet_address for emp in employees]
+    assert list(results.gross_cents) == [20000, 40000, 60000]
+    print("✓ Duplicate IDs keep their own wallets")
+
+
+def test_misaligned_report_rejected():
+    """Test that a report that doesn't line up with the request fails"""
+    employees = build_employees(3)
+    lines = report_for(employees)
+    records, summary = lines[:-1], lines[-1:]
+    
+    for misaligned in (records[:2] + summary, records + records[:1] + summary, records[::-1] + summary):
+        with pytest.raises(ValueError):
+            build_payroll_results(employees, misaligned)
+    print("✓ Missing, extra and reordered results rejected")
+
+
+def test_short_line_rejected():
+    """Test that malformed report lines still raise ValueError"""
+    with pytest.raises(ValueError):
+        build_payroll_results(build_employees(1), ["EMP00000  0001OK"])
+    print("✓ Short lines rejected")
+
+
+def test_process_payroll_results_matches_process_payroll():
+    """Test that both pipeline entry points agree"""
+    request = PayrollRequest(employees=build_employees(50))
+    
+    results = process_payroll_results(request, engine="reference")
+    
+    assert results.to_response() == process_payroll(request, engine="reference")
+    print("✓ process_payroll_results agrees with process_payroll")
+
+
+def test_to_ndjson_matches_to_json():
+    """Test that every NDJSON line is the matching to_json() result"""
+    employees = build_employees(40)
+    results = build_payroll_results(employees, report_for(employees))
+    
+    lines = results.to_ndjson().decode("utf-8").splitlines()
+    
+    assert [json.loads(line) for line in lines] == results.to_json()["results"]
+    print("✓ to_ndjson matches to_json results")
+
+
+def test_extend_concatenates_results_and_summary():
+    """Test that extend() appends rows and adds up the summaries"""
+    employees = build_employees(30)
+    whole = build_payroll_results(employees, report_for(employees))
+    
+    combined = build_payroll_results(employees[:10], report_for(employees[:10]))
+    combined.extend(build_payroll_results(employees[10:], report_for(employees[10:])))
+    
+    assert combined.to_json() == whole.to_json()
+    print("✓ extend concatenates results and summary")
@@ -0,0 +1,154 @@
+"""
+Tests for the NumPy reference payroll engine.
+
+The arithmetic tests check the engine against an independent Decimal model of
+the COBOL rules. The differential tests run sampled batches through both the
+COBOL binary and the reference engine and require identical reports.
+
+Usage:
+    python -m pytest backend/test_reference_engine.py
+"""
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+from backend import reference_engine
+from backend.bridge import (
+    differential_check,
+    json_to_fixed_width,
+    process_payroll,
+    run_sharded,
+)
+from backend.conftest import TEST_WALLET, requires_cobol
+from backend.models import EmployeePayrollInput, PayrollRequest
+
+
+def cobol_rounded(value: Decimal) -> Decimal:
+    """Decimal model of COMPUTE ... ROUNDED into a V99 field."""
+    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def random_batch(seed: int, count: int) -> list:
+    """Build a reproducible batch covering the full PIC 999V99 / 9999V99 range."""
+    rng = random.Random(seed)
+    return [
+        EmployeePayrollInput(
+            employee_id=f"S{seed:02d}E{index:05d}",
+            hours_worked=Decimal(rng.randint(1, 99999)) / 100,
+            hourly_rate=Decimal(rng.randint(1, 999999)) / 100,
+            tax_code="US",
+            wallet_address=TEST_WALLET
+        )
+        for index in range(count)
+    ]
+
+
+def test_known_record():
+    """Test the documented 40h x $25.50 example"""
+    lines = reference_engine.run_job(["EMP001    04000002550US"])
+    
+    assert lines == [
+        "EMP001    000000102000000000015300000000005100000000081600OK",
+        "SUMMARY: PROCESSED=00001 ERRORS=00000"
+    ]
+    print("✓ Known record matches COBOL output")
+
+
+def test_rounding_matches_decimal_model():
+    """Test ROUNDED (half away from zero) against Decimal on random inputs"""
+    employees = random_batch(seed=1, count=5000)
+    lines = reference_engine.run_job([json_to_fixed_width(emp) for emp in employees])
+    
+    for emp, line in zip(employees, lines):
+        gross = cobol_rounded(emp.hours_worked * emp.hourly_rate)
+        federal_tax = cobol_rounded(gross * Decimal("0.15"))
+        state_tax = cobol_rounded(gross * Decimal("0.05"))
+        net = gross - federal_tax - state_tax
+        
+        assert Decimal(line[10:22]) / 100 == gross
+        assert Decimal(line[22:34]) / 100 == federal_tax
+        assert Decimal(line[34:46]) / 100 == state_tax
+        assert Decimal(line[46:58]) / 100 == net
+    print("✓ 5000 random records match the Decimal model")
+
+
+def test_half_cent_rounds_up():
+    """Test that exact half cents round away from zero"""
+    # 0.50h x $0.01 = $0.005 -> $0.01; 0.10h x $0.05 = $0.005 -> $0.01
+    gross, federal_tax, state_tax, net = reference_engine.calculate_payroll(
+        [50, 10, 3333], [1, 5, 1]
+    )
+    assert gross.tolist() == [1, 1, 33]
+    # $0.33 x 0.15 = $0.0495 -> $0.05, $0.33 x 0.05 = $0.0165 -> $0.02
+    assert federal_tax.tolist()[2] == 5
+    assert state_tax.tolist()[2] == 2
+    assert net.tolist()[2] == 26
+    print("✓ Half cents round away from zero")
+
+
+def test_invalid_records_become_errors():
+    """Test blank IDs and zero hours/rates produce ER records with zero amounts"""
+    lines = reference_engine.run_job([
+        "          04000002550US",
+        "EMP002    00000002550US",
+        "EMP003    04000000000US",
+        "EMP004    04000002550US"
+    ])
+    
+    zeros = "0" * 48
+    assert lines[0] == "          " + zeros + "ER"
+    assert lines[1] == "EMP002    " + zeros + "ER"
+    assert lines[2] == "EMP003    " + zeros + "ER"
+    assert lines[3].endswith("OK")
+    assert lines[4] == "SUMMARY: PROCESSED=00001 ERRORS=00003"
+    print("✓ Invalid records become ER records")
+
+
+def test_rejects_malformed_records():
+    """Test that short records and non-numeric fields are rejected"""
+    with pytest.raises(ValueError):
+        reference_engine.run_job(["EMP001    0400002550US"])
+    with pytest.raises(ValueError):
+        reference_engine.run_job(["EMP001    04X00002550US"])
+    print("✓ Malformed records rejected")
+
+
+def test_compare_reports():
+    """Test that compare_reports flags changed and missing lines"""
+    mismatches = reference_engine.compare_reports(["a", "b", "c"], ["a", "x"])
+    
+    assert mismatches == [
+        {"line": 1, "expected": "b", "actual": "x"},
+        {"line": 2, "expected": "c", "actual": None}
+    ]
+    print("✓ compare_reports flags mismatches")
+
+
+def test_reference_engine_behind_process_payroll():
+    """Test that the reference engine can be selected in process_payroll"""
+    response = process_payroll(
+        PayrollRequest(employees=random_batch(seed=2, count=10)),
+        engine="reference"
+    )
+    
+    assert len(response.results) == 10
+    assert response.summary == {"processed": 10, "errors": 0}
+    print("✓ Reference engine selectable in process_payroll")
+
+
+@requires_cobol
+@pytest.mark.parametrize("seed", range(5))
+def test_differential_against_cobol(seed):
+    """Test that sampled batches produce identical reports on COBOL and the reference engine"""
+    employees = random_batch(seed=seed, count=2000)
+    request = PayrollRequest(employees=employees)
+    
+    cobol = process_payroll(request, engine="subprocess")
+    reference = process_payroll(request, engine="reference")
+    
+    assert reference == cobol
+    
+    # Same check at the report-line level, as run by PAYROLL_DIFFERENTIAL_SAMPLE_RATE
+    assert differential_check(employees, run_sharded(employees, "subprocess")) == []
+    print(f"✓ Differential batch {seed}: COBOL and reference engine agree")
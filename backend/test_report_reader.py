@@ -0,0 +1,190 @@
+"""
+Tests for the memory-mapped COBOL report reader.
+
+Reports are generated with the reference engine, so no COBOL binary is needed
+(except for the end-to-end subprocess test).
+
+Usage:
+    python -m pytest backend/test_report_reader.py
+"""
+import types
+from decimal import Decimal
+
+import pytest
+
+from backend import bridge, reference_engine
+from backend.bridge import (
+    build_payroll_results,
+    parse_output_line,
+    process_payroll_results,
+    read_output_file,
+)
+from backend.conftest import TEST_WALLET, requires_cobol
+from backend.models import EmployeePayrollInput, PayrollRequest
+from backend.report_reader import (
+    READ_BLOCK_BYTES,
+    ReportRecord,
+    iter_report_records,
+    read_report_results,
+    read_report_summary,
+)
+
+
+def write_report(path, count: int, line_ending: str = "\n") -> str:
+    """Write a reference-engine report with count records and return its path."""
+    records = [
+        f"EMP{index:07d}{index % 99999 + 1:05d}{index % 999999 + 1:06d}US"
+        for index in range(count)
+    ]
+    lines = reference_engine.run_job(records)
+    path.write_bytes((line_ending.join(lines) + line_ending).encode("ascii"))
+    return str(path)
+
+
+def report_employees(count: int):
+    """The employees write_report() computed, with wallets."""
+    return [
+        EmployeePayrollInput(
+            employee_id=f"EMP{index:07d}",
+            hours_worked=Decimal("1"),
+            hourly_rate=Decimal("1"),
+            tax_code="US",
+            wallet_address=TEST_WALLET
+        )
+        for index in range(count)
+    ]
+
+
+def test_matches_line_parser(tmp_path):
+    """Test that every record equals parse_output_line's result in cents"""
+    report = write_report(tmp_path / "output.rpt", 500)
+    
+    lines = [line for line in read_output_file(report) if not line.startswith("SUMMARY:")]
+    records = list(iter_report_records(report))
+    
+    assert len(records) == len(lines) == 500
+    for line, record in zip(lines, records):
+        expected = parse_output_line(line)
+        assert record.employee_id == expected["employee_id"]
+        assert Decimal(record.gross_cents) / 100 == expected["gross_pay"]
+        assert Decimal(record.federal_tax_cents) / 100 == expected["federal_tax"]
+        assert Decimal(record.state_tax_cents) / 100 == expected["state_tax"]
+        assert Decimal(record.net_cents) / 100 == expected["net_pay"]
+        assert record.status == expected["status"]
+    print("✓ mmap reader matches parse_output_line")
+
+
+def test_known_record(tmp_path):
+    """Test the documented 40h x $25.50 record"""
+    report = tmp_path / "output.rpt"
+    report.write_text(
+        "EMP001    000000102000000000015300000000005100000000081600OK\n"
+        "SUMMARY: PROCESSED=00001 ERRORS=00000\n"
+    )
+    
+    assert list(iter_report_records(str(report))) == [
+        ReportRecord("EMP001", 102000, 15300, 5100, 81600, "OK")
+    ]
+    assert read_report_summary(str(report)) == {"processed": 1, "errors": 0}
+    print("✓ Known record decoded into cents")
+
+
+def test_records_across_block_boundaries(tmp_path):
+    """Test a report larger than one read block, with Windows line endings"""
+    count = READ_BLOCK_BYTES // 61 * 2 + 17
+    report = write_report(tmp_path / "output.rpt", count, line_ending="\r\n")
+    
+    records = list(iter_report_records(report))
+    
+    assert len(records) == count
+    assert records[-1].employee_id == f"EMP{count - 1:07d}"
+    assert read_report_summary(report) == {"processed": count % 100000, "errors": 0}
+    print("✓ Records decoded across block boundaries")
+
+
+def test_blank_employee_id_record(tmp_path):
+    """Test that an ER record with a blank ID keeps its position and length"""
+    report = tmp_path / "output.rpt"
+    report.write_text(" " * 10 + "0" * 48 + "ER\nSUMMARY: PROCESSED=00000 ERRORS=00001\n")
+    
+    assert list(iter_report_records(str(report))) == [ReportRecord("", 0, 0, 0, 0, "ER")]
+    print("✓ Blank-ID error record decoded")
+
+
+def test_is_lazy(tmp_path):
+    """Test that records are produced by a generator"""
+    report = write_report(tmp_path / "output.rpt", 10)
+    
+    records = iter_report_records(report)
+    
+    assert isinstance(records, types.GeneratorType)
+    assert next(records).employee_id == "EMP0000000"
+    print("✓ Records yielded lazily")
+
+
+def test_empty_and_malformed_reports(tmp_path):
+    """Test empty files, missing summaries and short records"""
+    empty = tmp_path / "empty.rpt"
+    empty.write_bytes(b"")
+    assert list(iter_report_records(str(empty))) == []
+    with pytest.raises(ValueError):
+        read_report_summary(str(empty))
+    
+    short = tmp_path / "short.rpt"
+    short.write_text("EMP001    0000001020OK\n")
+    with pytest.raises(ValueError):
+        list(iter_report_records(str(short)))
+    
+    with pytest.raises(FileNotFoundError):
+        list(iter_report_records(str(tmp_path / "missing.rpt")))
+    print("✓ Empty and malformed reports handled")
+
+
+def test_results_match_line_pipeline(tmp_path):
+    """Test that read_report_results equals build_payroll_results on the same report"""
+    report = write_report(tmp_path / "output.rpt", 300)
+    employees = report_employees(300)
+    
+    results = read_report_results(employees, report)
+    expected = build_payroll_results(employees, read_output_file(report))
+    
+    assert results.to_json() == expected.to_json()
+    assert results.summary == {"processed": 300, "errors": 0}
+    print("✓ Report read into cents matches the line pipeline")
+
+
+def test_results_must_line_up(tmp_path):
+    """Test that a report for other, fewer or more employees is rejected"""
+    report = write_report(tmp_path / "output.rpt", 3)
+    employees = report_employees(4)
+    
+    with pytest.raises(ValueError, match="expected 'EMP0000001'"):
+        read_report_results(employees[1:], report)
+    with pytest.raises(ValueError, match="3 results for 4 records"):
+        read_report_results(employees, report)
+    with pytest.raises(ValueError, match="more results"):
+        read_report_results(employees[:2], report)
+    print("✓ Misaligned reports rejected")
+
+
+@requires_cobol
+def test_subprocess_engine_reads_reports_directly(monkeypatch):
+    """Test that the subprocess engine's direct report path matches the line path, sharded too"""
+    request = PayrollRequest(employees=[
+        EmployeePayrollInput(
+            employee_id=f"EMP{index:05d}",
+            hours_worked=Decimal(index % 60 + 1),
+            hourly_rate=Decimal("18.25"),
+            tax_code="US" if index % 7 else "XX",
+            wallet_address=TEST_WALLET
+        )
+        for index in range(25)
+    ])
+    assert bridge.reads_report_directly("subprocess")
+    
+    direct = process_payroll_results(request, engine="subprocess", shard_size=10)
+    monkeypatch.setattr(bridge, "reads_report_directly", lambda engine: False)
+    lines = process_payroll_results(request, engine="subprocess", shard_size=10)
+    
+    assert direct.to_json() == lines.to_json()
+    print("✓ Subprocess engine reads its reports straight into cents")
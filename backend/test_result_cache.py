@@ -0,0 +1,192 @@
+"""
+Tests for the COBOL result cache.
+
+Cache behaviour is tested directly on ResultCache; the process_payroll tests
+use the reference engine so they run without a compiled COBOL binary.
+
+Usage:
+    python -m pytest backend/test_result_cache.py
+"""
+import os
+from decimal import Decimal
+
+import pytest
+
+from backend import bridge
+from backend.bridge import process_payroll
+from backend.conftest import TEST_WALLET
+from backend.models import EmployeePayrollInput, PayrollRequest
+from backend.result_cache import ResultCache
+
+
+def employee(employee_id: str, hours: str = "40.00") -> EmployeePayrollInput:
+    return EmployeePayrollInput(
+        employee_id=employee_id,
+        hours_worked=Decimal(hours),
+        hourly_rate=Decimal("25.50"),
+        tax_code="US",
+        wallet_address=TEST_WALLET
+    )
+
+
+@pytest.fixture
+def payroll_cache(monkeypatch):
+    """Enable a fresh in-memory result cache for process_payroll."""
+    cache = ResultCache(max_entries=1000)
+    monkeypatch.setattr(bridge, "_result_caches", {"reference": cache})
+    monkeypatch.setattr(bridge, "RESULT_CACHE_SIZE", 1000)
+    return cache
+
+
+@pytest.fixture
+def sent_to_engine(monkeypatch):
+    """Record the employee IDs that reach the engine."""
+    sent = []
+    run_sharded = bridge.run_sharded
+    
+    def recording_run_sharded(employees, *args, **kwargs):
+        sent.append([emp.employee_id for emp in employees])
+        return run_sharded(employees, *args, **kwargs)
+    
+    monkeypatch.setattr(bridge, "run_sharded", recording_run_sharded)
+    return sent
+
+
+def test_memory_tier_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = ResultCache(max_entries=2)
+    cache.put_many(["a", "b"], ["line-a", "line-b"])
+    cache.get_many(["a"])  # "b" is now least recently used
+    cache.put_many(["c"], ["line-c"])
+    
+    assert cache.get_many(["a", "b", "c"]) == ["line-a", None, "line-c"]
+    assert cache.stats()["evictions"] == 1
+    print("✓ Memory tier evicts least recently used")
+
+
+def test_hit_miss_metrics():
+    """Test hit and miss counters"""
+    cache = ResultCache(max_entries=10)
+    cache.get_many(["a", "b"])
+    cache.put_many(["a"], ["line-a"])
+    cache.get_many(["a", "b"])
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["memory_entries"] == 1
+    print("✓ Hit/miss metrics counted")
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Test that the SQLite tier serves results to a new cache instance"""
+    db_path = str(tmp_path / "cache.db")
+    first = ResultCache(max_entries=10, db_path=db_path, namespace="v1")
+    first.put_many(["a", "b"], ["line-a", "line-b"])
+    first.close()
+    
+    second = ResultCache(max_entries=10, db_path=db_path, namespace="v1")
+    assert second.get_many(["a", "b", "c"]) == ["line-a", "line-b", None]
+    assert second.stats()["disk_hits"] == 2
+    
+    # Another COBOL build must not see these results
+    other = ResultCache(max_entries=10, db_path=db_path, namespace="v2")
+    assert other.get_many(["a"]) == [None]
+    print("✓ Disk tier persists and is namespaced by COBOL build")
+
+
+def test_disk_tier_size_eviction(tmp_path):
+    """Test that the SQLite tier is trimmed to max_disk_entries"""
+    cache = ResultCache(max_entries=10, db_path=str(tmp_path / "cache.db"), max_disk_entries=3)
+    for index in range(5):
+        cache.put_many([f"r{index}"], [f"line-{index}"])
+    cache._memory.clear()
+    
+    assert cache.get_many([f"r{index}" for index in range(5)]) == [
+        None, None, "line-2", "line-3", "line-4"
+    ]
+    print("✓ Disk tier evicts least recently used beyond its size")
+
+
+def test_disk_tier_not_counted_per_write(tmp_path):
+    """Test that writes below the size limit don't count the table"""
+    cache = ResultCache(max_entries=10, db_path=str(tmp_path / "cache.db"), max_disk_entries=100)
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+    
+    for index in range(50):
+        cache.put_many([f"r{index}"], [f"line-{index}"])
+    assert not [statement for statement in statements if "COUNT" in statement]
+    
+    # Past the limit it is counted once and trimmed with headroom
+    cache.put_many([f"s{index}" for index in range(60)], ["line"] * 60)
+    cache.put_many(["t0"], ["line"])
+    assert len([statement for statement in statements if "COUNT" in statement]) == 1
+    assert cache._db.execute("SELECT COUNT(*) FROM results").fetchone() == (91,)
+    print("✓ Disk tier counted only when it may be full")
+
+
+def test_namespaced_by_engine(monkeypatch, tmp_path):
+    """Test that each engine gets its own namespace, and none without an artifact"""
+    monkeypatch.setattr(bridge, "_result_caches", {})
+    monkeypatch.setattr(bridge, "RESULT_CACHE_SIZE", 10)
+    monkeypatch.setattr(bridge, "cobol_module_path", lambda: str(tmp_path / "missing.so"))
+    
+    reference = bridge.get_result_cache("reference")
+    
+    assert reference.namespace.startswith("reference:")
+    assert bridge.get_result_cache("reference") is reference
+    assert bridge.get_result_cache("inprocess") is None
+    if os.path.exists(bridge.cobol_binary_path()):
+        assert bridge.get_result_cache("subprocess").namespace.startswith("subprocess:")
+    print("✓ Result caches namespaced by engine and artifact")
+
+
+def test_process_payroll_sends_only_misses(payroll_cache, sent_to_engine):
+    """Test that cached records skip the engine and results stay in order"""
+    first = process_payroll(
+        PayrollRequest(employees=[employee("EMP001"), employee("EMP002")]),
+        engine="reference"
+    )
+    second = process_payroll(
+        PayrollRequest(employees=[
+            employee("EMP003", "10.00"),
+            employee("EMP001"),
+            employee("EMP004", "20.00"),
+            employee("EMP002")
+        ]),
+        engine="reference"
+    )
+    
+    assert sent_to_engine == [["EMP001", "EMP002"], ["EMP003", "EMP004"]]
+    assert [r.employee_id for r in second.results] == ["EMP003", "EMP001", "EMP004", "EMP002"]
+    assert second.results[1] == first.results[0]
+    assert second.results[3] == first.results[1]
+    assert second.results[0].gross_pay == Decimal("255.00")
+    assert second.summary == {"processed": 4, "errors": 0}
+    print("✓ Only cache misses reach the engine")
+
+
+def test_fully_cached_batch_skips_engine(payroll_cache, sent_to_engine):
+    """Test that a batch made only of hits never calls the engine"""
+    request = PayrollRequest(employees=[employee("EMP001"), employee("EMP002")])
+    first = process_payroll(request, engine="reference")
+    second = process_payroll(request, engine="reference")
+    
+    assert len(sent_to_engine) == 1
+    assert second == first
+    assert payroll_cache.stats()["hits"] == 2
+    print("✓ Fully cached batch skips the engine")
+
+
+def test_changed_record_is_a_miss(payroll_cache, sent_to_engine):
+    """Test that any change to the fixed-width record misses the cache"""
+    process_payroll(PayrollRequest(employees=[employee("EMP001")]), engine="reference")
+    response = process_payroll(
+        PayrollRequest(employees=[employee("EMP001", "41.00")]),
+        engine="reference"
+    )
+    
+    assert len(sent_to_engine) == 2
+    assert response.results[0].gross_pay == Decimal("1045.50")
+    print("✓ Changed records miss the cache")
@@ -0,0 +1,162 @@
+"""
+Tests for coalescing payouts to the same wallet into one transfer.
+
+Usage:
+    python -m pytest backend/test_settlement_coalescing.py
+"""
+import time
+from decimal import Decimal
+
+import pytest
+
+from backend.coinbase_client import CoinbaseClient
+from backend.conftest import build_response
+from backend.models import PayrollResponse
+from backend.settlement_ledger import SettlementLedger
+from backend.settlement_planner import coalesce_by_wallet
+from backend.settlement_tracker import SettlementTracker
+
+pytestmark = pytest.mark.usefixtures("mock_wallet")
+
+CONTRACTOR_WALLET = f"0x{'c' * 40}"
+
+
+def payouts_response(payouts) -> PayrollResponse:
+    """PayrollResponse from (net_pay, wallet_address) pairs."""
+    return build_response(
+        [net_pay for net_pay, _ in payouts],
+        wallets=[wallet_address for _, wallet_address in payouts]
+    )
+
+
+def contractor_payroll() -> PayrollResponse:
+    """Three payouts to one contractor wallet, two to employees' own wallets."""
+    return payouts_response([
+        ("100.00", CONTRACTOR_WALLET),
+        ("50.00", f"0x{1:040x}"),
+        ("25.00", CONTRACTOR_WALLET.upper().replace("0X", "0x")),
+        ("75.00", f"0x{2:040x}"),
+        ("10.00", CONTRACTOR_WALLET)
+    ])
+
+
+def counting_client(ledger=None) -> CoinbaseClient:
+    """Mock client that records every transfer broadcast."""
+    client = CoinbaseClient(network="base-sepolia", ledger=ledger)
+    client.mock_confirmation_delay = 0.01
+    client.sent = []
+    broadcast = client._broadcast
+    
+    def counted_broadcast(to_address, amount, employee_id, idempotency_key):
+        client.sent.append((to_address, amount))
+        return broadcast(to_address, amount, employee_id, idempotency_key)
+    
+    client._broadcast = counted_broadcast
+    return client
+
+
+def test_coalesce_by_wallet():
+    """Test grouping by wallet, case-insensitively, keeping non-positive payouts apart"""
+    response = payouts_response([
+        ("10.00", CONTRACTOR_WALLET),
+        ("10.00", f"0x{1:040x}"),
+        ("0.00", CONTRACTOR_WALLET),
+        ("10.00", CONTRACTOR_WALLET.upper().replace("0X", "0x"))
+    ])
+    
+    assert coalesce_by_wallet(response.results) == [[0, 3], [1], [2]]
+    print("✓ Payouts grouped by wallet")
+
+
+def test_one_transfer_per_wallet():
+    """Test that payouts to one wallet share a transfer and map back to every employee"""
+    client = counting_client()
+    
+    summary = client.batch_settle(contractor_payroll())
+    
+    assert sorted(client.sent) == sorted([
+        (CONTRACTOR_WALLET, Decimal("135.00")),
+        (f"0x{1:040x}", Decimal("50.00")),
+        (f"0x{2:040x}", Decimal("75.00"))
+    ])
+    assert summary["total_processed"] == 5
+    assert summary["total_succeeded"] == 5
+    
+    results = summary["results"]
+    assert [result["employee_id"] for result in results] == [f"EMP{index:05d}" for index in range(5)]
+    assert [result["amount"] for result in results] == ["100.00", "50.00", "25.00", "75.00", "10.00"]
+    contractor = [results[0], results[2], results[4]]
+    assert len({result["transaction_hash"] for result in contractor}) == 1
+    assert {result["transfer_amount"] for result in contractor} == {"135.00"}
+    assert contractor[0]["coalesced_employee_ids"] == ["EMP00000", "EMP00002", "EMP00004"]
+    assert "coalesced_employee_ids" not in results[1]
+    assert client.mock_balance == Decimal("10000.00") - 260
+    print("✓ One transfer per wallet, mapped back to every employee")
+
+
+def test_coalescing_can_be_disabled():
+    """Test that coalesce=False sends one transfer per payroll result"""
+    client = counting_client()
+    
+    summary = client.batch_settle(contractor_payroll(), coalesce=False)
+    
+    assert len(client.sent) == 5
+    assert summary["total_succeeded"] == 5
+    assert len({result["transaction_hash"] for result in summary["results"]}) == 5
+    print("✓ Coalescing can be disabled")
+
+
+def test_failed_transfer_fails_every_payout():
+    """Test that a coalesced transfer that can't be covered fails all its payouts"""
+    client = counting_client()
+    client.mock_balance = Decimal("130.00")
+    
+    summary = client.batch_settle(payouts_response([
+        ("100.00", CONTRACTOR_WALLET),
+        ("50.00", CONTRACTOR_WALLET),
+        ("30.00", f"0x{1:040x}")
+    ]), max_workers=1)
+    
+    results = summary["results"]
+    assert [result["status"] for result in results] == ["failed", "failed", "success"]
+    assert [result["employee_id"] for result in results[:2]] == ["EMP00000", "EMP00001"]
+    assert "Insufficient funds" in results[0]["error"]
+    assert client.mock_balance == Decimal("100.00")
+    print("✓ Failed coalesced transfer fails every payout it covered")
+
+
+def test_ledger_resume_sends_nothing_twice(tmp_path):
+    """Test that each coalesced payout is journaled and a rerun sends nothing"""
+    ledger = SettlementLedger(str(tmp_path / "settlement_ledger.db"))
+    client = counting_client(ledger)
+    
+    first = client.batch_settle(contractor_payroll(), batch_id="batch-1")
+    rerun = client.batch_settle(contractor_payroll(), batch_id="batch-1")
+    
+    assert len(client.sent) == 3
+    assert rerun["results"] == first["results"]
+    entries = ledger.entries("batch-1")
+    assert len(entries) == 5
+    assert {entry["status"] for entry in entries} == {"success"}
+    assert entries[0]["transaction_hash"] == entries[2]["transaction_hash"] == entries[4]["transaction_hash"]
+    assert entries[0]["amount"] == "100.00"
+    ledger.close()
+    print("✓ Coalesced payouts journaled per employee; rerun sends nothing")
+
+
+def test_tracker_confirms_every_payout():
+    """Test that one confirmed transfer confirms every payout it covered"""
+    client = counting_client()
+    tracker = SettlementTracker(poll_interval=None)
+    
+    submitted = tracker.submit(client, contractor_payroll())
+    status = tracker.status(submitted["settlement_id"])
+    assert (status["pending"], status["confirmed"]) == (5, 0)
+    
+    time.sleep(client.mock_confirmation_delay)
+    assert tracker.poll() == 5
+    
+    status = tracker.status(submitted["settlement_id"])
+    assert status["status"] == "completed"
+    assert {result["status"] for result in status["results"]} == {"success"}
+    print("✓ Tracker confirms every coalesced payout")
@@ -0,0 +1,138 @@
+"""
+Tests for concurrent batch settlement.
+
+Usage:
+    python -m pytest backend/test_settlement_engine.py
+"""
+import random
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+from backend.coinbase_client import CoinbaseClient, CoinbaseClientRegistry
+from backend.conftest import build_response
+
+
+def test_results_in_payroll_order(client, monkeypatch):
+    """Test that results come back in payroll order whatever order transfers confirm in"""
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    original = client.transfer_usdc
+    
+    def jittery_transfer(**kwargs):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(random.uniform(0, 0.02))
+        try:
+            return original(**kwargs)
+        finally:
+            with lock:
+                running -= 1
+    
+    monkeypatch.setattr(client, "transfer_usdc", jittery_transfer)
+    
+    summary = client.batch_settle(build_response(["1.00"] * 40), max_workers=8)
+    
+    assert [result["employee_id"] for result in summary["results"]] == [f"EMP{i:05d}" for i in range(40)]
+    assert summary["total_succeeded"] == 40
+    assert 1 < peak <= 8
+    print("✓ Results in payroll order, concurrency bounded")
+
+
+def test_failures_isolated(client):
+    """Test that invalid transfers fail on their own without stopping the batch"""
+    response = build_response(["10.00", "10.00", "10.00"])
+    response.results[1].wallet_address = "not-a-wallet"
+    
+    summary = client.batch_settle(response, max_workers=4)
+    
+    assert [result["status"] for result in summary["results"]] == ["success", "failed", "success"]
+    assert "Invalid wallet address" in summary["results"][1]["error"]
+    assert (summary["total_succeeded"], summary["total_failed"]) == (2, 1)
+    print("✓ Failed transfer isolated")
+
+
+def test_concurrent_transfers_never_overdraw(client):
+    """Test that concurrent transfers can't spend the same funds twice"""
+    client.mock_balance = Decimal("100.00")
+    
+    summary = client.batch_settle(build_response(["20.00"] * 10), max_workers=10)
+    
+    assert summary["total_succeeded"] == 5
+    assert summary["total_failed"] == 5
+    assert all("Insufficient funds" in r["error"] for r in summary["results"] if r["status"] == "failed")
+    assert client.mock_balance == Decimal("0.00")
+    print("✓ Concurrent transfers never overdraw")
+
+
+def test_unknown_receipt_not_success(client, monkeypatch):
+    """Test that a transfer the provider doesn't know is returned pending, not successful"""
+    client.confirmation_timeout = 0.05
+    monkeypatch.setattr(client, "_fetch_receipts", lambda hashes: dict.fromkeys(hashes, "unknown"))
+    
+    start = time.monotonic()
+    result = client.transfer_usdc(f"0x{1:040x}", Decimal("10.00"), "EMP00000")
+    
+    assert result["status"] == "pending"
+    assert result["transaction_hash"] is not None
+    assert "still unknown" in result["error"]
+    assert time.monotonic() - start < 1
+    print("✓ Unknown receipt polled until the deadline, returned pending")
+
+
+def test_only_ok_results_settled(client):
+    """Test that ER results are skipped and an empty batch settles nothing"""
+    summary = client.batch_settle(build_response(["5.00"] * 3, status="ER"))
+    
+    assert summary == {
+        "total_processed": 0, "total_succeeded": 0, "total_failed": 0, "total_unknown": 0, "results": []
+    }
+    with pytest.raises(ValueError):
+        client.batch_settle(build_response(["5.00"]), max_workers=-1)
+    print("✓ Only OK results settled")
+
+
+def test_wallet_loaded_once_under_concurrency(monkeypatch):
+    """Test that transfers starting together on a fresh client share one wallet"""
+    monkeypatch.delenv("PAYROLL_WALLET_ADDRESS", raising=False)
+    monkeypatch.delenv("PAYROLL_WALLET_ID", raising=False)
+    client = CoinbaseClient(network="base-sepolia")
+    created = []
+    create_wallet = client.create_wallet
+    
+    def slow_create_wallet():
+        created.append(1)
+        time.sleep(0.01)
+        return create_wallet()
+    
+    monkeypatch.setattr(client, "create_wallet", slow_create_wallet)
+    threads = [threading.Thread(target=client._ensure_wallet) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(created) == 1
+    print("✓ One wallet per client")
+
+
+def test_registry_reuses_clients(mock_wallet):
+    """Test that the registry hands out one warmed-up client per network"""
+    registry = CoinbaseClientRegistry()
+    
+    registry.warm_up(["base-sepolia"])
+    sepolia = registry.get("base-sepolia")
+    
+    assert sepolia.account_address == mock_wallet
+    assert registry.get("base-sepolia") is sepolia
+    assert registry.get("base-mainnet") is not sepolia
+    
+    registry.close()
+    assert registry.get("base-sepolia") is not sepolia
+    print("✓ Registry reuses clients per network")
+
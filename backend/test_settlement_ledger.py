@@ -0,0 +1,281 @@
+"""
+Tests for the durable settlement ledger and resumable batch settlement.
+
+Usage:
+    python -m pytest backend/test_settlement_ledger.py
+"""
+import time
+import threading
+from decimal import Decimal
+
+import pytest
+
+from backend.coinbase_client import CoinbaseClient, TransientSettlementError
+from backend.conftest import build_response
+from backend.settlement_ledger import SettlementLedger
+from backend.settlement_tracker import SettlementTracker
+
+
+class ProcessDied(BaseException):
+    """Stands in for the process being killed mid-settlement."""
+
+
+@pytest.fixture
+def ledger_path(tmp_path, mock_wallet):
+    return str(tmp_path / "settlement_ledger.db")
+
+
+def counting_client(ledger, die_on=None):
+    """Mock client on ledger that counts submissions (and dies on one employee)."""
+    client = CoinbaseClient(network="base-sepolia", ledger=ledger)
+    client.mock_confirmation_delay = 0.01
+    client.sent = []
+    client.dead = False
+    submit = client.submit_usdc
+    
+    def counted_submit(to_address, amount, employee_id=None, **kwargs):
+        # A dead process sends nothing more
+        client.dead = client.dead or employee_id == die_on
+        if client.dead:
+            raise ProcessDied()
+        client.sent.append(employee_id)
+        return submit(to_address, amount, employee_id, **kwargs)
+    
+    def checked_begin(batch_id, *keys):
+        if client.dead:
+            raise ProcessDied()
+        return begin(batch_id, *keys)
+    
+    begin = ledger.begin
+    ledger.begin = checked_begin
+    client.submit_usdc = counted_submit
+    return client
+
+
+def test_resume_skips_paid_employees(ledger_path):
+    """Test that a batch rerun after a crash pays nobody twice"""
+    response = build_response(["10.00"] * 6)
+    
+    crashed = counting_client(SettlementLedger(ledger_path), die_on="EMP00003")
+    with pytest.raises(ProcessDied):
+        crashed.batch_settle(response, max_workers=1, batch_id="run-1")
+    assert crashed.sent == ["EMP00000", "EMP00001", "EMP00002"]
+    crashed.ledger.close()
+    
+    resumed = counting_client(SettlementLedger(ledger_path))
+    summary = resumed.batch_settle(response, batch_id="run-1")
+    
+    assert sorted(resumed.sent) == ["EMP00004", "EMP00005"]
+    assert [result["status"] for result in summary["results"]] == [
+        "success", "success", "success", "unknown", "success", "success"
+    ]
+    assert "outcome unknown" in summary["results"][3]["error"]
+    
+    # Once checked on chain, the interrupted transfer can be released and sent
+    assert resumed.ledger.release("run-1", "EMP00003")
+    summary = resumed.batch_settle(response, batch_id="run-1")
+    assert sorted(resumed.sent) == ["EMP00003", "EMP00004", "EMP00005"]
+    assert summary["total_succeeded"] == 6
+    assert {entry["status"] for entry in resumed.ledger.entries("run-1")} == {"success"}
+    print("✓ Resumed batch skips employees already paid")
+
+
+def test_overlapping_settlements_pay_once(ledger_path):
+    """Test that two concurrent settlements of one batch send each transfer once"""
+    response = build_response(["10.00"] * 200)
+    # Two connections, as two server workers would have
+    clients = [counting_client(SettlementLedger(ledger_path)) for _ in range(2)]
+    start = threading.Barrier(2)
+    summaries = [None, None]
+    
+    def settle(index):
+        start.wait()
+        summaries[index] = clients[index].batch_settle(response, batch_id="run-6")
+    
+    threads = [threading.Thread(target=settle, args=(index,)) for index in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    sent = clients[0].sent + clients[1].sent
+    assert sorted(sent) == [f"EMP{index:05d}" for index in range(200)]
+    debited = sum(Decimal("10000.00") - client.mock_balance for client in clients)
+    assert debited == Decimal("2000.00")
+    for summary in summaries:
+        for result in summary["results"]:
+            assert result["status"] == "success" or "outcome unknown" in result["error"]
+    
+    # Once both are done, the batch reports every transfer exactly once
+    rerun = clients[0].batch_settle(response, batch_id="run-6")
+    assert rerun["total_succeeded"] == 200
+    assert len({result["transaction_hash"] for result in rerun["results"]}) == 200
+    assert len(sent) == 200
+    print("✓ Overlapping settlements of one batch pay each employee once")
+
+
+def test_failed_transfers_are_retried(ledger_path):
+    """Test that transfers that failed (no money moved) are sent again on rerun"""
+    client = counting_client(SettlementLedger(ledger_path))
+    client.mock_balance = Decimal("15.00")
+    response = build_response(["10.00", "10.00"])
+    
+    first = client.batch_settle(response, max_workers=1, batch_id="run-2")
+    assert [result["status"] for result in first["results"]] == ["success", "failed"]
+    
+    client.mock_balance = Decimal("100.00")
+    second = client.batch_settle(response, max_workers=1, batch_id="run-2")
+    
+    assert client.sent == ["EMP00000", "EMP00001", "EMP00001"]
+    assert second["results"][0] == first["results"][0]
+    assert second["total_succeeded"] == 2
+    print("✓ Failed transfers retried, successful ones returned from the ledger")
+
+
+def test_unanswered_transfers_not_retried(ledger_path):
+    """Test that a transfer sent without an answer is journaled unknown, not failed, and not resent"""
+    client = counting_client(SettlementLedger(ledger_path))
+    client.throttle.retries = 0
+    broadcast = client._broadcast
+    
+    def timed_out(*args):
+        broadcast(*args)
+        raise TransientSettlementError("Read timed out")
+    
+    client._broadcast = timed_out
+    response = build_response(["10.00"])
+    first = client.batch_settle(response, batch_id="run-9")
+    rerun = client.batch_settle(response, batch_id="run-9")
+    
+    assert [result["status"] for result in first["results"] + rerun["results"]] == ["unknown", "unknown"]
+    assert [entry["status"] for entry in client.ledger.entries("run-9")] == ["unknown"]
+    assert client.sent == ["EMP00000"]
+    
+    # Released after checking on chain, it is resent under the same
+    # idempotency key: the provider returns the transfer it already has
+    client._broadcast = broadcast
+    assert client.ledger.release("run-9", "EMP00000")
+    summary = client.batch_settle(response, batch_id="run-9")
+    assert summary["total_succeeded"] == 1
+    assert client.sent == ["EMP00000", "EMP00000"]
+    assert len(client._mock_confirm_at) == 1
+    print("✓ Unanswered transfers journaled unknown, released resend deduplicated")
+
+
+def test_changed_amount_not_paid_again(ledger_path):
+    """Test that a settled transfer rerun with a different amount is refused"""
+    client = counting_client(SettlementLedger(ledger_path))
+    client.batch_settle(build_response(["10.00"]), batch_id="run-3")
+    
+    summary = client.batch_settle(build_response(["12.00"]), batch_id="run-3")
+    
+    assert client.sent == ["EMP00000"]
+    assert summary["results"][0]["status"] == "failed"
+    assert "Already settled" in summary["results"][0]["error"]
+    print("✓ Changed amount refused for a settled transfer")
+
+
+def test_repeated_employee_paid_per_occurrence(ledger_path):
+    """Test that an employee listed twice in a batch is journaled twice"""
+    client = counting_client(SettlementLedger(ledger_path))
+    response = build_response(["10.00", "20.00"], employee_ids=["EMP1", "EMP1"])
+    
+    client.batch_settle(response, batch_id="run-4")
+    client.batch_settle(response, batch_id="run-4")
+    
+    assert client.sent == ["EMP1", "EMP1"]
+    assert [(entry["occurrence"], entry["amount"]) for entry in client.ledger.entries("run-4")] == [
+        (0, "10.00"), (1, "20.00")
+    ]
+    print("✓ Repeated employee journaled per occurrence")
+
+
+def test_no_batch_id_no_journal(ledger_path):
+    """Test that settling without a batch_id behaves as before"""
+    client = counting_client(SettlementLedger(ledger_path))
+    response = build_response(["10.00"])
+    
+    client.batch_settle(response)
+    client.batch_settle(response)
+    
+    assert client.sent == ["EMP00000", "EMP00000"]
+    print("✓ No batch_id: nothing journaled")
+
+
+def test_tracker_confirmations_journaled(ledger_path):
+    """Test that pipelined submissions are journaled and their confirmations recorded"""
+    client = counting_client(SettlementLedger(ledger_path))
+    tracker = SettlementTracker(poll_interval=None)
+    response = build_response(["10.00", "10.00"])
+    
+    submitted = tracker.submit(client, response, batch_id="run-5")
+    assert {entry["status"] for entry in client.ledger.entries("run-5")} == {"pending"}
+    
+    # Resubmitting while pending sends nothing
+    tracker.submit(client, response, batch_id="run-5")
+    assert client.sent == ["EMP00000", "EMP00001"]
+    
+    while tracker.status(submitted["settlement_id"])["status"] != "completed":
+        tracker.poll()
+    assert {entry["status"] for entry in client.ledger.entries("run-5")} == {"success"}
+    
+    summary = client.batch_settle(response, batch_id="run-5")
+    assert summary["total_succeeded"] == 2
+    assert summary["results"][0]["status"] == "success"
+    print("✓ Pipelined confirmations journaled")
+
+
+def test_restart_resumes_pending_confirmations(ledger_path):
+    """Test that a restarted tracker confirms the transfers left pending in the ledger"""
+    client = counting_client(SettlementLedger(ledger_path))
+    response = build_response(["10.00", "10.00", "10.00"])
+    SettlementTracker(poll_interval=None).submit(client, response, batch_id="run-7")
+    client.ledger.close()
+    
+    # Restart: a new tracker on the reopened ledger; the provider still knows the transfers
+    client.ledger = SettlementLedger(ledger_path)
+    tracker = SettlementTracker(poll_interval=None)
+    settlement_ids = tracker.resume(client)
+    assert len(settlement_ids) == 1
+    
+    while tracker.status(settlement_ids[0])["status"] != "completed":
+        tracker.poll()
+    assert tracker.status(settlement_ids[0], include_results=False)["confirmed"] == 3
+    assert {entry["status"] for entry in client.ledger.entries("run-7")} == {"success"}
+    assert tracker.resume(client) == []
+    
+    summary = client.batch_settle(response, batch_id="run-7")
+    assert summary["total_succeeded"] == 3
+    assert len(client.sent) == 3
+    print("✓ Restarted tracker resumes pending confirmations")
+
+
+def test_unknown_transactions_time_out(ledger_path):
+    """Test that transfers the provider never heard of end up unknown instead of pending forever"""
+    client = counting_client(SettlementLedger(ledger_path))
+    response = build_response(["10.00", "10.00"])
+    SettlementTracker(poll_interval=None).submit(client, response, batch_id="run-8")
+    
+    # A restarted mock provider no longer knows the transactions
+    restarted = counting_client(SettlementLedger(ledger_path))
+    tracker = SettlementTracker(poll_interval=None, unknown_timeout=0.05)
+    [settlement_id] = tracker.resume(restarted)
+    assert tracker.poll() == 0
+    assert tracker.status(settlement_id)["status"] == "pending"
+    
+    time.sleep(0.05)
+    tracker.poll()
+    status = tracker.status(settlement_id)
+    assert (status["status"], status["unknown"], status["failed"], status["pending"]) == ("completed", 2, 0, 0)
+    assert "unknown to the provider" in status["results"][0]["error"]
+    assert {entry["status"] for entry in restarted.ledger.entries("run-8")} == {"unknown"}
+    
+    # Reruns report the outcome unknown and send nothing until reconciled
+    summary = restarted.batch_settle(response, batch_id="run-8")
+    assert summary["total_unknown"] == 2
+    assert "outcome unknown" in summary["results"][0]["error"]
+    assert restarted.sent == []
+    assert restarted.ledger.release("run-8", "EMP00000")
+    restarted.batch_settle(response, batch_id="run-8")
+    assert restarted.sent == ["EMP00000"]
+    print("✓ Unknown transactions time out and await reconciliation")
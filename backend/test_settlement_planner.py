@@ -0,0 +1,109 @@
+"""
+Tests for the up-front balance check and the balance reservation ledger.
+
+Usage:
+    python -m pytest backend/test_settlement_planner.py
+"""
+import threading
+from decimal import Decimal
+
+import pytest
+
+from backend.coinbase_client import InsufficientFundsError
+from backend.conftest import build_response
+from backend.settlement_planner import BalanceReservations, get_balance_reservations, settlement_total
+
+
+def test_balance_checked_once_per_batch(client, monkeypatch):
+    """Test that a batch reads the balance once, not once per transfer"""
+    calls = []
+    get_balance = client.get_balance
+    monkeypatch.setattr(client, "get_balance", lambda *args: calls.append(args) or get_balance(*args))
+    
+    summary = client.batch_settle(build_response(["10.00"] * 20))
+    
+    assert summary["total_succeeded"] == 20
+    assert len(calls) == 1
+    assert client.mock_balance == Decimal("9800.00")
+    assert get_balance_reservations().outstanding(client.account_address) == 0
+    print("✓ One balance check per batch")
+
+
+def test_shortfall_pays_what_the_balance_covers(client):
+    """Test that a batch larger than the balance pays in order until funds run out"""
+    client.mock_balance = Decimal("25.00")
+    
+    summary = client.batch_settle(build_response(["10.00", "10.00", "10.00"]), max_workers=1)
+    
+    assert [result["status"] for result in summary["results"]] == ["success", "success", "failed"]
+    assert "Insufficient funds" in summary["results"][2]["error"]
+    assert client.mock_balance == Decimal("5.00")
+    print("✓ Shortfall: transfers fail once the reservation is spent")
+
+
+def test_concurrent_batches_never_overspend(client):
+    """Test that settle requests running at once share the balance safely"""
+    client.mock_balance = Decimal("100.00")
+    summaries = []
+    
+    def settle():
+        summaries.append(client.batch_settle(build_response(["10.00"] * 8), max_workers=4))
+    
+    threads = [threading.Thread(target=settle) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert sum(summary["total_succeeded"] for summary in summaries) == 10
+    assert client.mock_balance == Decimal("0.00")
+    assert get_balance_reservations().outstanding(client.account_address) == 0
+    print("✓ Concurrent batches never overspend")
+
+
+def test_single_transfer_respects_batch_reservations(client):
+    """Test that a standalone transfer can't spend funds a running batch has reserved"""
+    client.mock_balance = Decimal("100.00")
+    account = client._ensure_wallet()
+    reservation = get_balance_reservations().reserve(account, Decimal("80.00"), client.get_balance)
+    try:
+        with pytest.raises(InsufficientFundsError):
+            client.transfer_usdc(f"0x{1:040x}", Decimal("30.00"))
+        client.transfer_usdc(f"0x{1:040x}", Decimal("20.00"))
+    finally:
+        reservation.release()
+    
+    assert client.mock_balance == Decimal("80.00")
+    assert get_balance_reservations().outstanding(client.account_address) == 0
+    print("✓ Standalone transfers only spend unreserved funds")
+
+
+def test_reservations_share_the_balance():
+    """Test reservation amounts, holds and release"""
+    reservations = BalanceReservations()
+    balance = Decimal("1000")
+    
+    first = reservations.reserve("0xabc", Decimal("800"), lambda: balance)
+    second = reservations.reserve("0xabc", Decimal("800"), lambda: balance)
+    other_wallet = reservations.reserve("0xdef", Decimal("800"), lambda: balance)
+    assert (first.amount, second.amount, other_wallet.amount) == (800, 200, 800)
+    
+    assert first.hold(Decimal("500")) and not first.hold(Decimal("301"))
+    balance -= 500
+    first.spend(Decimal("500"))
+    assert reservations.outstanding("0xabc") == 500
+    
+    first.release()
+    first.release()
+    assert not first.hold(Decimal("1"))
+    assert reservations.reserve("0xabc", Decimal("800"), lambda: balance).amount == 300
+    print("✓ Reservations share the balance per wallet")
+
+
+def test_settlement_total():
+    """Test that only positive net pay counts towards the batch total"""
+    response = build_response(["10.25", "0.00", "5.50"])
+    
+    assert settlement_total(response.results) == Decimal("15.75")
+    assert settlement_total([]) == Decimal("0")
+    print("✓ Settlement total")
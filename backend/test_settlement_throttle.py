@@ -0,0 +1,276 @@
+"""
+Tests for rate limiting, retries and the circuit breaker around settlement calls.
+
+Transfers run against a local fake provider that rate limits, fails
+transiently and goes down on demand.
+
+Usage:
+    python -m pytest backend/test_settlement_throttle.py
+"""
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+from backend.coinbase_client import (
+    CoinbaseClient,
+    ProviderUnavailableError,
+    RateLimitError,
+    TransactionFailedError,
+    TransientSettlementError,
+)
+from backend.conftest import build_response
+from backend.settlement_ledger import SettlementLedger
+from backend.settlement_throttle import (
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    SettlementThrottle,
+)
+
+
+class FakeProvider:
+    """
+    Local stand-in for the CDP API.
+    
+    Accepts at most rate_limit sends per rolling second (429 beyond that),
+    fails the first flaky_calls sends transiently, times out on the first
+    timeouts sends *after* sending them, is down (5xx) until down_until, and
+    can reject transfers outright.
+    """
+    
+    def __init__(
+        self,
+        client: CoinbaseClient,
+        rate_limit=None,
+        flaky_calls=0,
+        timeouts=0,
+        down_for=0.0,
+        reject=False
+    ):
+        self.client = client
+        self.broadcast = client._broadcast
+        self.rate_limit = rate_limit
+        self.flaky_calls = flaky_calls
+        self.timeouts = timeouts
+        self.down_until = time.monotonic() + down_for
+        self.reject = reject
+        self.calls = 0
+        self.sent = []
+        self.accepted_at = []
+        self.outage_calls = 0
+        self.lock = threading.Lock()
+        client._broadcast = self.send
+    
+    def send(self, to_address, amount, employee_id, idempotency_key):
+        with self.lock:
+            self.calls += 1
+            now = time.monotonic()
+            if now < self.down_until:
+                self.outage_calls += 1
+                raise ProviderUnavailableError("503 Service Unavailable")
+            if self.flaky_calls:
+                self.flaky_calls -= 1
+                raise TransientSettlementError("502 Bad Gateway")
+            if self.reject:
+                raise TransactionFailedError("Transfer rejected")
+            if self.rate_limit is not None:
+                recent = [at for at in self.accepted_at if now - at < 1.0]
+                if len(recent) >= self.rate_limit:
+                    raise RateLimitError(retry_after=0.05)
+                self.accepted_at = recent + [now]
+            self.sent.append(employee_id)
+            timed_out = self.timeouts > 0
+            self.timeouts -= timed_out
+        transaction_hash = self.broadcast(to_address, amount, employee_id, idempotency_key)
+        if timed_out:
+            raise TransientSettlementError("Read timed out")
+        return transaction_hash
+
+
+@pytest.fixture
+def client(client):
+    client.throttle = SettlementThrottle(
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.05, max_pause=10),
+        transient_errors=(TransientSettlementError,),
+        rate_limit_errors=(RateLimitError,),
+        base_delay=0.001,
+        max_delay=0.01,
+        max_pause=10
+    )
+    return client
+
+
+def test_transient_errors_retried(client):
+    """Test that transient provider errors are retried instead of failing transfers"""
+    provider = FakeProvider(client, flaky_calls=2)
+    
+    summary = client.batch_settle(build_response(["10.00"] * 10), max_workers=1)
+    
+    assert summary["total_succeeded"] == 10
+    assert provider.calls == 12
+    assert client.mock_balance == Decimal("9900.00")
+    print("✓ Transient errors retried")
+
+
+def test_timed_out_send_not_paid_twice(client):
+    """Test that retrying a send that went out before timing out doesn't send it again"""
+    provider = FakeProvider(client, timeouts=5)
+    
+    summary = client.batch_settle(build_response(["10.00"] * 10), max_workers=1)
+    
+    assert summary["total_succeeded"] == 10
+    assert len(provider.sent) == 15
+    assert len({result["transaction_hash"] for result in summary["results"]}) == 10
+    assert len(client._mock_confirm_at) == 10
+    assert client.mock_balance == Decimal("9900.00")
+    print("✓ Timed-out sends retried with their idempotency key, sent once")
+
+
+def test_unanswered_send_not_paid_twice(client, tmp_path):
+    """Test that a send whose retries ran out after it went out is neither refunded nor resent"""
+    client.ledger = SettlementLedger(str(tmp_path / "settlement_ledger.db"))
+    client.throttle.max_pause = 0.3
+    provider = FakeProvider(client, timeouts=10**6)
+    
+    first = client.batch_settle(build_response(["10.00"]), batch_id="B")
+    sends = len(provider.sent)
+    rerun = client.batch_settle(build_response(["10.00"]), batch_id="B")
+    
+    assert [result["status"] for result in first["results"] + rerun["results"]] == ["unknown", "unknown"]
+    assert (first["total_failed"], first["total_unknown"]) == (0, 1)
+    assert "outcome unknown" in first["results"][0]["error"]
+    assert len(provider.sent) == sends
+    assert len(client._mock_confirm_at) == 1
+    assert client.mock_balance == Decimal("9990.00")
+    print("✓ Unanswered send kept as unknown: not refunded, not resent")
+
+
+def test_resend_deduplicated_by_payment(client):
+    """Test that sending a batch's payment again reuses its idempotency key"""
+    keys = []
+    broadcast = client._broadcast
+    client._broadcast = lambda *args: keys.append(args[3]) or broadcast(*args)
+    
+    def settle(batch_id):
+        return client.batch_settle(build_response(["10.00", "20.00"]), max_workers=1, batch_id=batch_id)
+    
+    first, again, _ = settle("B"), settle("B"), settle("C")
+    
+    assert keys[:2] == keys[2:4]
+    assert len(set(keys[:2] + keys[4:])) == 4
+    assert [result["transaction_hash"] for result in again["results"]] == [
+        result["transaction_hash"] for result in first["results"]
+    ]
+    assert len(client._mock_confirm_at) == 4
+    print("✓ Idempotency key derived from batch, employee and occurrence")
+
+
+def test_permanent_errors_not_retried(client):
+    """Test that a rejected transfer fails at once and its funds are returned"""
+    provider = FakeProvider(client, reject=True)
+    
+    summary = client.batch_settle(build_response(["10.00"] * 3), max_workers=1)
+    
+    assert summary["total_failed"] == 3
+    assert provider.calls == 3
+    assert client.mock_balance == Decimal("10000.00")
+    print("✓ Permanent errors not retried")
+
+
+def test_rate_limit_adapts(client):
+    """Test that 429s slow the limiter down without failing transfers"""
+    provider = FakeProvider(client, rate_limit=40)
+    
+    summary = client.batch_settle(build_response(["10.00"] * 60), max_workers=16)
+    
+    assert summary["total_succeeded"] == 60
+    assert sorted(provider.sent) == [f"EMP{index:05d}" for index in range(60)]
+    assert client.throttle.limiter.rate is not None
+    print(f"✓ Rate limit honoured (adapted to {client.throttle.limiter.rate:.0f}/s)")
+
+
+def test_outage_pauses_batch(client):
+    """Test that the circuit breaker pauses the batch through an outage"""
+    # Long enough for many failed probes: none may use up a transfer's retries
+    client.throttle.retries = 1
+    provider = FakeProvider(client, down_for=1.5)
+    
+    summary = client.batch_settle(build_response(["10.00"] * 40), max_workers=4)
+    
+    assert summary["total_succeeded"] == 40
+    assert client.throttle.breaker.state == "closed"
+    print(f"✓ Outage paused the batch ({provider.outage_calls} calls during the outage)")
+
+
+def test_long_outage_fails_after_max_pause(client):
+    """Test that transfers fail (and are refunded) once the outage outlasts max_pause"""
+    client.throttle.max_pause = 0.2
+    FakeProvider(client, down_for=60)
+    
+    start = time.monotonic()
+    summary = client.batch_settle(build_response(["10.00"] * 5), max_workers=5)
+    
+    assert summary["total_failed"] == 5
+    assert any("unavailable" in result["error"] for result in summary["results"])
+    assert time.monotonic() - start < 5
+    assert client.mock_balance == Decimal("10000.00")
+    print("✓ Long outage fails after the maximum pause")
+
+
+def test_limiter_aimd():
+    """Test the limiter's additive increase, multiplicative decrease and pause"""
+    limiter = AdaptiveRateLimiter(rate=10, min_rate=1, max_rate=12, increase=1, latency_target=1)
+    
+    limiter.on_success(latency=0.1)
+    limiter.on_success(latency=0.1)
+    limiter.on_success(latency=0.1)
+    assert limiter.rate == 12
+    limiter.on_success(latency=5)
+    assert limiter.rate == pytest.approx(10.8)
+    
+    limiter.on_throttled(retry_after=0.1)
+    limiter.on_throttled(retry_after=0.1)
+    assert limiter.rate == pytest.approx(5.4)
+    
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.1
+    print("✓ Limiter adapts and pauses")
+
+
+def test_unlimited_limiter_starts_limiting_when_throttled():
+    """Test that an unlimited limiter picks half the observed rate on its first 429"""
+    limiter = AdaptiveRateLimiter(rate=None, min_rate=1)
+    for _ in range(40):
+        limiter.acquire()
+    
+    limiter.on_throttled()
+    
+    assert limiter.rate == 20
+    print("✓ Unlimited limiter starts limiting at half the observed rate")
+
+
+def test_breaker_probe_and_timeout():
+    """Test breaker states: open after threshold, single probe, timeout"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05, max_pause=0.2)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    
+    breaker.before_call()
+    assert breaker.state == "half-open"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    
+    # Provider stays down longer than callers may wait
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, max_pause=0.1)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    print("✓ Breaker opens, probes and times out")
@@ -0,0 +1,122 @@
+"""
+Tests for submit-then-confirm settlement with background confirmation tracking.
+
+Usage:
+    python -m pytest backend/test_settlement_tracker.py
+"""
+import time
+from decimal import Decimal
+
+import pytest
+
+from backend.conftest import build_response
+from backend.settlement_tracker import SettlementTracker
+
+
+def test_submit_returns_before_confirmation(client):
+    """Test that submit() doesn't wait for confirmations and poll() collects them"""
+    tracker = SettlementTracker(poll_interval=None)
+    client.mock_confirmation_delay = 0.5
+    
+    start = time.perf_counter()
+    submitted = tracker.submit(client, build_response(["10.00"] * 20))
+    elapsed = time.perf_counter() - start
+    
+    assert elapsed < client.mock_confirmation_delay
+    assert submitted["status"] == "pending"
+    assert submitted["total_submitted"] == 20
+    assert {result["status"] for result in submitted["results"]} == {"pending"}
+    assert tracker.poll() == 0
+    
+    time.sleep(client.mock_confirmation_delay)
+    assert tracker.poll() == 20
+    
+    status = tracker.status(submitted["settlement_id"])
+    assert status["status"] == "completed"
+    assert (status["confirmed"], status["pending"], status["progress"]) == (20, 0, 1.0)
+    assert [result["transaction_hash"] for result in status["results"]] == [
+        result["transaction_hash"] for result in submitted["results"]
+    ]
+    assert client.mock_balance == Decimal("10000.00") - 200
+    print("✓ Submission returns at once; confirmations tracked by poll()")
+
+
+def test_failures_reported_without_blocking_others(client):
+    """Test that rejected transfers fail at submission while the rest confirm"""
+    tracker = SettlementTracker(poll_interval=None)
+    wallets = [f"0x{1:040x}", "0x123", f"0x{3:040x}"]
+    
+    submitted = tracker.submit(client, build_response(["10.00", "10.00", "10.00"], wallets=wallets))
+    
+    assert (submitted["total_submitted"], submitted["total_failed"]) == (2, 1)
+    assert [result["status"] for result in submitted["results"]] == ["pending", "failed", "pending"]
+    
+    time.sleep(client.mock_confirmation_delay)
+    tracker.poll()
+    status = tracker.status(submitted["settlement_id"], include_results=False)
+    assert (status["confirmed"], status["failed"], status["status"]) == (2, 1, "completed")
+    assert "results" not in status
+    print("✓ Failed submissions isolated")
+
+
+def test_background_thread_confirms(client):
+    """Test that the polling thread confirms transfers on its own"""
+    tracker = SettlementTracker(poll_interval=0.01)
+    try:
+        submitted = tracker.submit(client, build_response(["1.00"] * 5))
+        deadline = time.monotonic() + 5
+        while tracker.status(submitted["settlement_id"])["status"] != "completed":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        tracker.close()
+    print("✓ Background thread confirms transfers")
+
+
+def test_unknown_and_forgotten_settlements(client):
+    """Test unknown IDs and the finished-settlement history limit"""
+    tracker = SettlementTracker(poll_interval=None, history=1)
+    client.mock_confirmation_delay = 0
+    
+    first = tracker.submit(client, build_response(["1.00"]))
+    tracker.poll()
+    second = tracker.submit(client, build_response(["1.00"]))
+    tracker.poll()
+    tracker.submit(client, build_response(["1.00"]))
+    
+    assert tracker.status("nope") is None
+    assert tracker.status(first["settlement_id"]) is None
+    assert tracker.status(second["settlement_id"]) is not None
+    print("✓ Unknown and forgotten settlements return None")
+
+
+def test_settlement_endpoint(client, monkeypatch):
+    """Test GET /api/payroll/settlements/{id} and its 404"""
+    from fastapi.testclient import TestClient
+    from backend import main
+    
+    tracker = SettlementTracker(poll_interval=None)
+    monkeypatch.setattr(main, "get_settlement_tracker", lambda: tracker)
+    submitted = tracker.submit(client, build_response(["5.00", "5.00"]))
+    
+    api = TestClient(main.app)
+    response = api.get(f"/api/payroll/settlements/{submitted['settlement_id']}")
+    missing = api.get("/api/payroll/settlements/unknown")
+    
+    assert response.status_code == 200
+    assert (response.json()["pending"], response.json()["progress"]) == (2, 0.0)
+    assert missing.status_code == 404
+    assert missing.json()["detail"]["error_type"] == "SettlementNotFound"
+    print("✓ Settlement status endpoint")
+
+
+def test_confirmed_receipts_forgotten(client):
+    """Test that the mock provider doesn't keep every transaction it ever sent"""
+    client.mock_confirmation_delay = 0
+    client.mock_receipt_retention = 0
+    
+    for index in range(50):
+        client.submit_usdc(f"0x{index + 1:040x}", Decimal("1.00"), f"EMP{index:05d}")
+    
+    assert len(client._mock_confirm_at) == len(client._mock_idempotency) == 1
+    print("✓ Confirmed mock receipts forgotten after the retention period")
@@ -0,0 +1,91 @@
+"""
+Tests for the persistent COBOL worker pool.
+
+Checks that the pool engine produces exactly the same report as the
+one-process-per-job subprocess engine, and that crashed workers are
+restarted without losing the job.
+
+Usage:
+    python -m pytest backend/test_worker_pool.py
+"""
+import os
+
+import pytest
+
+from backend.bridge import cobol_binary_path, json_to_fixed_width, process_payroll
+from backend.cobol_pool import CobolWorkerPool
+from backend.conftest import build_request, requires_cobol
+
+
+requires_worker = pytest.mark.skipif(
+    not os.path.exists(cobol_binary_path("payroll_worker")),
+    reason="COBOL payroll_worker binary not compiled"
+)
+
+
+@pytest.fixture
+def pool():
+    worker_pool = CobolWorkerPool(
+        cobol_binary_path("payroll_worker"),
+        size=2,
+        health_check_interval=None
+    )
+    yield worker_pool
+    worker_pool.close()
+
+
+@requires_cobol
+@requires_worker
+def test_pool_matches_subprocess_engine():
+    """Test that pool and subprocess engines return identical responses"""
+    # More records than one pipe chunk, to exercise the chunked protocol
+    request = build_request(1500)
+    
+    subprocess_response = process_payroll(request, engine="subprocess")
+    pool_response = process_payroll(request, engine="pool")
+    
+    assert pool_response == subprocess_response
+    print("✓ Pool engine matches subprocess engine")
+
+
+@requires_cobol
+@requires_worker
+def test_summary_resets_between_jobs(pool):
+    """Test that each job gets its own summary counts"""
+    records = [json_to_fixed_width(emp) for emp in build_request(3).employees]
+    
+    first = pool.run_job(records)
+    second = pool.run_job(records[:1])
+    
+    assert first[-1] == "SUMMARY: PROCESSED=00003 ERRORS=00000"
+    assert second[-1] == "SUMMARY: PROCESSED=00001 ERRORS=00000"
+    print("✓ Summary counters reset between jobs")
+
+
+@requires_cobol
+@requires_worker
+def test_crashed_worker_is_restarted(pool):
+    """Test that a killed worker is replaced and the pool keeps serving jobs"""
+    records = [json_to_fixed_width(emp) for emp in build_request(5).employees]
+    
+    for worker in list(pool._idle.queue):
+        worker.kill()
+    
+    lines = pool.run_job(records)
+    
+    assert len(lines) == 6
+    assert pool.restarts >= 1
+    print("✓ Crashed worker restarted")
+
+
+@requires_cobol
+@requires_worker
+def test_health_check_restarts_dead_workers(pool):
+    """Test that the health check pings idle workers and replaces dead ones"""
+    list(pool._idle.queue)[0].kill()
+    
+    status = pool.health_check()
+    
+    assert status == {"healthy": 1, "restarted": 1, "busy": 0}
+    assert pool.health_check() == {"healthy": 2, "restarted": 0, "busy": 0}
+    print("✓ Health check restarted dead worker")
@@ -11,3 +11,23 @@ if %ERRORLEVEL% EQU 0 (
     echo Compilation failed with error code %ERRORLEVEL%
     exit /b %ERRORLEVEL%
 )
+
+echo Compiling payroll_worker.cbl...
+cobc -x -o cobol/bin/payroll_worker cobol/payroll_worker.cbl
+
+if %ERRORLEVEL% EQU 0 (
+    echo Compilation successful! Binary created at cobol/bin/payroll_worker.exe
+) else (
+    echo Compilation failed with error code %ERRORLEVEL%
+    exit /b %ERRORLEVEL%
+)
+
+echo Compiling paycalc.cbl...
+cobc -m -o cobol/bin/paycalc.dll cobol/paycalc.cbl
+
+if %ERRORLEVEL% EQU 0 (
+    echo Compilation successful! Module created at cobol/bin/paycalc.dll
+) else (
+    echo Compilation failed with error code %ERRORLEVEL%
+    exit /b %ERRORLEVEL%
+)